@@ -0,0 +1,167 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Opt-in build profiling for the docs macros (main.py) and hooks.py.
+
+Set UCP_BUILD_PROFILE=1 to write `.cache/build-profile.json` at the end of
+each build (or UCP_BUILD_PROFILE=PATH to choose the file) and log the
+slowest phases. The report holds:
+1. Wall time per instrumented function (count, total, mean, max)
+2. The slowest individual macro calls, with their arguments
+3. Counters, such as ucp-schema subprocess invocations
+4. Hit/miss totals and ratios for each cache
+
+When profiling is off, `timed` returns functions unwrapped and the
+recording helpers return immediately, so instrumentation costs nothing.
+"""
+
+import functools
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+
+log = logging.getLogger("mkdocs")
+
+_SETTING = os.environ.get("UCP_BUILD_PROFILE", "")
+ENABLED = _SETTING not in ("", "0")
+REPORT_PATH = (
+  Path(_SETTING)
+  if ENABLED and _SETTING != "1"
+  else Path(__file__).resolve().parent / ".cache" / "build-profile.json"
+)
+# Rows shown in the logged summary and slowest-call list of the report.
+TOP_N = 15
+
+_lock = threading.Lock()
+_timings: dict[str, list[float]] = {}
+_calls: list[tuple[float, str]] = []
+_counters: dict[str, int] = {}
+_caches: dict[str, list[int]] = {}
+
+
+def timed(name: str, label_calls: bool = False):
+  """Record the wall time of every call to the decorated function.
+
+  Args:
+    name: Row name in the report (e.g. 'macro:schema_fields').
+    label_calls: Also keep each call, labelled with its arguments, for the
+      slowest-call list.
+
+  """
+
+  def decorator(func):
+    if not ENABLED:
+      return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+      start = time.perf_counter()
+      try:
+        return func(*args, **kwargs)
+      finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+          _timings.setdefault(name, []).append(elapsed)
+          if label_calls:
+            arguments = [repr(a) for a in args]
+            arguments += [f"{k}={v!r}" for k, v in kwargs.items()]
+            _calls.append((elapsed, f"{name}({', '.join(arguments)})"))
+
+    return wrapper
+
+  return decorator
+
+
+def count(name: str, amount: int = 1) -> None:
+  """Add `amount` to the counter `name`."""
+  if not ENABLED:
+    return
+  with _lock:
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def cache(name: str, hits: int = 0, misses: int = 0) -> None:
+  """Add hit/miss totals for the cache `name`."""
+  if not ENABLED:
+    return
+  with _lock:
+    totals = _caches.setdefault(name, [0, 0])
+    totals[0] += hits
+    totals[1] += misses
+
+
+def report() -> None:
+  """Write the JSON report, log the top-N summary and reset for next build."""
+  if not ENABLED:
+    return
+  with _lock:
+    timings = {
+      name: {
+        "count": len(samples),
+        "total": round(sum(samples), 6),
+        "mean": round(sum(samples) / len(samples), 6),
+        "max": round(max(samples), 6),
+      }
+      for name, samples in _timings.items()
+    }
+    slowest = sorted(_calls, reverse=True)[:TOP_N]
+    caches = {
+      name: {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+      }
+      for name, (hits, misses) in _caches.items()
+    }
+    data = {
+      "timings": dict(
+        sorted(timings.items(), key=lambda item: -item[1]["total"])
+      ),
+      "slowest_calls": [
+        {"call": label, "seconds": round(elapsed, 6)}
+        for elapsed, label in slowest
+      ],
+      "counters": dict(sorted(_counters.items())),
+      "caches": dict(sorted(caches.items())),
+    }
+    _timings.clear()
+    _calls.clear()
+    _counters.clear()
+    _caches.clear()
+
+  try:
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with REPORT_PATH.open("w", encoding="utf-8") as f:
+      json.dump(data, f, indent=2)
+      f.write("\n")
+  except OSError as e:
+    log.warning(f"Could not write build profile to {REPORT_PATH}: {e}")
+    return
+
+  lines = [f"Build profile written to {REPORT_PATH}"]
+  for name, stats in list(data["timings"].items())[:TOP_N]:
+    lines.append(f"  {stats['total']:9.3f}s  {stats['count']:6d}x  {name}")
+  for name, value in data["counters"].items():
+    lines.append(f"  {name}: {value}")
+  for name, stats in data["caches"].items():
+    rate = stats["hit_rate"]
+    rate_text = f"{rate:.0%}" if rate is not None else "n/a"
+    lines.append(
+      f"  cache {name}: {stats['hits']} hits / {stats['misses']} misses "
+      f"({rate_text})"
+    )
+  log.info("\n".join(lines))
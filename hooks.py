@@ -15,7 +15,7 @@
 
 """MkDocs hooks for UCP documentation.
 
-Processes source files during build:
+Processes source files during build (see schema_publish.py):
 1. Resolve relative $ref to absolute URLs (using $id from referenced files)
 2. Rewrite all ucp.dev/schemas/ URLs to include version for proper resolution
 3. Copy to site directory based on $id path
@@ -24,125 +24,99 @@ Mike handles deployment to /{version}/ paths, so output paths exclude version
 but $id/$ref URLs include it for correct resolution after deployment.
 """
 
-import json
 import logging
 import re
-import shutil
 import os
+import sys
 from datetime import date
 from pathlib import Path
 from urllib.parse import urlparse
 from mkdocs.structure.files import Files
 
-log = logging.getLogger("mkdocs")
+# MkDocs only puts this directory on sys.path while loading the hook; keep
+# it there so schema_publish's worker processes can import it too.
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import build_profile  # noqa: E402
+import schema_publish  # noqa: E402
 
-# URL prefix for UCP schemas that need version injection
-UCP_SCHEMA_PREFIX = "https://ucp.dev/schemas/"
+log = logging.getLogger("mkdocs")
 # Pattern for valid date-based versions
 DATE_VERSION_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Relative links that root pages must point elsewhere, in one pattern:
+#   spec:  (../specification/foo.md) or (specification/foo.md)
+#   asset: "../assets/foo.img" or "assets/foo.img" (quotes included)
+ROOT_LINK_PATTERN = re.compile(
+  r"\((?:(?:\.\./)+|\./)?specification/(?P<spec>[^)]+)\)"
+  r"|\"(?:(?:\.\./)+|\./)?assets/(?P<asset>[^)\"]+)\""
+)
 
+# Set by on_config for root builds; reset every build.
+_link_rewriter = None
 
-def _process_refs(data, current_file_dir, url_version=None):
-  """Recursively resolve relative $ref paths to absolute URLs.
-
-  Reads referenced file's $id to construct the absolute URL.
-  Only processes relative refs (not # fragments or http URLs).
-  """
-  if isinstance(data, dict):
-    for key, value in data.items():
-      if (
-        key == "$ref"
-        and isinstance(value, str)
-        and not value.startswith(("#", "http"))
-      ):
-        ref_parts = value.split("#", 1)
-        relative_path = ref_parts[0]
-        fragment = f"#{ref_parts[1]}" if len(ref_parts) > 1 else ""
-
-        if not relative_path:
-          continue
-
-        ref_file_path = (current_file_dir / relative_path).resolve()
-
-        try:
-          with ref_file_path.open("r", encoding="utf-8") as f:
-            ref_data = json.load(f)
-
-          if "$id" in ref_data:
-            ref_id = ref_data["$id"]
-            if url_version and ref_id.startswith(UCP_SCHEMA_PREFIX):
-              versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
-              ref_id = ref_id.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
-            data[key] = ref_id + fragment
-          else:
-            log.warning(
-              f"No '$id' found in {ref_file_path}. "
-              f"Keeping original '$ref': {value}"
-            )
-        except FileNotFoundError:
-          log.error(
-            f"Referenced file not found: {ref_file_path}. "
-            f"Keeping original '$ref': {value}"
-          )
-        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
-          log.error(
-            f"Failed to read referenced file {ref_file_path}: {e}. "
-            f"Keeping original '$ref': {value}"
-          )
-      else:
-        _process_refs(value, current_file_dir, url_version)
-  elif isinstance(data, list):
-    for item in data:
-      _process_refs(item, current_file_dir, url_version)
 
+class _RootLinkRewriter:
+  """Rewrites root-page links to the spec and assets in a single scan.
 
-def _rewrite_version_urls(data, url_version):
-  """Recursively rewrite ucp.dev/schemas/ URLs to include version.
-
-  Transforms: https://ucp.dev/schemas/X
-  -> https://ucp.dev/{url_version}/schemas/X
-
-  This ensures $id matches the deployed URL and $ref resolves correctly.
-  Applied to both $id and $ref fields.
+  Every rewritten target is recorded with the pages linking to it, so
+  on_post_build can check them against the built site instead of waiting
+  for a crawl of the HTML output.
   """
-  versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
 
-  if isinstance(data, dict):
-    for key, value in data.items():
-      if (
-        key in ("$id", "$ref")
-        and isinstance(value, str)
-        and value.startswith(UCP_SCHEMA_PREFIX)
-      ):
-        data[key] = value.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
+  def __init__(self, base_path):
+    """Prepare rewrites for a site served under base_path (e.g. /ucp/)."""
+    self.spec_base = f"{base_path}latest/specification/"
+    self.asset_base = f"{base_path}assets/"
+    # (kind, path relative to specification/ or assets/) -> source pages
+    self.targets = {}
+
+  def _replace(self, match, page):
+    spec = match.group("spec")
+    if spec is None:
+      path = match.group("asset")
+      self.targets.setdefault(("asset", path), set()).add(page)
+      # Including quotes back into the rendered new URL
+      return f'"{self.asset_base}{path}"'
+
+    self.targets.setdefault(("spec", spec), set()).add(page)
+    path, separator, fragment = spec.partition("#")
+    if path.endswith("index.md"):
+      path = path[:-8]
+    elif path.endswith(".md"):
+      path = path[:-3] + "/"
+    if separator:
+      path = f"{path}#{fragment}"
+    return f"({self.spec_base}{path})"
+
+  def rewrite(self, markdown, page):
+    """Return markdown with its spec and asset links rewritten."""
+    return ROOT_LINK_PATTERN.sub(
+      lambda match: self._replace(match, page), markdown
+    )
+
+  def missing_targets(self, docs_dir, site_dir):
+    """Return (link, pages) for rewritten targets that do not exist.
+
+    Spec targets are checked against the spec sources, which the root build
+    excludes; asset targets against the built site.
+    """
+    missing = []
+    for (kind, link), pages in sorted(self.targets.items()):
+      path = link.split("#", 1)[0].split("?", 1)[0]
+      if kind == "asset":
+        exists = (site_dir / "assets" / path).is_file()
       else:
-        _rewrite_version_urls(value, url_version)
-  elif isinstance(data, list):
-    for item in data:
-      _rewrite_version_urls(item, url_version)
-
-
-def _set_schema_version(data, version):
-  """Set versions for versioned entities and transport artifacts.
-
-  UCP-authored capability and extension schemas require version per
-  ucp.json#/$defs/entity. Build injects the release version only for dev.ucp.*
-  schemas published in the core release. Third-party extensions and payment
-  handlers retain their author-controlled versions; the UCP payment-handler
-  meta-schema has no name and defines only the shared declaration structure.
-
-  For OpenAPI and OpenRPC transport specifications, set the required
-  info.version field as release artifact metadata.
-  """
-  if str(data.get("name", "")).startswith("dev.ucp."):
-    data["version"] = version
-
-  if ("openapi" in data or "openrpc" in data) and isinstance(
-    data["info"], dict
-  ):
-    data["info"]["version"] = version
-
-
+        target = docs_dir / "specification" / path
+        exists = (
+          target.is_file()
+          or (target / "index.md").is_file()
+          or target.with_name(target.name + ".md").is_file()
+        )
+      if not exists:
+        missing.append((f"{kind}: {link}", sorted(pages)))
+    return missing
+
+
+@build_profile.timed("hook:on_config")
 def on_config(config):
   """Adjust configuration based on DOCS_MODE."""
   mode = os.environ.get("DOCS_MODE", "root")
@@ -168,6 +142,9 @@ def on_config(config):
   if not base_path.endswith("/"):
     base_path += "/"
 
+  global _link_rewriter
+  _link_rewriter = _RootLinkRewriter(base_path) if mode == "root" else None
+
   # --- Adjust Nav (Config Phase) ---
   # Modifying config['nav'] prevents validation errors for missing files.
   if "nav" in config:
@@ -253,6 +230,7 @@ def on_config(config):
   return config
 
 
+@build_profile.timed("hook:on_files")
 def on_files(files, config):
   """Filter files based on DOCS_MODE (spec or root)."""
   mode = os.environ.get("DOCS_MODE", "root")
@@ -273,69 +251,35 @@ def on_files(files, config):
   return Files(new_files)
 
 
+@build_profile.timed("hook:on_page_markdown")
 def on_page_markdown(markdown, page, config, files):
   """Rewrite links to excluded pages (e.g. spec in root mode)."""
-  mode = os.environ.get("DOCS_MODE", "root")
-
-  if mode == "root":
-    # Rewrite relative links to specification/ to absolute URLs
-    # pointing to latest spec.
-    site_url = os.environ.get("SITE_URL", "https://ucp.dev/")
-    base_path = urlparse(site_url).path
-    if not base_path.endswith("/"):
-      base_path += "/"
-
-    target_base = f"{base_path}latest/specification/"
-
-    def replace_link(match):
-      path, separator, fragment = match.group(1).partition("#")
-      if path.endswith("index.md"):
-        path = path[:-8]
-      elif path.endswith(".md"):
-        path = path[:-3] + "/"
-      if separator:
-        path = f"{path}#{fragment}"
-      return f"({target_base}{path})"
-
-    # Pattern matches: (  prefix  specification/  path  )
-    # We capture the path AFTER specification/
-    # Matches: (../specification/foo.md) or (specification/foo.md)
-    pattern = r"\((?:(?:\.\./)+|\./)?specification/([^)]+)\)"
-
-    markdown = re.sub(pattern, replace_link, markdown)
-
-    # Rewrite relative links to assets/ to absolute URLs
-    # pointing to served assets folder.
-    markdown = _root_pages_asset_link_rewrite(markdown, base_path)
-
-  return markdown
-
-
-def _root_pages_asset_link_rewrite(markdown, base_path):
-  """Rewrite asset references in the root/overview to absolute links.
-
-  Uses regex to find and replace asset links with root based links.
-  """
-  # Targeting the assets
-  target_base = f"{base_path}assets/"
-
-  def replace_link(match):
-    path = match.group(1)
-    # Including quotes back into the rendered new URL
-    output = f'"{target_base}{path}"'
-    return output
-
-  # Pattern matches: (  prefix  assets/  path  )
-  # We capture the path AFTER assets/
-  # Matches: (../assets/foo.img) or (assets/foo.img) excluding quotes
-  pattern = r"\"(?:(?:\.\./)+|\./)?assets/([^)\"]+)\""
-  markdown = re.sub(pattern, replace_link, markdown)
+  if _link_rewriter is not None:
+    # Relative links to specification/ point to the latest spec, and
+    # relative links to assets/ to the served assets folder.
+    markdown = _link_rewriter.rewrite(markdown, page.file.src_uri)
 
   return markdown
 
 
 def on_post_build(config):
   """Copy and process source files into the site directory."""
+  _post_build(config)
+  # Last hook of the build: macros and every other phase have reported.
+  build_profile.report()
+
+
+@build_profile.timed("hook:on_post_build")
+def _post_build(config):
+  """Write spec-mode redirects and publish source/ into the site."""
+  if _link_rewriter is not None:
+    missing = _link_rewriter.missing_targets(
+      Path(config["docs_dir"]), Path(config["site_dir"])
+    )
+    for link, pages in missing:
+      log.warning(f"Rewritten link target not found: {link} (in {pages})")
+    log.debug(f"Checked {len(_link_rewriter.targets)} rewritten link targets")
+
   # --- Redirects for excluded pages (Spec Mode) ---
   mode = os.environ.get("DOCS_MODE", "root")
   if mode == "spec":
@@ -406,57 +350,6 @@ def on_post_build(config):
     log.warning("Source directory not found: %s", base_src_path)
     return
 
-  for src_file in base_src_path.rglob("*"):
-    if not src_file.is_file():
-      continue
-    rel_path = src_file.relative_to(base_src_path).as_posix()
-
-    if not src_file.name.endswith(".json"):
-      dest_file = Path(config["site_dir"]) / rel_path
-      dest_dir = dest_file.parent
-      dest_dir.mkdir(exist_ok=True, parents=True)
-      shutil.copy2(src_file, dest_file)
-      log.info("Copied %s to %s", src_file, dest_file)
-      continue
-
-    # Process JSON files
-    try:
-      with src_file.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-
-      # Determine output path from ORIGINAL $id (before version rewrite).
-      # Mike deploys site/ to /{version}/, so we exclude version from path.
-      file_id = data.get("$id")
-      if file_id and file_id.startswith("https://ucp.dev"):
-        file_rel_path = file_id.removeprefix("https://ucp.dev").lstrip("/")
-      else:
-        file_rel_path = rel_path
-
-      # Step 1: Resolve relative $ref to absolute URLs
-      _process_refs(data, src_file.parent)
-
-      # Step 2: Inject versions for versioned entities and transport artifacts
-      if schema_version:
-        _set_schema_version(data, schema_version)
-
-      # Step 3: Rewrite URLs to include version
-      if url_version:
-        _rewrite_version_urls(data, url_version)
-
-      dest_file = Path(config["site_dir"]) / file_rel_path
-      dest_dir = dest_file.parent
-
-      dest_dir.mkdir(exist_ok=True, parents=True)
-      with dest_file.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-      log.info("Processed and copied %s to %s", src_file, dest_file)
-
-    except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
-      log.error(
-        "Failed to process JSON file %s, copying as-is: %s", src_file, e
-      )
-      # Fallback to copying if processing fails
-      dest_file = Path(config["site_dir"]) / rel_path
-      dest_dir = dest_file.parent
-      dest_dir.mkdir(exist_ok=True, parents=True)
-      shutil.copy2(src_file, dest_file)
+  schema_publish.publish(
+    base_src_path, Path(config["site_dir"]), url_version, schema_version
+  )
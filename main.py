@@ -20,14 +20,36 @@ to automatically generate Markdown tables for API request and response
 bodies.
 """
 
+import contextlib
+import functools
+import hashlib
 import json
+import logging
+import os
+import re
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
+from markdown.extensions.toc import slugify
+
+# mkdocs-macros loads this file by path without adding its directory to
+# sys.path, so make the sibling modules importable explicitly.
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import build_profile  # noqa: E402
+import schema_cache  # noqa: E402
+import schema_publish  # noqa: E402
+import schema_resolver  # noqa: E402
+
+log = logging.getLogger("mkdocs")
+
 # --- CONFIGURATION ---
 # Base directories for schema resolution
 OPENAPI_DIR = Path("source/services/shopping")
+SERVICES_DIR = Path("source/services")
 SCHEMAS_DIR = Path("source/schemas")
 HANDLERS_GOOGLE_PAY_DIR = Path("source/handlers/google_pay")
 COMMON_SCHEMAS_DIR = SCHEMAS_DIR / "common"
@@ -64,6 +86,153 @@ SCHEMAS_DIRS = [
 ]
 
 
+class SchemaRegistry:
+  """Name index over SCHEMAS_DIRS with an mtime-checked parse cache.
+
+  The docs macros look schemas up by a name relative to any directory in
+  SCHEMAS_DIRS (e.g. 'buyer.json' or 'types/line_item.json'), first match
+  wins. The index is built once, so each lookup is a dict hit instead of a
+  probe per directory, and parsed documents are reused until the file's
+  mtime changes. Callers must treat returned documents as read-only.
+  """
+
+  def __init__(self, schemas_dirs: list[Path]):
+    """Index every schema under `schemas_dirs`, in priority order."""
+    self.schemas_dirs = [Path(d) for d in schemas_dirs]
+    self._index: dict[str, Path] = {}
+    # Basename -> files directly inside an indexed directory, in order.
+    self.basenames: dict[str, list[Path]] = {}
+    self._documents: dict[Path, tuple[int, Any]] = {}
+    for schemas_dir in self.schemas_dirs:
+      if not schemas_dir.is_dir():
+        continue
+      for path in sorted(schemas_dir.rglob("*.json")):
+        self._index.setdefault(path.relative_to(schemas_dir).as_posix(), path)
+        if path.parent == schemas_dir:
+          self.basenames.setdefault(path.name, []).append(path)
+    self._paths = set(self._index.values())
+
+  def __contains__(self, path: Path) -> bool:
+    """Return True if `path` is an indexed schema file."""
+    return path in self._paths
+
+  def files(self) -> list[Path]:
+    """Return every schema directly inside an indexed directory."""
+    return [path for paths in self.basenames.values() for path in paths]
+
+  def find(self, name: str) -> Path | None:
+    """Return the path a schema name resolves to, or None if missing."""
+    path = self._index.get(name)
+    if path is not None:
+      return path
+    if not name.startswith(("/", ".")) and ".." not in name:
+      return None
+    # Names that escape the indexed trees (e.g. '../../ucp.json') keep the
+    # original per-directory probe.
+    for schemas_dir in self.schemas_dirs:
+      candidate = schemas_dir / name
+      if candidate.exists():
+        return candidate
+    return None
+
+  def load(self, path: Path) -> Any | None:
+    """Parse a schema file, reusing the last parse if it is unchanged."""
+    _record_dependency(path)
+    try:
+      mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+      return None
+    cached = self._documents.get(path)
+    if cached is not None and cached[0] == mtime:
+      return cached[1]
+    with path.open(encoding="utf-8") as f:
+      data = json.load(f)
+    self._documents[path] = (mtime, data)
+    return data
+
+  def load_named(self, name: str) -> Any | None:
+    """Parse the schema a name resolves to, or return None if missing."""
+    path = self.find(name)
+    return self.load(path) if path is not None else None
+
+
+SCHEMA_REGISTRY = SchemaRegistry(SCHEMAS_DIRS)
+
+
+def _reference_type_names() -> frozenset[str]:
+  """Return schema basenames whose $refs link to the reference page.
+
+  That is every common type, plus shopping types that no shopping root
+  schema shadows.
+  """
+  names = set()
+  for name, paths in SCHEMA_REGISTRY.basenames.items():
+    parents = {p.parent for p in paths}
+    if COMMON_TYPES_DIR in parents or (
+      SHOPPING_TYPES_DIR in parents and SHOPPING_SCHEMAS_DIR not in parents
+    ):
+      names.add(name)
+  return frozenset(names)
+
+
+REFERENCE_TYPE_NAMES = _reference_type_names()
+
+
+def _reference_def_anchors() -> dict[str, str]:
+  """Map extension `$defs` names to their anchors on the reference page.
+
+  auto_generate_schema_reference heads each extension definition with its
+  title, so an internal ref such as "#/$defs/order_payment" rendered on the
+  reference page must link to the title's slug. Names that more than one
+  extension defines under different titles are left out.
+  """
+  anchors: dict[str, str | None] = {}
+  for path in sorted(SHOPPING_SCHEMAS_DIR.glob("*.json")):
+    try:
+      schema = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+      continue
+    if not isinstance(schema, dict) or "Extension" not in schema.get(
+      "title", ""
+    ):
+      continue
+    for name, definition in schema.get("$defs", {}).items():
+      title = definition.get("title", name.replace("_", " ").title())
+      anchor = slugify(title, "-")
+      anchors[name] = anchor if anchors.get(name, anchor) == anchor else None
+  return {name: anchor for name, anchor in anchors.items() if anchor}
+
+
+REFERENCE_DEF_ANCHORS = _reference_def_anchors()
+
+# Internal refs to definitions documented in prose rather than by a generated
+# heading on the page that renders them: ref -> (spec page, anchor).
+DEF_LINK_TARGETS = {
+  # ucp.json: the key-ordering hint is specified in the overview.
+  "#/$defs/map_order": ("overview", "map_order"),
+  # permalink.json: the endpoint string is specified with the URL shape.
+  "#/$defs/endpoint": ("permalink", "url-shape-and-route-binding"),
+}
+
+# (parsed ucp.json, read-only view of its $defs); see _ucp_definitions.
+_ucp_defs: tuple[Any, MappingProxyType] | None = None
+
+
+def _ucp_definitions() -> MappingProxyType:
+  """Return a read-only view of the `$defs` in ucp.json.
+
+  The file is parsed once per build and the view is shared by every macro
+  call, while each read is still recorded as a dependency of the calling
+  macro. Raises json.JSONDecodeError if ucp.json is malformed.
+  """
+  global _ucp_defs
+  document = SCHEMA_REGISTRY.load(UCP_SCHEMA_PATH)
+  if _ucp_defs is None or _ucp_defs[0] is not document:
+    defs = document.get("$defs", {}) if isinstance(document, dict) else {}
+    _ucp_defs = (document, MappingProxyType(defs))
+  return _ucp_defs[1]
+
+
 def _validate_common_namespace_exclusivity() -> None:
   """Fail fast if any vertical schema shadows a common-namespace filename.
 
@@ -75,88 +244,151 @@ def _validate_common_namespace_exclusivity() -> None:
   are autonomous siblings and may freely share filenames with each
   other — this guard only protects the common namespace.
   """
-  common_names: dict[str, Path] = {}
-  for d in (COMMON_SCHEMAS_DIR, COMMON_TYPES_DIR):
-    if not d.exists():
+  common_dirs = (COMMON_SCHEMAS_DIR, COMMON_TYPES_DIR)
+  vertical_dirs = {*VERTICAL_DIRS, *(v / "types" for v in VERTICAL_DIRS)}
+  for paths in SCHEMA_REGISTRY.basenames.values():
+    common = [p for p in paths if p.parent in common_dirs]
+    if not common:
       continue
-    for p in d.glob("*.json"):
-      common_names[p.name] = p
-
-  for v in VERTICAL_DIRS:
-    for sub in (v, v / "types"):
-      if not sub.exists():
-        continue
-      for p in sub.glob("*.json"):
-        if p.name in common_names:
-          raise RuntimeError(
-            f"Schema filename '{p.name}' is claimed by common "
-            f"({common_names[p.name]}) and shadowed by {p}. Once a "
-            f"basename exists in common/ (top-level or types/), no "
-            f"vertical may reuse it — doc resolution is basename-based "
-            f"and would silently bind to the wrong file. Rename or "
-            f"remove the vertical file. Verticals may share filenames "
-            f"with each other; this rule only protects common."
-          )
+    for p in paths:
+      if p.parent in vertical_dirs:
+        raise RuntimeError(
+          f"Schema filename '{p.name}' is claimed by common "
+          f"({common[-1]}) and shadowed by {p}. Once a "
+          f"basename exists in common/ (top-level or types/), no "
+          f"vertical may reuse it — doc resolution is basename-based "
+          f"and would silently bind to the wrong file. Rename or "
+          f"remove the vertical file. Verticals may share filenames "
+          f"with each other; this rule only protects common."
+        )
 
 
 _validate_common_namespace_exclusivity()
 
 
-# Cache for resolved schemas to avoid repeated subprocess calls
+# Cache for resolved schemas to avoid repeated resolution work
 _resolved_schema_cache: dict[str, dict] = {}
 
+# Hit/miss counters for the rendered-table cache in define_env, reported by
+# on_post_build.
+_render_cache_stats = {"hits": 0, "misses": 0}
+
+# Engine used by _resolve_schema. "python" resolves annotations and bundles
+# in-process; "cli" shells out to `ucp-schema resolve` per variant; "check"
+# runs both and fails on any divergence. CI verifies the docs build under
+# "check", so the in-process engine is compared with ucp-schema on every
+# variant the pages resolve before anything deploys.
+SCHEMA_RESOLVER = os.environ.get("UCP_SCHEMA_RESOLVER", "python")
+
+# Resolved variants persist across builds in a content-addressed cache shared
+# with scripts/validate_examples.py (see schema_cache.py; UCP_SCHEMA_CACHE=0
+# disables it). The "check" engine always resolves afresh.
+_disk_cache = schema_cache.SchemaCache.from_env()
+# Macro memos are keyed on this file's content, so editing the renderers
+# invalidates them (the in-process resolver has its own ENGINE_ID).
+_MODULE_DIGEST = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+# Macro output is memoized across builds, including `mkdocs serve` rebuilds
+# (which re-execute this module), together with the content digest of every
+# file the call read. A call whose inputs are unchanged returns its previous
+# Markdown instead of re-rendering. UCP_MACRO_CACHE=0 disables the memo.
+MACRO_MEMO_PATH = Path(__file__).resolve().parent / ".cache" / "ucp-macros.json"
+MACRO_MEMO_ENABLED = os.environ.get("UCP_MACRO_CACHE", "1") != "0"
+# Links emitted into rendered pages, (spec page, anchor) -> source pages.
+# on_post_build checks every anchor against the ids of the built page.
+_emitted_links: dict[tuple[str, str], set[str]] = {}
+_SPEC_LINK_RE = re.compile(r"\(site:specification/([^)#]+)/#([^)\s]+)\)")
+_HTML_ID_RE = re.compile(r'\sid="([^"]+)"')
+
+# Dependency sets of the macro calls in progress (see _record_dependency).
+_dependency_frames: list[set[Path]] = []
+_macro_memo = None
+
+# Schema variants the pages resolved, persisted so the next build can
+# pre-resolve exactly those (see _preresolve_schemas).
+SCHEMA_VARIANTS_PATH = MACRO_MEMO_PATH.with_name("ucp-schema-variants.json")
+_page_variants: set[tuple[str, str, str, bool]] = set()
+_previous_variants: set[tuple[str, str, str, bool]] = set()
+
+# Threads used by define_env to pre-resolve, before the first page renders,
+# the schema variants the previous build's pages resolved (env
+# `UCP_SCHEMA_WORKERS`, 0 disables the pass). The pass pays off when
+# resolution shells out to ucp-schema; the in-process engine is CPU-bound
+# under the GIL, so the pass is a no-op with it unless asked.
+SCHEMA_WORKERS = int(
+  os.environ.get(
+    "UCP_SCHEMA_WORKERS",
+    0 if SCHEMA_RESOLVER == "python" else os.cpu_count() or 1,
+  )
+)
 
 # --- HELPER FUNCTIONS ---
-# These are thin wrappers; actual schema resolution is done by ucp-schema CLI.
-
+# Schema resolution runs in-process by default; the ucp-schema CLI remains
+# available as an alternate engine and as a cross-check (see SCHEMA_RESOLVER).
 
-def _load_json(path: str | Path) -> dict[str, Any] | None:
-  """Load JSON file, returns None on error."""
-  try:
-    with Path(path).open(encoding="utf-8") as f:
-      return json.load(f)
-  except (json.JSONDecodeError, OSError):
-    return None
 
+def _resolve_schema_cli(
+  schema_path: str | Path,
+  direction: str = "response",
+  operation: str = "read",
+  bundle: bool = False,
+) -> dict[str, Any]:
+  """Resolve a schema by invoking the ucp-schema CLI."""
+  build_profile.count("ucp-schema subprocesses")
+  dir_flag = "--request" if direction == "request" else "--response"
+  cmd = [
+    "ucp-schema",
+    "resolve",
+    str(schema_path),
+    dir_flag,
+    "--op",
+    operation,
+  ]
+  if bundle:
+    cmd.append("--bundle")
 
-def _resolve_json_pointer(pointer: str, data: Any) -> Any | None:
-  """Navigate to a JSON pointer path (e.g., '#/$defs/foo' or '#/components/x').
-
-  Args:
-    pointer: JSON pointer starting with '#' (e.g., '#/$defs/allocation').
-    data: The JSON data to navigate.
+  result = subprocess.run(
+    cmd,
+    capture_output=True,
+    text=True,
+    check=False,
+  )
+  if result.returncode == 0:
+    return json.loads(result.stdout)
+  raise RuntimeError(f"ucp-schema execution error: result = {result}")
 
-  Returns:
-    The value at the pointer path, or None if not found.
 
-  """
-  if pointer == "#":
-    return data
-  if not pointer.startswith("#/"):
+def _disk_cache_key(
+  schema_path: str | Path,
+  direction: str,
+  operation: str,
+  bundle: bool,
+  engine: str,
+) -> str | None:
+  """Return the persistent cache key for a variant, or None to bypass it."""
+  if _disk_cache is None or engine not in ("python", "cli"):
     return None
-
-  path_parts = pointer[2:].split("/")  # Remove '#/' prefix and split
-  current = data
-  for part in path_parts:
-    if isinstance(current, dict) and part in current:
-      current = current[part]
-    elif isinstance(current, list):
-      try:
-        current = current[int(part)]
-      except (ValueError, IndexError):
-        return None
-    else:
+  if engine == "cli":
+    engine = schema_cache.ucp_schema_version()
+    if engine is None:
       return None
-  return current
+  else:
+    engine = schema_resolver.ENGINE_ID
+  return _disk_cache.key(schema_path, engine, direction, operation, bundle)
 
 
+@build_profile.timed("resolve_schema")
 def _resolve_schema(
   schema_path: str | Path,
   direction: str = "response",
   operation: str = "read",
   bundle: bool = False,
+  engine: str | None = None,
 ) -> dict[str, Any] | None:
-  """Resolve a schema using ucp-schema CLI.
+  """Resolve a schema for one direction and operation.
+
+  The engine is chosen by SCHEMA_RESOLVER (env `UCP_SCHEMA_RESOLVER`) unless
+  `engine` overrides it.
 
   Args:
     schema_path: Path to the schema file.
@@ -164,40 +396,62 @@ def _resolve_schema(
     operation: 'create', 'update', 'complete', or 'read'.
     bundle: If True, inline all $ref pointers. If False, preserve $refs for
       hyperlink generation in documentation.
+    engine: 'cli', 'python' or 'check'; defaults to SCHEMA_RESOLVER.
 
   Returns:
-    Resolved schema as dict, or raises RuntimeError if ucp-schema fails.
+    Resolved schema as dict, or raises RuntimeError if resolution fails.
 
   """
+  if engine is None:
+    # Calls that pin an engine (published bundles) are not page renders.
+    _page_variants.add(
+      (Path(schema_path).as_posix(), direction, operation, bundle)
+    )
+  engine = engine or SCHEMA_RESOLVER
+  if _dependency_frames:
+    try:
+      _record_dependency(*(p for p, _ in schema_cache.ref_closure(schema_path)))
+    except OSError:
+      _record_dependency(schema_path)
+
   bundle_suffix = ":bundled" if bundle else ""
   cache_key = f"{schema_path}:{direction}:{operation}{bundle_suffix}"
-  if cache_key in _resolved_schema_cache:
-    return _resolved_schema_cache[cache_key]
-
-  dir_flag = "--request" if direction == "request" else "--response"
-  cmd = [
-    "ucp-schema",
-    "resolve",
-    str(schema_path),
-    dir_flag,
-    "--op",
-    operation,
-  ]
-  if bundle:
-    cmd.append("--bundle")
-
-  result = subprocess.run(
-    cmd,
-    capture_output=True,
-    text=True,
-    check=False,
-  )
-  if result.returncode == 0:
-    data = json.loads(result.stdout)
-    _resolved_schema_cache[cache_key] = data
-    return data
+  memo_key = f"{cache_key}:{engine}"
+  if memo_key in _resolved_schema_cache:
+    build_profile.cache("resolved_schema", hits=1)
+    return _resolved_schema_cache[memo_key]
+  build_profile.cache("resolved_schema", misses=1)
+
+  disk_key = _disk_cache_key(schema_path, direction, operation, bundle, engine)
+  if disk_key is not None:
+    data = _disk_cache.get(disk_key)
+    if data is not None:
+      _resolved_schema_cache[memo_key] = data
+      return data
+
+  if engine == "cli":
+    data = _resolve_schema_cli(schema_path, direction, operation, bundle)
+  elif engine in ("python", "check"):
+    data = schema_resolver.resolve(schema_path, direction, operation, bundle)
+    if engine == "check":
+      reference = _resolve_schema_cli(schema_path, direction, operation, bundle)
+      diff = schema_resolver.first_difference(data, reference)
+      if diff is not None:
+        raise RuntimeError(
+          f"In-process resolution of '{cache_key}' diverges from ucp-schema "
+          f"at '{diff}'. Run with UCP_SCHEMA_RESOLVER=cli to build with the "
+          f"reference engine."
+        )
   else:
-    raise RuntimeError(f"ucp-schema execution error: result = {result}")
+    raise RuntimeError(
+      f"Unknown UCP_SCHEMA_RESOLVER '{engine}' "
+      f"(expected 'python', 'cli' or 'check')"
+    )
+
+  if disk_key is not None:
+    _disk_cache.put(disk_key, data)
+  _resolved_schema_cache[memo_key] = data
+  return data
 
 
 # Backward compatibility alias
@@ -210,6 +464,474 @@ def _resolve_schema_bundled(
   return _resolve_schema(schema_path, direction, operation, bundle=True)
 
 
+def _resolve_structure(schema: dict, root: dict) -> dict:
+  """Resolve a schema's top-level $ref and its direct allOf refs.
+
+  Only these are resolved so that, e.g., the "Complete Checkout" table
+  renders its composed fields without expanding every property. The input
+  is never mutated; documents in the operation index are shared.
+  """
+  if not schema:
+    return schema
+  # 1. Resolve Top-Level Ref (e.g. "create_checkout")
+  if "$ref" in schema and schema["$ref"].startswith("#/"):
+    resolved = schema_resolver.resolve_json_pointer(schema["$ref"], root)
+    if resolved:
+      schema = resolved
+
+  # 2. Resolve Composition Refs (e.g. "complete_checkout" response)
+  if "allOf" in schema:
+    new_all_of = []
+    for item in schema["allOf"]:
+      if "$ref" in item and item["$ref"].startswith("#/"):
+        resolved = schema_resolver.resolve_json_pointer(item["$ref"], root)
+        new_all_of.append(resolved if resolved else item)
+      else:
+        new_all_of.append(item)
+    schema = {**schema, "allOf": new_all_of}
+  return schema
+
+
+def _describe_openapi_operation(
+  document: dict, operation: dict, path_parameters: list, kind: str
+) -> dict[str, Any]:
+  """Build the operation index entry for an OpenAPI operation."""
+  parameters = path_parameters + operation.get("parameters", [])
+
+  req_content = operation.get("requestBody", {}).get("content", {})
+  req_schema = req_content.get("application/json", {}).get("schema", {})
+
+  res_schema = {}
+  responses = operation.get("responses", {})
+  for code in ("200", "201"):
+    if code in responses:
+      res_content = responses.get(code, {}).get("content", {})
+      res_schema = res_content.get("application/json", {}).get("schema", {})
+      break
+
+  request_headers = []
+  for param in parameters:
+    if "$ref" in param:
+      param = schema_resolver.resolve_json_pointer(param["$ref"], document)
+      if not param:
+        continue
+    if param.get("in") == "header":
+      request_headers.append(param)
+
+  # Response headers are documented for 200 OK only.
+  response_headers = []
+  header_defs = responses.get("200", {}).get("headers", {})
+  for name, header in header_defs.items():
+    if "$ref" in header:
+      resolved = schema_resolver.resolve_json_pointer(header["$ref"], document)
+      if resolved:
+        response_headers.append({**resolved, "name": name})
+      else:
+        response_headers.append(
+          {"name": name, "description": "Ref not resolved"}
+        )
+    else:
+      response_headers.append({**header, "name": name})
+
+  return {
+    "kind": kind,
+    "document": document,
+    "operation": operation,
+    "parameters": parameters,
+    "request_schema": _resolve_structure(req_schema, document),
+    "response_schema": _resolve_structure(res_schema, document),
+    "request_headers": request_headers,
+    "response_headers": response_headers,
+  }
+
+
+def _describe_openrpc_method(document: dict, method: dict) -> dict[str, Any]:
+  """Build the operation index entry for an OpenRPC method.
+
+  Named params become the properties of the request schema; the result
+  schema is the response schema. JSON-RPC carries no transport headers.
+  """
+  params = [p for p in method.get("params", []) if isinstance(p, dict)]
+  request_schema = {}
+  if params:
+    request_schema = {
+      "properties": {p["name"]: p.get("schema", {}) for p in params},
+      "required": [p["name"] for p in params if p.get("required")],
+    }
+  result_schema = method.get("result", {}).get("schema", {})
+  return {
+    "kind": "method",
+    "document": document,
+    "operation": method,
+    "parameters": params,
+    "request_schema": request_schema,
+    "response_schema": _resolve_structure(result_schema, document),
+    "request_headers": [],
+    "response_headers": [],
+  }
+
+
+class OperationIndex:
+  """Index of operations across the OpenAPI and OpenRPC transport files.
+
+  Maps (file name, operationId or method name) to an entry holding the
+  operation object, its combined path + operation parameters, the request
+  and response schemas (top-level and allOf refs resolved) and headers.
+  File names are relative to OPENAPI_DIR, matching the macro arguments
+  (e.g. 'rest.openapi.json', '../payment-actions/embedded.openrpc.json').
+  Paths are indexed before webhooks, so a path operation wins a clash.
+  """
+
+  def __init__(self, services_dir: Path, base_dir: Path):
+    """Parse and index every transport file under `services_dir`."""
+    self._files: dict[str, dict[str, dict]] = {}
+    self._errors: dict[str, Exception] = {}
+    self._paths: dict[str, Path] = {}
+    for path in sorted(services_dir.rglob("*.json")):
+      name = os.path.relpath(path, base_dir)
+      self._paths[name] = path
+      try:
+        with path.open(encoding="utf-8") as f:
+          document = json.load(f)
+      except (OSError, json.JSONDecodeError) as e:
+        # Reported when a macro asks for this file, not at import time.
+        self._errors[name] = e
+        continue
+      self._files[name] = self._index_document(document)
+
+  @staticmethod
+  def _index_document(document: Any) -> dict[str, dict]:
+    operations: dict[str, dict] = {}
+    if not isinstance(document, dict):
+      return operations
+    for kind in ("paths", "webhooks"):
+      for path_item in document.get(kind, {}).values():
+        path_parameters = path_item.get("parameters", [])
+        for op_data in path_item.values():
+          if not isinstance(op_data, dict) or "operationId" not in op_data:
+            continue
+          operations.setdefault(
+            op_data["operationId"],
+            _describe_openapi_operation(
+              document, op_data, path_parameters, kind.rstrip("s")
+            ),
+          )
+    for method in document.get("methods", []):
+      if isinstance(method, dict) and "name" in method:
+        operations.setdefault(
+          method["name"], _describe_openrpc_method(document, method)
+        )
+    return operations
+
+  def operation_ids(self) -> set[str]:
+    """Return every operationId and method name across all files."""
+    return {op_id for ops in self._files.values() for op_id in ops}
+
+  def get(
+    self,
+    file_name: str,
+    operation_id: str,
+    kinds: tuple[str, ...] = ("path", "webhook", "method"),
+  ) -> dict[str, Any] | None:
+    """Look up an operation of one of `kinds`, or return None if absent.
+
+    Raises the original OSError or JSONDecodeError if the file is missing
+    or could not be parsed.
+    """
+    name = os.path.normpath(file_name)
+    _record_dependency(self._paths.get(name, OPENAPI_DIR / file_name))
+    if name in self._errors:
+      raise self._errors[name]
+    operations = self._files.get(name)
+    if operations is None:
+      raise FileNotFoundError(
+        f"No such transport file: '{OPENAPI_DIR / file_name}'"
+      )
+    entry = operations.get(operation_id)
+    if entry is None or entry["kind"] not in kinds:
+      return None
+    return entry
+
+
+OPERATION_INDEX = OperationIndex(SERVICES_DIR, OPENAPI_DIR)
+
+
+def _operation_for(direction: str, operation_id: str) -> str:
+  """Map an operationId or method name to a ucp-schema operation.
+
+  Responses always resolve as 'read'; requests pick the operation named in
+  the id (e.g. 'update_checkout' -> 'update'), defaulting to 'read'.
+  """
+  op_id = operation_id.lower()
+  if direction == "request":
+    if "create" in op_id:
+      return "create"
+    if "update" in op_id or "patch" in op_id:
+      return "update"
+    if "complete" in op_id:
+      return "complete"
+  return "read"
+
+
+def _load_schema_variants() -> set[tuple[str, str, str, bool]]:
+  """Return the variants the previous build's pages resolved.
+
+  Variants whose schema file no longer exists are dropped.
+  """
+  data = schema_resolver.load_json(SCHEMA_VARIANTS_PATH)
+  variants = data.get("variants", []) if isinstance(data, dict) else []
+  return {
+    (path, direction, operation, bool(bundle))
+    for path, direction, operation, bundle in variants
+    if Path(path).is_file()
+  }
+
+
+def _save_schema_variants(replace: bool) -> None:
+  """Persist the variants resolved by this build's pages (atomically).
+
+  Pages served from the macro memo resolve nothing, so unless every macro
+  re-rendered (`replace`), the previous build's variants are kept as well.
+  """
+  variants = _page_variants if replace else _page_variants | _previous_variants
+  payload = {"variants": sorted(variants)}
+  try:
+    SCHEMA_VARIANTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = SCHEMA_VARIANTS_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+    tmp_path.replace(SCHEMA_VARIANTS_PATH)
+  except OSError as e:
+    log.debug("Could not save %s: %s", SCHEMA_VARIANTS_PATH, e)
+
+
+@build_profile.timed("preresolve_schemas")
+def _preresolve_schemas(workers: int = SCHEMA_WORKERS) -> int:
+  """Fill _resolved_schema_cache with the variants pages need, concurrently.
+
+  Only variants the previous build's pages resolved are pre-resolved, so a
+  first build resolves lazily and later ones never resolve variants no page
+  uses. Failures are skipped here: a variant that no page needs any more
+  should not break the build, and one that is needed fails loudly again,
+  with page context, when the macro resolves it lazily.
+
+  Args:
+    workers: Size of the thread pool; 0 or less disables the pass.
+
+  Returns:
+    The number of variants resolved.
+
+  """
+  if workers <= 0 or not _previous_variants:
+    return 0
+
+  def resolve(variant):
+    try:
+      _resolve_schema(*variant)
+    except (RuntimeError, OSError, ValueError):
+      return False
+    return True
+
+  with ThreadPoolExecutor(max_workers=workers) as pool:
+    resolved = sum(pool.map(resolve, sorted(_previous_variants)))
+  # The pass is not a page render; pages record what they use themselves.
+  _page_variants.clear()
+  log.debug("Pre-resolved %d schema variants", resolved)
+  return resolved
+
+
+def _strip_annotations(schema: Any) -> None:
+  """Remove ucp_request/ucp_response keywords from a resolved schema.
+
+  They are already applied once a schema is resolved for one operation.
+  Instance data (const/enum/default/examples) is left untouched.
+  """
+  stack = [schema]
+  while stack:
+    node = stack.pop()
+    if isinstance(node, dict):
+      node.pop("ucp_request", None)
+      node.pop("ucp_response", None)
+      stack.extend(
+        v for k, v in node.items() if k not in schema_resolver.DATA_KEYWORDS
+      )
+    elif isinstance(node, list):
+      stack.extend(node)
+
+
+def _operation_schemas():
+  """Yield bundled, annotation-resolved schemas for every capability.
+
+  For each capability schema with a payload (top-level properties and a
+  dev.ucp.* name), one schema per operation its transports expose, e.g.
+  schemas/shopping/checkout.create.request.json and
+  schemas/shopping/checkout.read.response.json, ready for publishing next
+  to the raw schema (see schema_publish.register_generator).
+
+  Published bundles are always resolved by ucp-schema, whatever
+  SCHEMA_RESOLVER says, so public artifacts never depend on the in-process
+  engine.
+  """
+  operation_ids = OPERATION_INDEX.operation_ids()
+  for path in SCHEMA_REGISTRY.files():
+    document = SCHEMA_REGISTRY.load(path)
+    name = document.get("name") if isinstance(document, dict) else None
+    schema_id = document.get("$id", "") if name else ""
+    if (
+      not str(name).startswith("dev.ucp.")
+      or "properties" not in document
+      or not schema_id.startswith("https://ucp.dev/")
+    ):
+      continue
+    # Operations are named <verb>_<capability>, e.g. create_checkout.
+    short_name = name.rsplit(".", 1)[-1]
+    request_ops = {
+      _operation_for("request", op_id)
+      for op_id in operation_ids
+      if op_id.endswith(f"_{short_name}")
+    } - {"read"}
+    variants = [("read", "response")]
+    variants += [(op, "request") for op in sorted(request_ops)]
+    for operation, direction in variants:
+      try:
+        resolved = _resolve_schema(
+          path, direction, operation, bundle=True, engine="cli"
+        )
+      except (RuntimeError, OSError, ValueError) as e:
+        log.warning(f"Could not bundle {path} for {operation} {direction}: {e}")
+        continue
+      bundled = json.loads(json.dumps(resolved))
+      _strip_annotations(bundled)
+      variant_id = (
+        f"{schema_id.removesuffix('.json')}.{operation}.{direction}.json"
+      )
+      bundled["$id"] = variant_id
+      yield variant_id.removeprefix("https://ucp.dev/"), bundled, path
+
+
+def _record_dependency(*paths: str | Path) -> None:
+  """Attribute files read while rendering to the macro calls in progress."""
+  if not _dependency_frames:
+    return
+  cwd = Path.cwd()
+  normalized = set()
+  for path in paths:
+    resolved = Path(path).resolve()
+    try:
+      normalized.add(resolved.relative_to(cwd))
+    except ValueError:
+      normalized.add(resolved)
+  for frame in _dependency_frames:
+    frame.update(normalized)
+
+
+@contextlib.contextmanager
+def _collect_dependencies():
+  """Collect the files recorded inside the block into the yielded set.
+
+  Per-build caches store the set with each entry and replay it through
+  _record_dependency on every hit, so a macro call that reuses a result
+  another call computed still depends on the files behind it.
+  """
+  frame: set[Path] = set()
+  _dependency_frames.append(frame)
+  try:
+    yield frame
+  finally:
+    _dependency_frames.pop()
+
+
+def _tree_fingerprint() -> str:
+  """Digest the inputs that shape every macro's output at once.
+
+  Covers this module, the resolver engine, and the set of files under
+  source/ (adding or removing a schema can change how names resolve and
+  which types a reference page lists, without any recorded file changing).
+  """
+  digest = hashlib.sha256(
+    f"{_MODULE_DIGEST}\0{schema_resolver.ENGINE_ID}\0{SCHEMA_RESOLVER}".encode()
+  )
+  if SCHEMA_RESOLVER != "python":
+    digest.update((schema_cache.ucp_schema_version() or "").encode())
+  for path in sorted(Path("source").rglob("*.json")):
+    digest.update(f"\0{path.as_posix()}".encode())
+  return digest.hexdigest()
+
+
+class MacroMemo:
+  """Macro output persisted across builds, validated by dependency digests.
+
+  Entries map a macro call (name and arguments) to its Markdown and to the
+  SHA-256 of every file it read. The memo is discarded wholesale when the
+  tree fingerprint changes; entries not used by a build are dropped when
+  it is saved.
+  """
+
+  def __init__(self, path: Path, fingerprint: str):
+    """Load the memo at `path` if it was written for `fingerprint`."""
+    self.path = path
+    self.fingerprint = fingerprint
+    self.entries: dict[str, dict] = {}
+    self.hits = 0
+    self.misses = 0
+    # Page (src_path) -> files its macro calls depend on.
+    self.page_deps: dict[str, set[str]] = {}
+    self.rendered_pages: set[str] = set()
+    self._used: set[str] = set()
+    data = schema_resolver.load_json(path)
+    if isinstance(data, dict) and data.get("fingerprint") == fingerprint:
+      self.entries = data.get("entries", {})
+
+  def call(self, macro, args: tuple, kwargs: dict, page: str | None) -> Any:
+    """Return the memoized output of a macro call, rendering on a miss."""
+    key = json.dumps([macro.__name__, args, kwargs], sort_keys=True)
+    entry = self.entries.get(key)
+    if entry is not None and all(
+      schema_cache.file_digest(dep) == digest
+      for dep, digest in entry["deps"].items()
+    ):
+      self.hits += 1
+    else:
+      self.misses += 1
+      frame: set[Path] = set()
+      _dependency_frames.append(frame)
+      try:
+        output = macro(*args, **kwargs)
+      finally:
+        _dependency_frames.pop()
+      deps = {
+        path.as_posix(): schema_cache.file_digest(path)
+        for path in sorted(frame)
+      }
+      entry = {"output": output, "deps": deps}
+      self.entries[key] = entry
+      if page:
+        self.rendered_pages.add(page)
+    self._used.add(key)
+    if page:
+      self.page_deps.setdefault(page, set()).update(entry["deps"])
+    return entry["output"]
+
+  def save(self) -> None:
+    """Persist the entries used by this build (atomically)."""
+    entries = {key: self.entries[key] for key in sorted(self._used)}
+    pages = {
+      page: sorted(deps) for page, deps in sorted(self.page_deps.items())
+    }
+    payload = {
+      "fingerprint": self.fingerprint,
+      "pages": pages,
+      "entries": entries,
+    }
+    try:
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      tmp_path = self.path.with_suffix(".tmp")
+      with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f)
+      tmp_path.replace(self.path)
+    except OSError as e:
+      log.debug("Could not save macro memo %s: %s", self.path, e)
+
+
 def define_env(env):
   """Injects custom macros into the MkDocs environment.
 
@@ -222,8 +944,52 @@ def define_env(env):
     env: The MkDocs environment object.
 
   """
-  # Use module-level constants for paths
-  schemas_dirs = SCHEMAS_DIRS
+  global _macro_memo, _previous_variants
+  _previous_variants = _load_schema_variants()
+  _macro_memo = (
+    MacroMemo(MACRO_MEMO_PATH, _tree_fingerprint())
+    if MACRO_MEMO_ENABLED
+    else None
+  )
+
+  _preresolve_schemas()
+  schema_publish.register_generator("operation schemas", _operation_schemas)
+
+  def _memoized(macro):
+    """Serve a macro from the cross-build memo while its inputs hold."""
+    if _macro_memo is None:
+      return macro
+
+    @functools.wraps(macro)
+    def wrapper(*args, **kwargs):
+      return _macro_memo.call(macro, args, kwargs, _current_page())
+
+    return wrapper
+
+  def _current_page():
+    try:
+      return env.page.file.src_path
+    except AttributeError:
+      return None
+
+  def _link_checked(macro):
+    """Record the spec-page anchors a macro's output links to."""
+
+    @functools.wraps(macro)
+    def wrapper(*args, **kwargs):
+      output = macro(*args, **kwargs)
+      if isinstance(output, str):
+        page = _current_page() or "?"
+        for match in _SPEC_LINK_RE.finditer(output):
+          _emitted_links.setdefault(match.groups(), set()).add(page)
+      return output
+
+    return wrapper
+
+  def _macro(func):
+    """Register a macro, memoized and (when enabled) profiled."""
+    profiled = build_profile.timed(f"macro:{func.__name__}", label_calls=True)
+    return env.macro(profiled(_link_checked(_memoized(func))))
 
   def get_error_context():
     try:
@@ -236,15 +1002,8 @@ def define_env(env):
     return _resolve_schema(schema_path, direction, operation, bundle=False)
 
   def _load_json_file(entity_name):
-    """Try loading a JSON file from the configured directories."""
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / (entity_name + ".json")
-      try:
-        with full_path.open(encoding="utf-8") as f:
-          return json.load(f)
-      except FileNotFoundError:
-        continue
-    return None
+    """Load a JSON file from the configured directories (first match)."""
+    return SCHEMA_REGISTRY.load_named(entity_name + ".json")
 
   def _load_schema_variant(entity_name, context):
     """Load and resolve a schema for a specific operation.
@@ -265,32 +1024,16 @@ def define_env(env):
       return _load_json_file(entity_name)
 
     io_type = context.get("io_type")
-    op_id = context.get("operation_id", "").lower()
+    op_id = context.get("operation_id", "")
 
     # Find the schema file
-    schema_path = None
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / (entity_name + ".json")
-      if full_path.exists():
-        schema_path = str(full_path)
-        break
-
+    schema_path = SCHEMA_REGISTRY.find(entity_name + ".json")
     if not schema_path:
-      return _load_json_file(entity_name)
+      return None
 
     # Determine direction and operation for ucp-schema
     direction = io_type  # "request" or "response"
-    operation = "read"  # default for responses
-
-    if io_type == "request":
-      if "create" in op_id:
-        operation = "create"
-      elif "update" in op_id or "patch" in op_id:
-        operation = "update"
-      elif "complete" in op_id:
-        operation = "complete"
-    elif io_type == "response":
-      operation = "read"
+    operation = _operation_for(direction, op_id)
 
     # Resolve using ucp-schema (no fallback - fail loudly if unavailable)
     resolved = _resolve_with_ucp_schema(schema_path, direction, operation)
@@ -300,8 +1043,8 @@ def define_env(env):
     # ucp-schema failed - don't silently fall back to raw JSON with annotations
     return None
 
-  # Cache for polymorphic type detection
-  _polymorphic_cache: dict[str, bool] = {}
+  # Cache for polymorphic type detection: ref -> (result, files read).
+  _polymorphic_cache: dict[str, tuple[bool, frozenset[Path]]] = {}
 
   def _is_polymorphic_type(ref_string: str) -> bool:
     """Check if a schema file is polymorphic (has ucp_request annotations).
@@ -309,12 +1052,20 @@ def define_env(env):
     Polymorphic types have different request/response variants and require
     the -response suffix in anchors to match markdown headings.
     """
-    if ref_string in _polymorphic_cache:
-      return _polymorphic_cache[ref_string]
-
+    cached = _polymorphic_cache.get(ref_string)
+    if cached is not None:
+      build_profile.cache("polymorphic_type", hits=1)
+      _record_dependency(*cached[1])
+      return cached[0]
+    build_profile.cache("polymorphic_type", misses=1)
+    with _collect_dependencies() as deps:
+      polymorphic = _detect_polymorphic_type(ref_string)
+    _polymorphic_cache[ref_string] = (polymorphic, frozenset(deps))
+    return polymorphic
+
+  def _detect_polymorphic_type(ref_string: str) -> bool:
     # Only check types/ refs
     if "types/" not in ref_string:
-      _polymorphic_cache[ref_string] = False
       return False
 
     # Find and load the schema file
@@ -324,20 +1075,34 @@ def define_env(env):
     # types directory, so we just pass the filename
     schema_data = _load_json_file(filename)
     if not schema_data:
-      _polymorphic_cache[ref_string] = False
       return False
 
     # Check if any property has ucp_request annotation
     properties = schema_data.get("properties", {})
-    for prop_details in properties.values():
-      if isinstance(prop_details, dict) and "ucp_request" in prop_details:
-        _polymorphic_cache[ref_string] = True
-        return True
+    return any(
+      isinstance(prop_details, dict) and "ucp_request" in prop_details
+      for prop_details in properties.values()
+    )
 
-    _polymorphic_cache[ref_string] = False
-    return False
+  # Link symbol table for this build: every ref form rendered so far, per
+  # target page and response context, mapped to its Markdown link and the
+  # files building it read.
+  _link_table: dict[tuple, tuple[str, frozenset[Path]]] = {}
 
   def create_link(ref_string, spec_file_name, context=None):
+    """Return the Markdown link for a schema ref (see _build_link)."""
+    response = bool(context and context.get("io_type") == "response")
+    key = (ref_string, spec_file_name, response)
+    cached = _link_table.get(key)
+    if cached is not None:
+      _record_dependency(*cached[1])
+      return cached[0]
+    with _collect_dependencies() as deps:
+      link = _build_link(ref_string, spec_file_name, context)
+    _link_table[key] = (link, frozenset(deps))
+    return link
+
+  def _build_link(ref_string, spec_file_name, context=None):
     """Transform schema paths into Markdown links.
 
     Transforms paths like "types/line_item.create_req.json" into Markdown links.
@@ -373,22 +1138,14 @@ def define_env(env):
     if "#/$defs/" in ref_string:
       ref_path, fragment = ref_string.split("#/$defs/", 1)
 
-    # Redirect all types/ references to the reference specification
-    if ref_string.startswith("types/"):
-      spec_file_name = "reference"
-
-    # Redirect refs to common/types/ or shopping/types/ schemas to reference.
-    # Uses ref_path (fragment stripped) so refs like
+    # Redirect all types/ references, and refs to common/types/ or
+    # shopping/types/ schemas, to the reference specification. Uses
+    # ref_path (fragment stripped) so refs like
     # "../common/types/pagination.json#/$defs/request" are handled correctly.
-    elif ref_path.endswith(".json"):
-      filename_only = Path(ref_path).name
-      common_type_path = COMMON_TYPES_DIR / filename_only
-      shopping_type_path = SHOPPING_TYPES_DIR / filename_only
-      shopping_path = SHOPPING_SCHEMAS_DIR / filename_only
-      if common_type_path.exists() or (
-        shopping_type_path.exists() and not shopping_path.exists()
-      ):
-        spec_file_name = "reference"
+    if ref_string.startswith("types/") or (
+      ref_path.endswith(".json") and Path(ref_path).name in REFERENCE_TYPE_NAMES
+    ):
+      spec_file_name = "reference"
 
     filename = Path(ref_path).name
 
@@ -439,6 +1196,11 @@ def define_env(env):
       fragment_anchor = fragment.replace("_", "-")
       if anchor_name:  # External ref: base-fragment
         anchor_name = f"{anchor_name}-{fragment_anchor}"
+      elif ref_string in DEF_LINK_TARGETS:
+        spec_file_name, anchor_name = DEF_LINK_TARGETS[ref_string]
+      elif spec_file_name == "reference" and fragment in REFERENCE_DEF_ANCHORS:
+        # Extension definitions are headed by their title there.
+        anchor_name = REFERENCE_DEF_ANCHORS[fragment]
       else:  # Internal ref like #/$defs/context: just use fragment
         anchor_name = fragment_anchor
     elif len(parts) > 1:
@@ -680,12 +1442,53 @@ def define_env(env):
 
     return base_disp
 
+  # Rendered tables, keyed by the schema content and every render input.
+  # Rendering is pure for a given schema, so shared types (line_item,
+  # buyer, totals, ...) embedded across pages are rendered once per build.
+  # Entries keep the files the render read, replayed on every hit.
+  _render_cache: dict[tuple, tuple[str, frozenset[Path]]] = {}
+
   def _render_table_from_schema(
     schema_data,
     spec_file_name,
     need_header=True,
     parent_required_list=None,
     context=None,
+  ):
+    """Render a Markdown table from a schema dictionary, with memoization.
+
+    See _render_table_from_schema_uncached for the arguments. The key
+    serializes the schema without sorting keys, since property order
+    determines row order.
+    """
+    if not schema_data:
+      return "_No content fields defined._"
+    key = (
+      json.dumps(schema_data),
+      spec_file_name,
+      need_header,
+      tuple(parent_required_list or ()),
+      tuple(sorted(context.items())) if context else None,
+    )
+    cached = _render_cache.get(key)
+    if cached is not None:
+      _render_cache_stats["hits"] += 1
+      _record_dependency(*cached[1])
+      return cached[0]
+    _render_cache_stats["misses"] += 1
+    with _collect_dependencies() as deps:
+      table = _render_table_from_schema_uncached(
+        schema_data, spec_file_name, need_header, parent_required_list, context
+      )
+    _render_cache[key] = (table, frozenset(deps))
+    return table
+
+  def _render_table_from_schema_uncached(
+    schema_data,
+    spec_file_name,
+    need_header=True,
+    parent_required_list=None,
+    context=None,
   ):
     """Render a Markdown table from a schema dictionary.
 
@@ -834,21 +1637,19 @@ def define_env(env):
         if ref and "ucp.json#/$defs/" in ref and "$defs" in ref:
           def_name = ref.split("/")[-1]
           try:
-            with UCP_SCHEMA_PATH.open(encoding="utf-8") as f:
-              ucp_data = json.load(f)
-              resolved_def = ucp_data.get("$defs", {}).get(def_name)
-              if resolved_def:
-                # Merge resolved def into details, preserving embedder's
-                # description. The resolved def (e.g. allOf with base +
-                # status const) replaces the bare $ref.
-                embedder_desc = details.get("description")
-                details = dict(resolved_def)
-                if embedder_desc:
-                  details["description"] = embedder_desc
-                ref = None
-                f_type = details.get("type", "any")
+            resolved_def = _ucp_definitions().get(def_name)
           except (json.JSONDecodeError, OSError):
-            pass
+            resolved_def = None
+          if resolved_def:
+            # Merge resolved def into details, preserving embedder's
+            # description. The resolved def (e.g. allOf with base +
+            # status const) replaces the bare $ref.
+            embedder_desc = details.get("description")
+            details = dict(resolved_def)
+            if embedder_desc:
+              details["description"] = embedder_desc
+            ref = None
+            f_type = details.get("type", "any")
 
         # Check for Array specific logic
         items = details.get("items", {})
@@ -858,9 +1659,7 @@ def define_env(env):
         version_data = None
         if ref and ref.endswith("#/$defs/version"):
           try:
-            with UCP_SCHEMA_PATH.open(encoding="utf-8") as f:
-              data = json.load(f)
-              version_data = data.get("$defs", {}).get("version", {})
+            version_data = _ucp_definitions().get("version", {})
           except json.JSONDecodeError as e:
             print(f"**Error loading schema {'ucp.json' + ref}':** {e}")
 
@@ -981,22 +1780,24 @@ def define_env(env):
         f"Malformed entity name: {entity_name}{get_error_context()}"
       ) from None
 
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / core_entity_name
-      if not full_path.exists():
-        continue
+    full_path = SCHEMA_REGISTRY.find(core_entity_name)
+    if full_path is not None:
       # Use ucp-schema to resolve the full file with bundling
       bundled = _resolve_schema_bundled(full_path)
       if bundled:
         # Extract the $def from the bundled result
-        embedded_schema_data = _resolve_json_pointer(def_path, bundled)
+        embedded_schema_data = schema_resolver.resolve_json_pointer(
+          def_path, bundled
+        )
         if embedded_schema_data is not None:
           # Resolve internal refs (like #/$defs/base) against the bundled root
           if "allOf" in embedded_schema_data:
             new_all_of = []
             for item in embedded_schema_data["allOf"]:
               if "$ref" in item and item["$ref"].startswith("#"):
-                resolved = _resolve_json_pointer(item["$ref"], bundled)
+                resolved = schema_resolver.resolve_json_pointer(
+                  item["$ref"], bundled
+                )
                 new_all_of.append(resolved if resolved else item)
               else:
                 new_all_of.append(item)
@@ -1027,7 +1828,6 @@ def define_env(env):
             f"Definition '{def_path}' not found in '{full_path}'"
             f"{get_error_context()}"
           )
-      # Try next directory if resolution failed
 
     raise FileNotFoundError(
       f"Schema file '{core_entity_name}' not found in any schema"
@@ -1058,7 +1858,7 @@ def define_env(env):
     """
     name = Path(str(ref_path).split("#", 1)[0]).stem
     candidate = COMMON_TYPES_DIR / (name + ".json")
-    return candidate if candidate.exists() else None
+    return candidate if candidate in SCHEMA_REGISTRY else None
 
   def _render_shared_type_link(canonical_name, spec_file_name):
     """Emit a Markdown link to the `reference.md` entry for a shared type.
@@ -1098,7 +1898,7 @@ def define_env(env):
     )
 
   # --- MACRO 1: For Standalone JSON Schemas ---
-  @env.macro
+  @_macro
   def schema_fields(entity_name, spec_file_name, render_inline=True):
     """Parse a standalone JSON Schema file and render a table.
 
@@ -1165,10 +1965,8 @@ def define_env(env):
     # Build context for downstream link generation
     context = {"io_type": direction, "operation_id": operation}
 
-    for schemas_dir in schemas_dirs:
-      full_path = Path(schemas_dir) / (base_name + ".json")
-      if not full_path.exists():
-        continue
+    full_path = SCHEMA_REGISTRY.find(base_name + ".json")
+    if full_path is not None:
       # Resolve WITHOUT bundling to preserve $refs for hyperlinks
       resolved_schema = _resolve_schema(
         full_path, direction, operation, bundle=False
@@ -1189,7 +1987,7 @@ def define_env(env):
       f"{get_error_context()}."
     )
 
-  @env.macro
+  @_macro
   def extension_schema_fields(entity_name, spec_file_name, render_inline=True):
     """Parse a standalone JSON Schema file and render a table.
 
@@ -1223,7 +2021,7 @@ def define_env(env):
         return create_link(entity_name, spec_file_name)
     return _read_schema_from_defs(entity_name, spec_file_name)
 
-  @env.macro
+  @_macro
   def auto_generate_schema_reference(
     sub_dir=".",
     spec_file_name="reference",
@@ -1337,7 +2135,7 @@ def define_env(env):
     return "\n".join(output)
 
   # --- MACRO 2: For Standalone JSON Extensions ---
-  @env.macro
+  @_macro
   def extension_fields(entity_name, spec_file_name, target="checkout"):
     """Parse an extension schema file and render a table from its $defs.
 
@@ -1354,6 +2152,7 @@ def define_env(env):
     """
     # Construct full path based on new structure
     full_path = SHOPPING_SCHEMAS_DIR / (entity_name + ".json")
+    _record_dependency(full_path)
     try:
       with full_path.open(encoding="utf-8") as f:
         data = json.load(f)
@@ -1395,7 +2194,7 @@ def define_env(env):
       ) from e
 
   # --- MACRO 3: For Transport Operations ---
-  @env.macro
+  @_macro
   def method_fields(operation_id, file_name, spec_file_name, io_type=None):
     """Extract Request/Response schemas for a specific OpenAPI operationId.
 
@@ -1409,94 +2208,19 @@ def define_env(env):
         both (if None).
 
     """
-    full_path = OPENAPI_DIR / file_name
-
     try:
-      with full_path.open(encoding="utf-8") as f:
-        data = json.load(f)
-
-      # 1. Find the Operation Object by ID (search paths first, then webhooks)
-      operation = None
-      path_parameters = []
-
-      # Search in paths
-      paths = data.get("paths", {})
-      for _, path_item in paths.items():
-        for _, op_data in path_item.items():
-          if not isinstance(op_data, dict):
-            continue
-          if op_data.get("operationId") == operation_id:
-            operation = op_data
-            path_parameters = path_item.get("parameters", [])
-            break
-        if operation:
-          break
-
-      # If not found in paths, search in webhooks (OpenAPI 3.1+)
-      if not operation:
-        webhooks = data.get("webhooks", {})
-        for _, webhook_item in webhooks.items():
-          for _, op_data in webhook_item.items():
-            if not isinstance(op_data, dict):
-              continue
-            if op_data.get("operationId") == operation_id:
-              operation = op_data
-              break
-          if operation:
-            break
-
-      if not operation:
+      # 1. Find the Operation Object by ID (paths first, then webhooks)
+      entry = OPERATION_INDEX.get(
+        file_name, operation_id, kinds=("path", "webhook")
+      )
+      if not entry:
         raise ValueError(
           f"Operation ID `{operation_id}` not found{get_error_context()}."
         )
-
-      # 2. Extract Request Schema
-      req_content = operation.get("requestBody", {}).get("content", {})
-      req_schema = req_content.get("application/json", {}).get("schema", {})
-
-      # 3. Extract Parameters (Path + Operation)
-      op_parameters = operation.get("parameters", [])
-      all_parameters = path_parameters + op_parameters
-
-      # 4. Extract Response Schema
-      success_response_codes = ["200", "201"]
-      res_schema = {}
-      res = operation.get("responses", {})
-      for code in success_response_codes:
-        if code in res:
-          res_content = res.get(code, {}).get("content", {})
-          res_schema = res_content.get("application/json", {}).get("schema", {})
-          break
-
-      # --- FIX: Targeted Reference Resolution ---
-      # We only resolve the top-level ref and 'allOf' children.
-      # This fixes the "Complete Checkout" table without expanding every
-      # property.
-
-      def resolve_structure(schema, root):
-        if not schema:
-          return schema
-        # 1. Resolve Top-Level Ref (e.g. "create_checkout")
-        if "$ref" in schema and schema["$ref"].startswith("#/"):
-          resolved = _resolve_json_pointer(schema["$ref"], root)
-          if resolved:
-            schema = resolved
-
-        # 2. Resolve Composition Refs (e.g. "complete_checkout" response)
-        if "allOf" in schema:
-          new_all_of = []
-          for item in schema["allOf"]:
-            if "$ref" in item and item["$ref"].startswith("#/"):
-              resolved = _resolve_json_pointer(item["$ref"], root)
-              new_all_of.append(resolved if resolved else item)
-            else:
-              new_all_of.append(item)
-          schema["allOf"] = new_all_of
-        return schema
-
-      req_schema = resolve_structure(req_schema, data)
-      res_schema = resolve_structure(res_schema, data)
-      # ------------------------------------------
+      data = entry["document"]
+      all_parameters = entry["parameters"]
+      req_schema = entry["request_schema"]
+      res_schema = entry["response_schema"]
 
       output = ""
 
@@ -1510,7 +2234,7 @@ def define_env(env):
           # Resolve param refs explicitly if needed (rare for params but good
           # safety)
           if "$ref" in param and param["$ref"].startswith("#/"):
-            resolved = _resolve_json_pointer(param["$ref"], data)
+            resolved = schema_resolver.resolve_json_pointer(param["$ref"], data)
             if resolved:
               param = resolved
 
@@ -1588,7 +2312,7 @@ def define_env(env):
       ) from e
 
   # --- MACRO 4: For HTTP Headers ---
-  @env.macro
+  @_macro
   def header_fields(operation_id, file_name):
     """Extract HTTP headers for a specific OpenAPI operationId.
 
@@ -1598,71 +2322,15 @@ def define_env(env):
       file_name: The name of the OpenAPI file to read.
 
     """
-    full_path = OPENAPI_DIR / file_name
-
     try:
-      with full_path.open(encoding="utf-8") as f:
-        data = json.load(f)
-
       # 1. Find the Operation Object by ID
-      operation = None
-      path_parameters = []
-      paths = data.get("paths", {})
-      for _, path_item in paths.items():
-        for _, op_data in path_item.items():
-          if not isinstance(op_data, dict):
-            continue
-
-          if op_data.get("operationId") == operation_id:
-            operation = op_data
-            # Extract parameters defined at the path level
-            path_parameters = path_item.get("parameters", [])
-            break
-        if operation:
-          break
-
-      if not operation:
+      entry = OPERATION_INDEX.get(file_name, operation_id, kinds=("path",))
+      if not entry:
         raise ValueError(
           f"Operation ID `{operation_id}` not found{get_error_context()}."
         )
-
-      # 2. Extract Request Parameters (Path + Operation)
-      op_parameters = operation.get("parameters", [])
-      all_parameters = path_parameters + op_parameters
-
-      req_headers = []
-      for param in all_parameters:
-        # Resolve reference if needed
-        if "$ref" in param:
-          resolved = _resolve_json_pointer(param["$ref"], data)
-          if resolved:
-            param = resolved
-          else:
-            continue
-
-        if param.get("in") == "header":
-          req_headers.append(param)
-
-      # 3. Extract Response Headers (Assumes 200 OK)
-      res_headers_defs = (
-        operation.get("responses", {}).get("200", {}).get("headers", {})
-      )
-      res_headers = []
-      for name, header in res_headers_defs.items():
-        if "$ref" in header:
-          resolved = _resolve_json_pointer(header["$ref"], data)
-          if resolved:
-            h = resolved.copy()
-            h["name"] = name
-            res_headers.append(h)
-          else:
-            # If ref not resolved, just use name
-            h = {"name": name, "description": "Ref not resolved"}
-            res_headers.append(h)
-        else:
-          h = header.copy()
-          h["name"] = name
-          res_headers.append(h)
+      req_headers = entry["request_headers"]
+      res_headers = entry["response_headers"]
 
       if not req_headers and not res_headers:
         return "_No headers defined._"
@@ -1696,3 +2364,66 @@ def define_env(env):
       raise RuntimeError(
         f"Error processing OpenAPI: {e}{get_error_context()}"
       ) from e
+
+
+def _check_link_anchors(site_dir: Path) -> None:
+  """Report emitted links whose anchor is missing from the built page.
+
+  Target pages that are not part of this build (e.g. spec pages in root
+  mode) are skipped. Missing anchors are logged as a warning, so drift
+  between link anchors and headings fails `--strict` builds.
+  """
+  missing = []
+  page_ids: dict[str, set[str] | None] = {}
+  for (spec_page, anchor), sources in sorted(_emitted_links.items()):
+    if spec_page not in page_ids:
+      html = site_dir / "specification" / spec_page / "index.html"
+      page_ids[spec_page] = (
+        set(_HTML_ID_RE.findall(html.read_text(encoding="utf-8")))
+        if html.is_file()
+        else None
+      )
+    ids = page_ids[spec_page]
+    if ids is not None and anchor not in ids:
+      missing.append(
+        f"  specification/{spec_page}/#{anchor} "
+        f"(linked from {', '.join(sorted(sources))})"
+      )
+  if missing:
+    log.warning(
+      f"{len(missing)} schema link anchor(s) not found on their target "
+      "page:\n" + "\n".join(missing)
+    )
+
+
+def on_post_build(env):
+  """Check link anchors, persist the macro memo and report cache stats."""
+  _check_link_anchors(Path(env.conf["site_dir"]))
+  build_profile.cache(
+    "rendered_table",
+    _render_cache_stats["hits"],
+    _render_cache_stats["misses"],
+  )
+  if _disk_cache is not None:
+    build_profile.cache(
+      "resolved_schema_disk", _disk_cache.hits, _disk_cache.misses
+    )
+  _save_schema_variants(replace=_macro_memo is None or not _macro_memo.hits)
+  if _macro_memo is not None:
+    build_profile.cache("macro_memo", _macro_memo.hits, _macro_memo.misses)
+    _macro_memo.save()
+    log.debug(
+      "Macro memo: %d reused, %d rendered; re-rendered pages: %s",
+      _macro_memo.hits,
+      _macro_memo.misses,
+      ", ".join(sorted(_macro_memo.rendered_pages)) or "none",
+    )
+  hits = _render_cache_stats["hits"]
+  total = hits + _render_cache_stats["misses"]
+  if total:
+    log.debug(
+      "Rendered-table cache: %d/%d hits (%.0f%%)",
+      hits,
+      total,
+      100 * hits / total,
+    )
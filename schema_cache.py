@@ -0,0 +1,238 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Persistent, content-addressed cache for resolved UCP schemas.
+
+Shared by the docs macros (main.py) and scripts/validate_examples.py so a
+schema resolved once is reused by every later build, `mkdocs serve` restart
+and validator run until something that affects its output changes.
+
+An entry is keyed by a SHA-256 over:
+1. The content of the schema file and of every file in its transitive
+   $ref closure (with paths relative to the schema, so worktrees of the
+   same tree share entries)
+2. The direction/op/bundle flags
+3. The resolver engine identity (e.g. `ucp-schema --version`)
+
+Entries are written atomically and evicted least-recently-used once the
+cache exceeds its size budget.
+
+Environment:
+  UCP_SCHEMA_CACHE=0          disable the cache
+  UCP_SCHEMA_CACHE_DIR=PATH   cache location (default: .cache/ucp-schema)
+  UCP_SCHEMA_CACHE_MAX_MB=N   size budget in MiB (default: 256)
+"""
+
+import functools
+import hashlib
+import json
+import os
+from pathlib import Path
+import subprocess
+import tempfile
+import threading
+from typing import Any
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "ucp-schema"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@functools.cache
+def ucp_schema_version() -> str | None:
+  """Return `ucp-schema --version`, or None if the binary is unavailable."""
+  try:
+    result = subprocess.run(
+      ["ucp-schema", "--version"], capture_output=True, text=True, check=False
+    )
+  except OSError:
+    return None
+  return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _iter_refs(node: Any):
+  """Yield every string $ref value in a JSON document."""
+  stack = [node]
+  while stack:
+    current = stack.pop()
+    if isinstance(current, dict):
+      ref = current.get("$ref")
+      if isinstance(ref, str):
+        yield ref
+      stack.extend(current.values())
+    elif isinstance(current, list):
+      stack.extend(current)
+
+
+# (path, mtime_ns, size) -> (content digest, local $ref targets)
+_file_info: dict[tuple, tuple[str, list[Path]]] = {}
+
+
+def _describe_file(path: Path) -> tuple[str, list[Path]]:
+  """Return the content digest and local $ref targets of one file."""
+  stat = path.stat()
+  info_key = (path, stat.st_mtime_ns, stat.st_size)
+  info = _file_info.get(info_key)
+  if info is None:
+    raw = path.read_bytes()
+    targets = []
+    try:
+      document = json.loads(raw)
+    except ValueError:
+      document = None
+    for ref in _iter_refs(document):
+      target = ref.split("#", 1)[0]
+      if target and "://" not in target:
+        targets.append((path.parent / target).resolve())
+    info = (hashlib.sha256(raw).hexdigest(), targets)
+    _file_info[info_key] = info
+  return info
+
+
+def file_digest(path: str | Path) -> str | None:
+  """Return the SHA-256 of a file's content, or None if it is unreadable."""
+  try:
+    return _describe_file(Path(path).resolve())[0]
+  except OSError:
+    return None
+
+
+def ref_closure(schema_path: str | Path) -> list[tuple[Path, str]]:
+  """Return (path, digest) for a schema and every file it transitively $refs.
+
+  Files are listed in depth-first order starting with the schema itself.
+  Raises OSError if any file in the closure cannot be read.
+  """
+  closure = []
+  seen: set[Path] = set()
+  pending = [Path(schema_path).resolve()]
+  while pending:
+    path = pending.pop()
+    if path in seen:
+      continue
+    seen.add(path)
+    content_hash, targets = _describe_file(path)
+    closure.append((path, content_hash))
+    pending.extend(sorted(targets, reverse=True))
+  return closure
+
+
+class SchemaCache:
+  """On-disk cache of resolved schemas, keyed by content and flags."""
+
+  def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+    """Create a cache rooted at `directory` (created on first write)."""
+    self.directory = Path(directory)
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    self._lock = threading.Lock()
+    self._size: int | None = None
+    self._made_dirs: set[Path] = set()
+
+  @classmethod
+  def from_env(cls) -> "SchemaCache | None":
+    """Build the cache configured by the environment, or None if disabled."""
+    if os.environ.get("UCP_SCHEMA_CACHE", "1") == "0":
+      return None
+    directory = os.environ.get("UCP_SCHEMA_CACHE_DIR") or DEFAULT_CACHE_DIR
+    max_mb = os.environ.get("UCP_SCHEMA_CACHE_MAX_MB")
+    max_bytes = int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+    return cls(Path(directory), max_bytes)
+
+  # --- Keys ---
+
+  def key(self, schema_path: str | Path, *flags: Any) -> str | None:
+    """Compute the cache key for a schema and its resolution flags.
+
+    Returns None when the schema or a file it references cannot be read;
+    such variants are not cached so the resolver reports the error.
+    """
+    root = Path(schema_path).resolve()
+    digest = hashlib.sha256(json.dumps(flags).encode())
+    try:
+      closure = ref_closure(root)
+    except OSError:
+      return None
+    for path, content_hash in closure:
+      relative = os.path.relpath(path, root.parent)
+      digest.update(f"\0{relative}\0{content_hash}".encode())
+    return digest.hexdigest()
+
+  # --- Entries ---
+
+  def _entry_path(self, key: str) -> Path:
+    return self.directory / key[:2] / f"{key}.json"
+
+  def get(self, key: str | None) -> Any | None:
+    """Return the cached value for `key`, or None on a miss."""
+    if key is None:
+      return None
+    entry = self._entry_path(key)
+    try:
+      value = json.loads(entry.read_bytes())
+      os.utime(entry)  # Mark as recently used for eviction
+    except (OSError, ValueError):
+      self.misses += 1
+      return None
+    self.hits += 1
+    return value
+
+  def put(self, key: str | None, value: Any) -> None:
+    """Store `value` under `key` atomically, then enforce the size budget."""
+    if key is None:
+      return
+    entry = self._entry_path(key)
+    payload = json.dumps(value, separators=(",", ":")).encode()
+    try:
+      if entry.parent not in self._made_dirs:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        self._made_dirs.add(entry.parent)
+      with tempfile.NamedTemporaryFile(
+        dir=entry.parent, suffix=".tmp", delete=False
+      ) as f:
+        f.write(payload)
+      Path(f.name).replace(entry)
+    except OSError:
+      # A read-only or full cache directory must never fail resolution.
+      return
+    with self._lock:
+      if self._size is None:
+        self._size = sum(size for _, size, _ in self._entries())
+      else:
+        self._size += len(payload)
+      if self._size > self.max_bytes:
+        self._evict()
+
+  def _entries(self) -> list[tuple[float, int, Path]]:
+    entries = []
+    for entry in self.directory.glob("*/*.json"):
+      try:
+        stat = entry.stat()
+      except OSError:
+        continue
+      entries.append((stat.st_mtime, stat.st_size, entry))
+    return entries
+
+  def _evict(self) -> None:
+    """Drop least-recently-used entries until back under the budget."""
+    entries = sorted(self._entries())
+    self._size = sum(size for _, size, _ in entries)
+    for _, size, entry in entries:
+      if self._size <= self.max_bytes:
+        break
+      try:
+        entry.unlink()
+      except OSError:
+        continue
+      self._size -= size
@@ -0,0 +1,762 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Publish source/ into the site directory (hooks.py on_post_build).
+
+Each JSON file is processed for deployment and written to the path named
+by its original $id:
+1. Resolve relative $ref to absolute URLs (using $id from referenced files)
+2. Inject versions for versioned entities and transport artifacts
+3. Rewrite all ucp.dev/schemas/ URLs to include the version
+
+`transform` applies all three in a single iterative pass. The per-step
+functions are kept as its reference implementation, which
+scripts/benchmark_publish.py checks it against.
+
+Next to each processed JSON file, the minified form (`X.min.json`) and
+precompressed sidecars of both forms (`.gz`, plus `.br` when the optional
+`brotli` package is installed) are published. `etags.json` at the site
+root maps every published file to a strong ETag (its quoted SHA-256) and
+byte size, for static hosts and clients making conditional requests.
+`schema-index.json` lists every published $id with its path, hash, size,
+name/version and direct and transitive $ref dependencies, so clients can
+prefetch a capability's closure and refetch only what changed.
+
+Other files are copied as-is, as is any JSON file that fails to process.
+
+Schemas derived at build time (e.g. main.py's bundled per-operation
+schemas) are published through the same steps via `register_generator`.
+
+Files are published serially by default. Setting `UCP_PUBLISH_WORKERS`
+above 1 spreads trees of at least PUBLISH_POOL_MIN_FILES files over a
+process pool; below that, starting the workers costs more than the work.
+Outputs are written atomically into a staging tree under .cache/publish/,
+one per published version, and hard-linked (or copied) from there into
+site_dir. MkDocs empties site_dir before every build, but the staging tree
+survives, so outputs whose content it already holds are not rewritten; a
+manifest of each output's hash, size and mtime lets most of those checks
+skip reading the file.
+
+Workers hand their log records back to the build process, so their
+warnings still count towards `mkdocs build --strict`.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+try:
+  import brotli
+except ImportError:  # Optional: without it no .br sidecars are published
+  brotli = None
+
+log = logging.getLogger("mkdocs")
+
+# URL prefix for UCP schemas that need version injection
+UCP_SCHEMA_PREFIX = "https://ucp.dev/schemas/"
+
+# Worker processes for publish(); 0 or 1 publishes serially. Serial is the
+# default: the whole tree publishes in a fraction of a second, and a pool only
+# pays off for trees of at least PUBLISH_POOL_MIN_FILES files.
+PUBLISH_WORKERS = int(os.environ.get("UCP_PUBLISH_WORKERS", 0))
+PUBLISH_POOL_MIN_FILES = 2000
+
+# Site paths of the ETag/size manifest of every published file and of the
+# $id dependency index.
+ETAG_MANIFEST = "etags.json"
+SCHEMA_INDEX = "schema-index.json"
+
+# name -> callable yielding (site path, schema, source file) to publish
+# alongside source/. Keyed by name so each build's registration replaces
+# the previous one's under `mkdocs serve`.
+_generators: dict = {}
+
+
+def register_generator(name: str, generator) -> None:
+  """Publish the schemas `generator()` yields with the next publish() call.
+
+  `generator` is called without arguments and yields (site path, parsed
+  schema, source file) tuples. The schema is published like a processed
+  source file, with relative $refs resolved against the source file's
+  directory; the caller must not share it, as publishing mutates it.
+  """
+  _generators[name] = generator
+
+
+# --- Transforms ---
+
+
+def _load_json_documents(base_dir):
+  """Parse every JSON file under base_dir once.
+
+  Returns a dict mapping each resolved path to its parsed document, or to
+  the exception raised while reading it.
+  """
+  documents = {}
+  for path in base_dir.rglob("*.json"):
+    if path.is_file():
+      documents[path.resolve()] = _read_json(path)
+  return documents
+
+
+def _read_json(path):
+  """Return the parsed JSON file, or the exception raised reading it."""
+  try:
+    with path.open("r", encoding="utf-8") as f:
+      return json.load(f)
+  except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+    return e
+
+
+def _schema_id(document):
+  """Return a parsed document's $id, None if absent, or a read exception."""
+  if isinstance(document, Exception):
+    return document
+  if isinstance(document, dict) and "$id" in document:
+    return document["$id"]
+  return None
+
+
+def _process_refs(data, current_file_dir, url_version=None, id_index=None):
+  """Recursively resolve relative $ref paths to absolute URLs.
+
+  Uses the referenced file's $id to construct the absolute URL. Only
+  processes relative refs (not # fragments or http URLs).
+
+  id_index maps resolved paths to their $id (see _schema_id); files not in
+  it are read on first use and added.
+  """
+  if id_index is None:
+    id_index = {}
+  if isinstance(data, dict):
+    for key, value in data.items():
+      if (
+        key == "$ref"
+        and isinstance(value, str)
+        and not value.startswith(("#", "http"))
+      ):
+        ref_parts = value.split("#", 1)
+        relative_path = ref_parts[0]
+        fragment = f"#{ref_parts[1]}" if len(ref_parts) > 1 else ""
+
+        if not relative_path:
+          continue
+
+        ref_file_path = (current_file_dir / relative_path).resolve()
+        if ref_file_path not in id_index:
+          id_index[ref_file_path] = _schema_id(_read_json(ref_file_path))
+        ref_id = id_index[ref_file_path]
+
+        if isinstance(ref_id, FileNotFoundError):
+          log.error(
+            f"Referenced file not found: {ref_file_path}. "
+            f"Keeping original '$ref': {value}"
+          )
+        elif isinstance(ref_id, Exception):
+          log.error(
+            f"Failed to read referenced file {ref_file_path}: {ref_id}. "
+            f"Keeping original '$ref': {value}"
+          )
+        elif ref_id is None:
+          log.warning(
+            f"No '$id' found in {ref_file_path}. "
+            f"Keeping original '$ref': {value}"
+          )
+        else:
+          if url_version and ref_id.startswith(UCP_SCHEMA_PREFIX):
+            versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
+            ref_id = ref_id.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
+          data[key] = ref_id + fragment
+      else:
+        _process_refs(value, current_file_dir, url_version, id_index)
+  elif isinstance(data, list):
+    for item in data:
+      _process_refs(item, current_file_dir, url_version, id_index)
+
+
+def _rewrite_version_urls(data, url_version):
+  """Recursively rewrite ucp.dev/schemas/ URLs to include version.
+
+  Transforms: https://ucp.dev/schemas/X
+  -> https://ucp.dev/{url_version}/schemas/X
+
+  This ensures $id matches the deployed URL and $ref resolves correctly.
+  Applied to both $id and $ref fields.
+  """
+  versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
+
+  if isinstance(data, dict):
+    for key, value in data.items():
+      if (
+        key in ("$id", "$ref")
+        and isinstance(value, str)
+        and value.startswith(UCP_SCHEMA_PREFIX)
+      ):
+        data[key] = value.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
+      else:
+        _rewrite_version_urls(value, url_version)
+  elif isinstance(data, list):
+    for item in data:
+      _rewrite_version_urls(item, url_version)
+
+
+def _set_schema_version(data, version):
+  """Set versions for versioned entities and transport artifacts.
+
+  UCP-authored capability and extension schemas require version per
+  ucp.json#/$defs/entity. Build injects the release version only for dev.ucp.*
+  schemas published in the core release. Third-party extensions and payment
+  handlers retain their author-controlled versions; the UCP payment-handler
+  meta-schema has no name and defines only the shared declaration structure.
+
+  For OpenAPI and OpenRPC transport specifications, set the required
+  info.version field as release artifact metadata.
+  """
+  if str(data.get("name", "")).startswith("dev.ucp."):
+    data["version"] = version
+
+  if ("openapi" in data or "openrpc" in data) and isinstance(
+    data["info"], dict
+  ):
+    data["info"]["version"] = version
+
+
+def _resolve_ref(value, current_file_dir, id_index):
+  """Return the absolute URL for a relative $ref, or None to keep it.
+
+  Logs why a ref is kept, exactly as _process_refs does.
+  """
+  relative_path, separator, fragment = value.partition("#")
+  if not relative_path:
+    return None
+  ref_file_path = (current_file_dir / relative_path).resolve()
+  if ref_file_path not in id_index:
+    id_index[ref_file_path] = _schema_id(_read_json(ref_file_path))
+  ref_id = id_index[ref_file_path]
+
+  if isinstance(ref_id, FileNotFoundError):
+    log.error(
+      f"Referenced file not found: {ref_file_path}. "
+      f"Keeping original '$ref': {value}"
+    )
+  elif isinstance(ref_id, Exception):
+    log.error(
+      f"Failed to read referenced file {ref_file_path}: {ref_id}. "
+      f"Keeping original '$ref': {value}"
+    )
+  elif ref_id is None:
+    log.warning(
+      f"No '$id' found in {ref_file_path}. Keeping original '$ref': {value}"
+    )
+  else:
+    return ref_id + separator + fragment
+  return None
+
+
+def transform(
+  data, current_file_dir, id_index, url_version=None, schema_version=None
+):
+  """Prepare a parsed schema for publishing, in place and in one pass.
+
+  Equivalent to _process_refs, then _set_schema_version (if
+  schema_version), then _rewrite_version_urls (if url_version), including
+  the order of logged messages, but walks the document once with an
+  explicit stack instead of three recursive traversals.
+  """
+  if schema_version and isinstance(data, dict):
+    _set_schema_version(data, schema_version)
+  versioned_prefix = f"https://ucp.dev/{url_version}/schemas/"
+
+  # (container, iterator over its (key, value) pairs); depth-first, in
+  # document order like the recursive functions.
+  stack = [(data, _entries(data))]
+  while stack:
+    container, entries = stack[-1]
+    entry = next(entries, None)
+    if entry is None:
+      stack.pop()
+      continue
+    key, value = entry
+    if key in ("$ref", "$id") and isinstance(value, str):
+      if key == "$ref" and not value.startswith(("#", "http")):
+        value = _resolve_ref(value, current_file_dir, id_index) or value
+      if url_version and value.startswith(UCP_SCHEMA_PREFIX):
+        value = value.replace(UCP_SCHEMA_PREFIX, versioned_prefix, 1)
+      container[key] = value
+    elif isinstance(value, (dict, list)):
+      stack.append((value, _entries(value)))
+
+
+def _entries(node):
+  """Iterate (key, value) of a dict, or (index, item) of a list."""
+  if isinstance(node, dict):
+    return iter(node.items())
+  if isinstance(node, list):
+    return enumerate(node)
+  return iter(())
+
+
+# --- Output ---
+
+# Staging trees of published files and their manifests, one per published
+# version. Kept outside the site directory, which MkDocs empties before every
+# build, so they outlive it and are never deployed.
+STAGING_DIR = Path(__file__).resolve().parent / ".cache" / "publish"
+
+
+def _staging_paths(url_version, schema_version) -> tuple[Path, Path]:
+  """Return the staging tree and manifest path for one published version."""
+  key = hashlib.sha256(f"{url_version}\0{schema_version}".encode())
+  key = key.hexdigest()[:16]
+  return STAGING_DIR / key, STAGING_DIR / f"{key}.json"
+
+
+def _load_manifest(path: Path) -> dict[str, list]:
+  """Return site path -> [sha256, size, mtime_ns] from the last publish."""
+  try:
+    manifest = json.loads(path.read_bytes())
+  except (OSError, ValueError):
+    return {}
+  return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(path: Path, manifest: dict[str, list]) -> None:
+  payload = json.dumps(manifest, sort_keys=True).encode()
+  try:
+    _write_atomic(path, lambda t: t.write_bytes(payload))
+  except OSError as e:
+    log.debug(f"Could not save publish manifest: {e}")
+
+
+def _write_atomic(dest_file: Path, write) -> None:
+  """Create dest_file via a temporary sibling so readers never see a partial.
+
+  `write` is called with the temporary file's path.
+  """
+  dest_file.parent.mkdir(exist_ok=True, parents=True)
+  fd, tmp_name = tempfile.mkstemp(dir=dest_file.parent, suffix=".tmp")
+  os.close(fd)
+  try:
+    write(Path(tmp_name))
+    Path(tmp_name).replace(dest_file)
+  except BaseException:
+    Path(tmp_name).unlink(missing_ok=True)
+    raise
+
+
+def _link_output(staged_file: Path, dest_file: Path) -> None:
+  """Place a staged output at dest_file, as a hard link where possible.
+
+  Staged files are only ever replaced, never modified in place, so sharing
+  the inode with the site copy is safe.
+  """
+
+  def link(tmp: Path) -> None:
+    tmp.unlink()
+    try:
+      os.link(staged_file, tmp)
+    except OSError:
+      shutil.copy2(staged_file, tmp)
+
+  _write_atomic(dest_file, link)
+
+
+def _is_current(dest_file: Path, digest: str, size: int, entry) -> bool:
+  """Return whether dest_file already holds content with this digest.
+
+  A manifest entry that still matches the file's size and mtime vouches
+  for it without a read; otherwise a same-size file is compared by hash.
+  """
+  try:
+    stat = dest_file.stat()
+  except OSError:
+    return False
+  if stat.st_size != size:
+    return False
+  if entry == [digest, stat.st_size, stat.st_mtime_ns]:
+    return True
+  return hashlib.sha256(dest_file.read_bytes()).hexdigest() == digest
+
+
+def _entry_is_current(dest_file: Path, entry) -> bool:
+  """Return whether dest_file's size and mtime still match its entry."""
+  try:
+    stat = dest_file.stat()
+  except OSError:
+    return False
+  return entry is not None and entry[1:] == [stat.st_size, stat.st_mtime_ns]
+
+
+def _write_output(
+  dest_file: Path, payload: bytes, entry, src_file: Path | None = None
+) -> tuple[list, bool]:
+  """Write payload to dest_file unless it already holds exactly that.
+
+  With src_file, a changed output is copied from it (keeping its metadata)
+  instead. Returns the new manifest entry and whether the file was written.
+  """
+  digest = hashlib.sha256(payload).hexdigest()
+  written = not _is_current(dest_file, digest, len(payload), entry)
+  if written and src_file is None:
+    _write_atomic(dest_file, lambda tmp: tmp.write_bytes(payload))
+  elif written:
+    _write_atomic(dest_file, lambda tmp: shutil.copy2(src_file, tmp))
+  stat = dest_file.stat()
+  return [digest, stat.st_size, stat.st_mtime_ns], written
+
+
+def _derived_names(rel_path: str) -> list[str]:
+  """Return the site paths of the variants published for a schema."""
+  minified = f"{rel_path.removesuffix('.json')}.min.json"
+  suffixes = (".gz", ".br") if brotli is not None else (".gz",)
+  return [minified] + [
+    name + suffix for name in (rel_path, minified) for suffix in suffixes
+  ]
+
+
+def _derived_payloads(data, payload: bytes) -> list[bytes]:
+  """Return the variant contents, in _derived_names order."""
+  minified = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+  minified = minified.encode("utf-8")
+  payloads = [minified]
+  for body in (payload, minified):
+    # mtime=0 keeps the archive, and so its ETag, stable across builds.
+    payloads.append(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+      payloads.append(brotli.compress(body))
+  return payloads
+
+
+def _publish_derived(
+  site_dir: Path,
+  rel_path: str,
+  data,
+  payload: bytes,
+  changed: bool,
+  manifest: dict[str, list],
+) -> list[tuple[str, list, bool]]:
+  """Publish the minified and compressed variants of one schema."""
+  names = _derived_names(rel_path)
+  if not changed and all(
+    _entry_is_current(site_dir / name, manifest.get(name)) for name in names
+  ):
+    # Same schema output as last time: skip re-minifying and compressing.
+    return [(name, manifest[name], False) for name in names]
+  results = []
+  for name, body in zip(names, _derived_payloads(data, payload), strict=True):
+    entry, written = _write_output(site_dir / name, body, manifest.get(name))
+    if written:
+      log.debug("Wrote %s", site_dir / name)
+    results.append((name, entry, written))
+  return results
+
+
+def _publish_file(
+  src_file: Path,
+  rel_path: str,
+  site_dir: Path,
+  id_index: dict,
+  url_version: str | None,
+  schema_version: str | None,
+  manifest: dict[str, list],
+  data=None,
+) -> tuple[list[tuple[str, list, bool]], dict | None]:
+  """Publish one source file into site_dir, skipping unchanged outputs.
+
+  `data` is the file's parsed content when the caller already has it.
+  Returns the site path, manifest entry and whether it was written, for
+  each output, and the schema's index info (see _schema_info).
+  """
+  if not src_file.name.endswith(".json"):
+    entry, written = _write_output(
+      site_dir / rel_path,
+      src_file.read_bytes(),
+      manifest.get(rel_path),
+      src_file,
+    )
+    _log_output(written, "Copied %s to %s", src_file, site_dir / rel_path)
+    return [(rel_path, entry, written)], None
+
+  try:
+    if data is None:
+      data = _read_json(src_file)
+    if isinstance(data, Exception):
+      raise data
+
+    # Determine output path from ORIGINAL $id (before version rewrite).
+    # Mike deploys site/ to /{version}/, so we exclude version from path.
+    file_id = data.get("$id")
+    if file_id and file_id.startswith("https://ucp.dev"):
+      file_rel_path = file_id.removeprefix("https://ucp.dev").lstrip("/")
+    else:
+      file_rel_path = rel_path
+
+    # Resolve relative $ref, inject versions and version the URLs
+    transform(data, src_file.parent, id_index, url_version, schema_version)
+
+    return _publish_schema(
+      data, file_rel_path, site_dir, manifest, "Processed and copied", src_file
+    )
+
+  except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+    log.error("Failed to process JSON file %s, copying as-is: %s", src_file, e)
+    # Fallback to copying if processing fails
+    entry, written = _write_output(
+      site_dir / rel_path,
+      src_file.read_bytes(),
+      manifest.get(rel_path),
+      src_file,
+    )
+    return [(rel_path, entry, written)], None
+
+
+def _publish_generated(
+  rel_path: str,
+  data,
+  src_file: Path,
+  site_dir: Path,
+  id_index: dict,
+  url_version: str | None,
+  schema_version: str | None,
+  manifest: dict[str, list],
+) -> tuple[list[tuple[str, list, bool]], dict | None]:
+  """Publish one generated schema and its variants at rel_path."""
+  transform(data, src_file.parent, id_index, url_version, schema_version)
+  return _publish_schema(
+    data, rel_path, site_dir, manifest, "Generated from", src_file
+  )
+
+
+def _publish_schema(
+  data, rel_path: str, site_dir: Path, manifest, action: str, src_file: Path
+) -> tuple[list[tuple[str, list, bool]], dict | None]:
+  """Write a transformed schema and its variants; see _publish_file."""
+  dest_file = site_dir / rel_path
+  payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+  entry, written = _write_output(dest_file, payload, manifest.get(rel_path))
+  _log_output(written, f"{action} %s to %s", src_file, dest_file)
+  outputs = [(rel_path, entry, written)]
+  outputs += _publish_derived(
+    site_dir, rel_path, data, payload, written, manifest
+  )
+  return outputs, _schema_info(data, rel_path)
+
+
+def _schema_info(data, rel_path: str) -> dict | None:
+  """Return the index entry of a published schema, or None without $id.
+
+  `refs` are the $ids (fragments dropped) that its $refs point at.
+  """
+  schema_id = data.get("$id") if isinstance(data, dict) else None
+  if not isinstance(schema_id, str):
+    return None
+  refs = set()
+  stack = [data]
+  while stack:
+    node = stack.pop()
+    if isinstance(node, dict):
+      ref = node.get("$ref")
+      if isinstance(ref, str) and not ref.startswith("#"):
+        refs.add(ref.split("#", 1)[0])
+      stack.extend(node.values())
+    elif isinstance(node, list):
+      stack.extend(node)
+  refs.discard(schema_id)
+  info = {"id": schema_id, "path": rel_path}
+  for key in ("name", "version"):
+    if key in data:
+      info[key] = data[key]
+  info["refs"] = sorted(refs)
+  return info
+
+
+def _schema_index(infos: list[dict], entries: dict[str, list]) -> dict:
+  """Build the $id index from _schema_info entries and output hashes."""
+  direct = {info["id"]: info["refs"] for info in infos}
+  schemas = {}
+  for info in sorted(infos, key=lambda i: i["id"]):
+    closure = set()
+    pending = list(info["refs"])
+    while pending:
+      ref = pending.pop()
+      if ref not in closure:
+        closure.add(ref)
+        pending.extend(direct.get(ref, ()))
+    closure.discard(info["id"])
+    digest, size, _ = entries[info["path"]]
+    schemas[info["id"]] = {
+      "path": info["path"],
+      "sha256": digest,
+      "size": size,
+      **{key: info[key] for key in ("name", "version") if key in info},
+      "refs": info["refs"],
+      "transitive_refs": sorted(closure),
+    }
+  return {"schemas": schemas}
+
+
+def _log_output(written: bool, message: str, src_file, dest_file) -> None:
+  if written:
+    log.info(message, src_file, dest_file)
+  else:
+    log.debug("Unchanged %s", dest_file)
+
+
+# --- Worker processes ---
+
+# Publishing arguments shared by every file, set once per worker.
+_worker_args: dict = {}
+# (level, message) of the records logged by the current task.
+_worker_records: list[tuple[int, str]] = []
+
+
+class _RecordCollector(logging.Handler):
+  def emit(self, record):
+    _worker_records.append((record.levelno, record.getMessage()))
+
+
+def _init_worker(level, publish_args):
+  """Capture the worker's log records instead of printing them."""
+  log.handlers[:] = [_RecordCollector()]
+  log.propagate = False
+  log.setLevel(level)
+  _worker_args.update(publish_args)
+
+
+def _publish_in_worker(src_file, rel_path):
+  """Publish one file and return the records it logged and its results."""
+  _worker_records.clear()
+  result = _publish_file(src_file, rel_path, **_worker_args)
+  return list(_worker_records), result
+
+
+# --- Entry point ---
+
+
+def publish(
+  base_src_path: Path,
+  site_dir: Path,
+  url_version: str | None,
+  schema_version: str | None,
+  workers: int = PUBLISH_WORKERS,
+) -> None:
+  """Publish every file under base_src_path into site_dir.
+
+  Outputs are produced in the version's staging tree, where those whose
+  content is unchanged since the last publish are not rewritten (nor, for
+  schemas, re-minified and recompressed), then linked into site_dir.
+  """
+  # Parse the tree once: the $id index resolves every relative $ref with a
+  # lookup. Built per call because hooks.py outlives `mkdocs serve` builds.
+  documents = _load_json_documents(base_src_path)
+  staging_dir, manifest_path = _staging_paths(url_version, schema_version)
+  manifest = _load_manifest(manifest_path)
+  id_index = {path: _schema_id(doc) for path, doc in documents.items()}
+
+  src_files = sorted(p for p in base_src_path.rglob("*") if p.is_file())
+  rel_paths = [p.relative_to(base_src_path).as_posix() for p in src_files]
+  publish_args = {
+    "site_dir": staging_dir,
+    "id_index": id_index,
+    "url_version": url_version,
+    "schema_version": schema_version,
+    "manifest": manifest,
+  }
+
+  results = None
+  if workers > 1 and len(src_files) >= PUBLISH_POOL_MIN_FILES:
+    try:
+      # Workers are spawned, not forked: `mkdocs serve` runs watcher and
+      # server threads that a forked child would inherit mid-operation.
+      with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(log.getEffectiveLevel(), publish_args),
+      ) as pool:
+        chunksize = max(1, len(src_files) // (workers * 4))
+        results, infos = [], []
+        for records, (outputs, info) in pool.map(
+          _publish_in_worker, src_files, rel_paths, chunksize=chunksize
+        ):
+          for level, message in records:
+            log.log(level, message)
+          results += outputs
+          infos += [info] if info else []
+    except (BrokenProcessPool, OSError) as e:
+      # Writes are atomic and idempotent, so redo everything in-process.
+      log.info(f"Publishing in a process pool failed ({e}); retrying serially")
+      results = None
+
+  if results is None:
+    results, infos = [], []
+    for src_file, rel_path in zip(src_files, rel_paths, strict=True):
+      outputs, info = _publish_file(
+        src_file,
+        rel_path,
+        data=documents.get(src_file.resolve()),
+        **publish_args,
+      )
+      results += outputs
+      infos += [info] if info else []
+
+  for name, generator in sorted(_generators.items()):
+    for rel_path, data, src_file in generator():
+      outputs, info = _publish_generated(
+        rel_path, data, src_file, **publish_args
+      )
+      results += outputs
+      infos += [info] if info else []
+    log.debug(f"Published generated schemas: {name}")
+
+  index = _schema_index(infos, {path: entry for path, entry, _ in results})
+  index = {"version": url_version, **index}
+  entry, written = _write_output(
+    staging_dir / SCHEMA_INDEX,
+    (json.dumps(index, indent=2, ensure_ascii=False) + "\n").encode("utf-8"),
+    publish_args["manifest"].get(SCHEMA_INDEX),
+  )
+  results.append((SCHEMA_INDEX, entry, written))
+
+  etags = {
+    path: {"etag": f'"{entry[0]}"', "size": entry[1]}
+    for path, entry, _ in sorted(results)
+  }
+  payload = (json.dumps(etags, indent=2) + "\n").encode()
+  entry, written = _write_output(
+    staging_dir / ETAG_MANIFEST,
+    payload,
+    publish_args["manifest"].get(ETAG_MANIFEST),
+  )
+  results.append((ETAG_MANIFEST, entry, written))
+
+  new_manifest = {path: entry for path, entry, _ in results}
+  for path in manifest.keys() - new_manifest.keys():
+    (staging_dir / path).unlink(missing_ok=True)
+  _save_manifest(manifest_path, new_manifest)
+  for path in new_manifest:
+    _link_output(staging_dir / path, site_dir / path)
+  written = sum(1 for _, _, was_written in results if was_written)
+  log.info(
+    f"Published {len(results)} files from {base_src_path}: {written} "
+    f"written, {len(results) - written} unchanged"
+  )
@@ -0,0 +1,316 @@
+#   Copyright 2026 UCP Authors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""In-process resolution of UCP schema annotations.
+
+Shared by the docs macros (main.py) and scripts/validate_examples.py.
+`resolve` applies ucp_request/ucp_response visibility for one direction
+and operation, the way `ucp-schema resolve` does, and with `bundle` set
+inlines external $refs the way `--bundle` does, without spawning the CLI.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+# Keywords whose values are instance data rather than subschemas. The
+# resolver never descends into them, so an example payload that happens to
+# carry "properties" or "$ref" keys is left untouched.
+DATA_KEYWORDS = frozenset({"const", "enum", "default", "examples"})
+VISIBILITY_VALUES = ("omit", "optional", "required")
+
+# Identifies this engine in persisted cache keys: editing the resolver
+# invalidates every result it produced.
+ENGINE_ID = "python:" + hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def load_json(path: str | Path) -> dict[str, Any] | None:
+  """Load JSON file, returns None on error."""
+  try:
+    with Path(path).open(encoding="utf-8") as f:
+      return json.load(f)
+  except (json.JSONDecodeError, OSError):
+    return None
+
+
+def resolve_json_pointer(pointer: str, data: Any) -> Any | None:
+  """Navigate to a JSON pointer path (e.g., '#/$defs/foo' or '#/components/x').
+
+  Args:
+    pointer: JSON pointer starting with '#' (e.g., '#/$defs/allocation').
+    data: The JSON data to navigate.
+
+  Returns:
+    The value at the pointer path, or None if not found.
+
+  """
+  if pointer == "#":
+    return data
+  if not pointer.startswith("#/"):
+    return None
+
+  path_parts = pointer[2:].split("/")  # Remove '#/' prefix and split
+  current = data
+  for part in path_parts:
+    if isinstance(current, dict) and part in current:
+      current = current[part]
+    elif isinstance(current, list):
+      try:
+        current = current[int(part)]
+      except (ValueError, IndexError):
+        return None
+    else:
+      return None
+  return current
+
+
+def first_difference(left: Any, right: Any, pointer: str = "") -> str | None:
+  """Return the JSON pointer of the first difference between two trees.
+
+  `required` arrays are compared as sets: their order carries no meaning and
+  ucp-schema and this resolver may append annotation-driven entries in
+  different orders.
+  """
+  if isinstance(left, dict) and isinstance(right, dict):
+    for key in sorted(set(left) | set(right)):
+      if key not in left or key not in right:
+        return f"{pointer}/{key}"
+      if key == "required" and isinstance(left[key], list):
+        if isinstance(right[key], list) and set(left[key]) == set(right[key]):
+          continue
+        return f"{pointer}/{key}"
+      found = first_difference(left[key], right[key], f"{pointer}/{key}")
+      if found is not None:
+        return found
+    return None
+  if isinstance(left, list) and isinstance(right, list):
+    if len(left) != len(right):
+      return pointer or "/"
+    for index, (a, b) in enumerate(zip(left, right, strict=True)):
+      found = first_difference(a, b, f"{pointer}/{index}")
+      if found is not None:
+        return found
+    return None
+  return None if left == right else (pointer or "/")
+
+
+def _annotation_visibility(annotation: Any, operation: str) -> str | None:
+  """Return the visibility a ucp_request/ucp_response value assigns.
+
+  Annotations are either a single visibility applied to every operation or
+  a per-operation map. A `transition` entry keeps the field accepted in both
+  its `from` and `to` states, so it resolves to optional unless both states
+  agree.
+  """
+  value = annotation
+  if isinstance(annotation, dict) and "transition" not in annotation:
+    value = annotation.get(operation)
+  if isinstance(value, dict) and isinstance(value.get("transition"), dict):
+    transition = value["transition"]
+    states = {transition.get("from"), transition.get("to")}
+    if len(states) == 1 and states <= set(VISIBILITY_VALUES):
+      return states.pop()
+    return "optional"
+  return value if value in VISIBILITY_VALUES else None
+
+
+def apply_annotations(node: Any, direction: str, operation: str) -> Any:
+  """Return a copy of `node` with visibility annotations applied.
+
+  Every object with `properties` is rewritten for the given direction and
+  operation: `omit` drops the property (and its `required` entry),
+  `required` adds it to `required`, and `optional` removes it from
+  `required`. Annotations themselves are preserved on surviving properties
+  so renderers can still describe per-operation requirements.
+
+  Schemas marked `"ucp_shared_request": true` resolve by the same rules;
+  the mark does not change resolution here. scripts/test_validate_examples.py
+  checks that, and the `transition` handling, against ucp-schema.
+  """
+  if isinstance(node, list):
+    return [apply_annotations(item, direction, operation) for item in node]
+  if not isinstance(node, dict):
+    return node
+
+  resolved = {
+    key: value
+    if key in DATA_KEYWORDS
+    else apply_annotations(value, direction, operation)
+    for key, value in node.items()
+  }
+
+  properties = resolved.get("properties")
+  if not isinstance(properties, dict):
+    return resolved
+
+  annotation_key = "ucp_request" if direction == "request" else "ucp_response"
+  required = list(resolved.get("required", []))
+  kept = {}
+  for name, prop in properties.items():
+    visibility = (
+      _annotation_visibility(prop.get(annotation_key), operation)
+      if isinstance(prop, dict)
+      else None
+    )
+    if visibility == "omit":
+      if name in required:
+        required.remove(name)
+      continue
+    if visibility == "required" and name not in required:
+      required.append(name)
+    elif visibility == "optional" and name in required:
+      required.remove(name)
+    kept[name] = prop
+
+  resolved["properties"] = kept
+  if "required" in resolved or required:
+    resolved["required"] = required
+  return resolved
+
+
+def _load_resolved_document(
+  path: Path, direction: str, operation: str, loaded: dict
+) -> dict[str, Any]:
+  """Load a schema file and apply annotations, memoized per resolve call."""
+  if path not in loaded:
+    data = load_json(path)
+    if data is None:
+      raise RuntimeError(f"Failed to load schema file '{path}'")
+    loaded[path] = apply_annotations(data, direction, operation)
+  return loaded[path]
+
+
+def _bundle_refs(
+  node: Any,
+  path: Path,
+  doc: dict[str, Any],
+  is_root: bool,
+  owns_base: bool,
+  resolve: dict,
+  stack: tuple = (),
+) -> Any:
+  """Inline every external $ref below `node`.
+
+  Args:
+    node: The (annotation-resolved) subtree to bundle.
+    path: Schema file the subtree came from; relative refs resolve from it.
+    doc: The resolved document containing `node`, for internal refs.
+    is_root: True while walking the requested schema itself. Its internal
+      refs stay as refs because its `$defs` survive in the output.
+    owns_base: True when the nearest enclosing `$id` in the output is this
+      document's, so a bare "#" self-reference still names it.
+    resolve: Per-call state: direction, operation, and loaded documents.
+    stack: (file, fragment) pairs being inlined, for cycle detection.
+
+  Returns:
+    The bundled subtree. Recursive references that would never terminate are
+    kept as refs (rewritten to the target's absolute `$id` when the local
+    base URI no longer points at the right document).
+
+  """
+  if isinstance(node, list):
+    return [
+      _bundle_refs(item, path, doc, is_root, owns_base, resolve, stack)
+      for item in node
+    ]
+  if not isinstance(node, dict):
+    return node
+
+  def bundle_children(kept_ref=None):
+    # Source key order is preserved; "$ref" survives only when kept_ref is
+    # given (the reference could not or should not be inlined).
+    bundled = {}
+    for key, value in node.items():
+      if key == "$ref":
+        if kept_ref is not None:
+          bundled[key] = kept_ref
+      elif key in DATA_KEYWORDS:
+        bundled[key] = value
+      else:
+        bundled[key] = _bundle_refs(
+          value, path, doc, is_root, owns_base, resolve, stack
+        )
+    return bundled
+
+  ref = node.get("$ref")
+  if not isinstance(ref, str) or ref.startswith(("http://", "https://")):
+    return bundle_children(ref)
+
+  ref_path, _, fragment = ref.partition("#")
+  if ref_path:
+    target_path = (path.parent / ref_path).resolve()
+    target_doc = _load_resolved_document(
+      target_path, resolve["direction"], resolve["operation"], resolve["loaded"]
+    )
+  else:
+    target_path, target_doc = path, doc
+
+  key = (target_path, fragment)
+  internal_to_root = not ref_path and is_root
+  self_reference = not ref_path and not fragment and owns_base
+  if internal_to_root or self_reference or key in stack:
+    kept_ref = ref
+    if not (internal_to_root or self_reference):
+      target_id = target_doc.get("$id")
+      if target_id:
+        kept_ref = f"{target_id}#{fragment}" if fragment else target_id
+    return bundle_children(kept_ref)
+
+  target = resolve_json_pointer(f"#{fragment}", target_doc)
+  if target is None:
+    raise RuntimeError(f"Unresolvable $ref '{ref}' in '{path}'")
+
+  inlined = _bundle_refs(
+    target,
+    target_path,
+    target_doc,
+    False,
+    not fragment or (owns_base and not ref_path),
+    resolve,
+    (*stack, key),
+  )
+  if not isinstance(inlined, dict):
+    return inlined
+
+  # Keywords next to the $ref refine the inlined target: the embedder's own
+  # description wins, and required lists from both sides accumulate.
+  merged = dict(inlined)
+  for sibling_key, value in bundle_children().items():
+    if sibling_key == "required" and isinstance(merged.get("required"), list):
+      merged["required"] = list(dict.fromkeys([*merged["required"], *value]))
+    else:
+      merged[sibling_key] = value
+  return merged
+
+
+def resolve(
+  schema_path: str | Path,
+  direction: str = "response",
+  operation: str = "read",
+  bundle: bool = False,
+) -> dict[str, Any]:
+  """Resolve a schema without spawning ucp-schema.
+
+  Applies the same annotation semantics as `ucp-schema resolve` and, when
+  `bundle` is set, inlines external $refs the way `--bundle` does. Raises
+  RuntimeError if the schema or any bundled reference cannot be loaded.
+  """
+  path = Path(schema_path).resolve()
+  loaded: dict[Path, dict] = {}
+  doc = _load_resolved_document(path, direction, operation, loaded)
+  if not bundle:
+    return doc
+  resolve = {"direction": direction, "operation": operation, "loaded": loaded}
+  return _bundle_refs(doc, path, doc, True, True, resolve)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Benchmark the fused publish transform against the per-step functions.
+
+Runs schema_publish.transform and the reference pipeline (_process_refs,
+_set_schema_version, _rewrite_version_urls) over every JSON file in a
+schema tree, checks that both produce byte-identical published output and
+reports the time each path takes.
+
+Usage:
+  python scripts/benchmark_publish.py [--source source/schemas] [--repeat N]
+
+Exits non-zero if any file's output differs between the two paths.
+"""
+
+import argparse
+import copy
+import json
+import logging
+from pathlib import Path
+import sys
+import time
+
+# schema_publish lives at the repo root, shared with hooks.py.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import schema_publish  # noqa: E402
+
+
+def _reference(data, path, id_index, url_version, schema_version):
+  schema_publish._process_refs(data, path.parent, id_index=id_index)
+  if schema_version:
+    schema_publish._set_schema_version(data, schema_version)
+  if url_version:
+    schema_publish._rewrite_version_urls(data, url_version)
+
+
+def _fused(data, path, id_index, url_version, schema_version):
+  schema_publish.transform(
+    data, path.parent, id_index, url_version, schema_version
+  )
+
+
+def _run(pipeline, documents, id_index, args, repeat):
+  """Return (best wall time of `repeat` runs, published bytes per file)."""
+  best = float("inf")
+  outputs = {}
+  for _ in range(repeat):
+    copies = {path: copy.deepcopy(doc) for path, doc in documents.items()}
+    start = time.perf_counter()
+    for path, data in copies.items():
+      pipeline(data, path, id_index, args.url_version, args.schema_version)
+    best = min(best, time.perf_counter() - start)
+  for path, data in copies.items():
+    outputs[path] = json.dumps(data, indent=2, ensure_ascii=False).encode()
+  return best, outputs
+
+
+def main() -> int:
+  """Compare both transform paths on a schema tree."""
+  parser = argparse.ArgumentParser(
+    description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter,
+  )
+  parser.add_argument(
+    "--source",
+    type=Path,
+    default=Path("source/schemas"),
+    help="Schema tree to publish (default: source/schemas)",
+  )
+  parser.add_argument(
+    "--repeat",
+    type=int,
+    default=20,
+    help="Timed runs per path; the best is reported (default: 20)",
+  )
+  parser.add_argument("--url-version", default="draft")
+  parser.add_argument("--schema-version", default="2026-01-01")
+  args = parser.parse_args()
+
+  # Missing-$id warnings would repeat once per run and path.
+  logging.getLogger("mkdocs").setLevel(logging.ERROR)
+
+  loaded = schema_publish._load_json_documents(args.source)
+  id_index = {
+    path: schema_publish._schema_id(doc) for path, doc in loaded.items()
+  }
+  documents = {
+    path: doc for path, doc in loaded.items() if isinstance(doc, dict)
+  }
+  if not documents:
+    print(f"No JSON schemas found under {args.source}")
+    return 1
+
+  ref_time, ref_out = _run(_reference, documents, id_index, args, args.repeat)
+  fused_time, fused_out = _run(_fused, documents, id_index, args, args.repeat)
+
+  mismatches = sorted(str(p) for p in documents if ref_out[p] != fused_out[p])
+  size = sum(len(out) for out in ref_out.values())
+  print(f"{len(documents)} schemas, {size / 1024:.0f} KiB published")
+  print(f"  per-step functions: {ref_time * 1000:8.2f} ms")
+  print(f"  fused transform:    {fused_time * 1000:8.2f} ms")
+  print(f"  speedup:            {ref_time / fused_time:8.2f}x")
+  if mismatches:
+    print(f"Output differs for {len(mismatches)} file(s):")
+    for path in mismatches:
+      print(f"  {path}")
+    return 1
+  print("Output is byte-identical.")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
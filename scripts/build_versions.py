@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""Build every spec version of the local preview concurrently.
+
+Each `release/YYYY-MM-DD` branch is built in its own git worktree, and
+the draft from the current checkout, with `mkdocs build` (what `mike
+deploy` runs) on a pool of workers. All builds are pointed at one
+content-addressed schema resolution cache (UCP_SCHEMA_CACHE_DIR), so a
+schema unchanged between versions is resolved once. Release branches that
+predate the cache ignore the variable and resolve cold.
+
+Versions build concurrently (--jobs, default CPU count), so each build
+runs its own schema pre-resolution and publishing with one worker
+(UCP_SCHEMA_WORKERS, UCP_PUBLISH_WORKERS) unless those are set.
+
+Built sites are kept under .cache/versions/. A version is skipped when
+its git tree hash, the ucp-schema version, the SITE_URL and SPEC_URL the
+build reads, and, for undated versions such as the draft, the date
+stamped into their schemas all match the previous build. The draft is
+only skipped when the checkout is clean apart from the output directory
+and the release worktrees.
+
+Most files are byte-identical between versions, so identical files
+across the cached sites are hardlinked to a single copy, and the versions
+are then assembled into the output directory by hardlinking too. Disk use
+and copy time grow with what changed between versions, not with their
+number. File digests are remembered per inode, so each run only reads
+files that are new.
+
+The output is laid out the way mike lays out gh-pages: one directory per
+version, a mike-style versions.json, and a `latest` alias for the newest
+release (or the draft with --draft-only).
+
+Usage:
+  python scripts/build_versions.py [--output DIR] [--jobs N] [--draft-only]
+                                   [--force]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache" / "versions"
+DIGESTS_FILE = CACHE_DIR / "digests.json"
+WORKTREE_DIR = PROJECT_ROOT / "build_temp"
+RELEASE_BRANCH = re.compile(r"(?:origin/)?(release/\d{4}-\d{2}-\d{2})")
+DATE_VERSION = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# schema_cache lives at the repo root, shared with the docs macros.
+sys.path.insert(0, str(PROJECT_ROOT))
+import schema_cache  # noqa: E402
+
+# git serializes worktree bookkeeping with lock files; take turns.
+_worktree_lock = threading.Lock()
+
+
+def _git(*args: str) -> str:
+  return subprocess.run(
+    ["git", *args],
+    cwd=PROJECT_ROOT,
+    capture_output=True,
+    text=True,
+    check=True,
+  ).stdout.strip()
+
+
+def release_refs() -> dict[str, str]:
+  """Map each release version to its branch, preferring local branches."""
+  refs = {}
+  for line in _git("branch", "-a", "--format=%(refname:short)").splitlines():
+    match = RELEASE_BRANCH.fullmatch(line)
+    if not match:
+      continue
+    branch = match.group(1)
+    version = branch.removeprefix("release/")
+    if line == branch or version not in refs:
+      refs[version] = line
+  return dict(sorted(refs.items()))
+
+
+def _tree_key(
+  ref: str | None, version: str, exclude: tuple[Path, ...] = ()
+) -> str | None:
+  """Return what a build of ref depends on, or None if it is not stable.
+
+  ref None is the current checkout, which is only stable when clean.
+  Changes under `exclude` (build outputs such as the preview directory and
+  the release worktrees) do not count. Besides the tree, the key covers
+  the ucp-schema version, the SITE_URL and SPEC_URL that shape generated
+  URLs, and for an undated version (the draft) today's date, which hooks.py
+  stamps into its schemas.
+  """
+  if ref is None:
+    pathspec = [
+      f":(exclude){path.resolve().relative_to(PROJECT_ROOT)}"
+      for path in exclude
+      if path.resolve().is_relative_to(PROJECT_ROOT)
+    ]
+    if _git("status", "--porcelain", "--", ".", *pathspec):
+      return None
+    ref = "HEAD"
+  tree = _git("rev-parse", f"{ref}^{{tree}}")
+  stamped = "" if DATE_VERSION.fullmatch(version) else date.today().isoformat()
+  return json.dumps(
+    [
+      tree,
+      schema_cache.ucp_schema_version(),
+      os.environ.get("SITE_URL"),
+      os.environ.get("SPEC_URL"),
+      stamped,
+    ]
+  )
+
+
+class VersionBuild:
+  """One version's build, cached under .cache/versions/<version>/."""
+
+  def __init__(self, version: str, ref: str | None):
+    """Describe the build of `version` from `ref` (None: current checkout)."""
+    self.version = version
+    self.ref = ref
+    self.site_dir = CACHE_DIR / version
+    self.stamp = CACHE_DIR / f"{version}.stamp"
+    self.log = CACHE_DIR / f"{version}.log"
+
+  def is_current(self, key: str | None) -> bool:
+    """Return whether the cached site was built from `key`."""
+    try:
+      return key is not None and self.stamp.read_text() == key
+    except OSError:
+      return False
+
+  def run(self, force: bool = False, exclude: tuple[Path, ...] = ()) -> str:
+    """Build the version unless its cached site is current.
+
+    `exclude` lists build outputs to ignore when checking whether the
+    checkout is clean. Returns "skipped" or "built"; raises
+    CalledProcessError on failure.
+    """
+    key = _tree_key(self.ref, self.version, exclude)
+    if not force and self.site_dir.is_dir() and self.is_current(key):
+      return "skipped"
+
+    worktree = WORKTREE_DIR / self.version if self.ref else PROJECT_ROOT
+    if self.ref:
+      shutil.rmtree(worktree, ignore_errors=True)
+      with _worktree_lock:
+        _git("worktree", "add", "-f", "--detach", str(worktree), self.ref)
+    staging = CACHE_DIR / f"{self.version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    env = {
+      **os.environ,
+      "DOCS_MODE": "spec",
+      "UCP_BUILD_VERSION": self.version,
+      # Versions already build in parallel; one worker each avoids
+      # multiplying thread and process pools by the number of jobs.
+      "UCP_SCHEMA_WORKERS": os.environ.get("UCP_SCHEMA_WORKERS", "1"),
+      "UCP_PUBLISH_WORKERS": os.environ.get("UCP_PUBLISH_WORKERS", "1"),
+      "UCP_SCHEMA_CACHE_DIR": os.environ.get(
+        "UCP_SCHEMA_CACHE_DIR", str(schema_cache.DEFAULT_CACHE_DIR)
+      ),
+    }
+    try:
+      with self.log.open("w", encoding="utf-8") as log:
+        subprocess.run(
+          ["mkdocs", "build", "-d", str(staging)],
+          cwd=worktree,
+          env=env,
+          stdout=log,
+          stderr=subprocess.STDOUT,
+          check=True,
+        )
+    finally:
+      if self.ref:
+        with _worktree_lock:
+          _git("worktree", "remove", "-f", str(worktree))
+
+    shutil.rmtree(self.site_dir, ignore_errors=True)
+    staging.rename(self.site_dir)
+    if key is not None:
+      self.stamp.write_text(key)
+    else:
+      self.stamp.unlink(missing_ok=True)
+    return "built"
+
+
+def _link_or_copy(src: str | Path, dst: str | Path) -> None:
+  """Hardlink src to dst, copying where links are unsupported."""
+  try:
+    os.link(src, dst)
+  except OSError:
+    shutil.copy2(src, dst)
+
+
+def dedupe(directories: list[Path]) -> tuple[int, int]:
+  """Hardlink byte-identical files across directories to one copy.
+
+  Digests are cached in DIGESTS_FILE by inode, size and mtime, so files
+  left untouched since the last run are not read again.
+
+  Returns:
+    The number of files replaced by links and the bytes that saved.
+
+  """
+  try:
+    known = json.loads(DIGESTS_FILE.read_text())
+  except (OSError, ValueError):
+    known = {}
+  digests = {}
+  canonical: dict[str, Path] = {}
+  linked = saved = 0
+  for directory in directories:
+    for path in sorted(directory.rglob("*")):
+      if path.is_symlink() or not path.is_file():
+        continue
+      stat = path.stat()
+      key = f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+      digest = digests.get(key) or known.get(key)
+      if digest is None:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+      digests[key] = digest
+      first = canonical.setdefault(digest, path)
+      if first is path or first.stat().st_ino == stat.st_ino:
+        continue
+      temporary = path.with_name(f".{path.name}.dedupe")
+      try:
+        os.link(first, temporary)
+      except OSError:
+        continue  # e.g. another filesystem; keep the copy
+      temporary.replace(path)
+      linked += 1
+      saved += stat.st_size
+  DIGESTS_FILE.write_text(json.dumps(digests))
+  return linked, saved
+
+
+def assemble(builds: list[VersionBuild], output: Path, latest: str) -> None:
+  """Link built versions into output with versions.json and `latest`."""
+  output.mkdir(parents=True, exist_ok=True)
+  for build in builds:
+    target = output / build.version
+    shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(
+      build.site_dir, target, symlinks=True, copy_function=_link_or_copy
+    )
+
+  alias = output / "latest"
+  if alias.is_symlink() or alias.is_file():
+    alias.unlink()
+  elif alias.exists():
+    shutil.rmtree(alias)
+  alias.symlink_to(latest, target_is_directory=True)
+
+  # mike's versions.json: newest first, the draft after the releases.
+  ordered = sorted(
+    (b.version for b in builds if b.version != "draft"), reverse=True
+  )
+  ordered += [b.version for b in builds if b.version == "draft"]
+  versions = [
+    {
+      "version": version,
+      "title": version,
+      "aliases": ["latest"] if version == latest else [],
+    }
+    for version in ordered
+  ]
+  (output / "versions.json").write_text(json.dumps(versions, indent=2) + "\n")
+
+
+def main() -> int:
+  """Build, cache and assemble the spec versions."""
+  parser = argparse.ArgumentParser(
+    description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter,
+  )
+  parser.add_argument(
+    "--output",
+    type=Path,
+    default=Path("local_preview"),
+    help="Directory to assemble the versions into (default: local_preview)",
+  )
+  parser.add_argument(
+    "--jobs",
+    type=int,
+    default=os.cpu_count() or 1,
+    help="Versions to build at once (default: CPU count)",
+  )
+  parser.add_argument(
+    "--draft-only",
+    action="store_true",
+    help="Skip release branches and alias the draft as latest",
+  )
+  parser.add_argument(
+    "--force",
+    action="store_true",
+    help="Rebuild versions even if their cached site is current",
+  )
+  args = parser.parse_args()
+
+  refs = {} if args.draft_only else release_refs()
+  builds = [VersionBuild(version, ref) for version, ref in refs.items()]
+  builds.append(VersionBuild("draft", None))
+  print(f"Building versions: {', '.join(b.version for b in builds)}")
+
+  CACHE_DIR.mkdir(parents=True, exist_ok=True)
+  WORKTREE_DIR.mkdir(exist_ok=True)
+  # The root site is already in the output directory and release worktrees
+  # appear while they build; neither makes the draft's checkout dirty.
+  exclude = (args.output, WORKTREE_DIR)
+  failed = []
+
+  def run(build):
+    try:
+      return build, build.run(force=args.force, exclude=exclude)
+    except (subprocess.CalledProcessError, OSError) as e:
+      return build, e
+
+  with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+    for build, outcome in pool.map(run, builds):
+      if isinstance(outcome, Exception):
+        failed.append(build)
+        print(f">>> {build.version}: FAILED ({outcome}), see {build.log}")
+      else:
+        print(f">>> {build.version}: {outcome}")
+  _git("worktree", "prune")
+  if not any(WORKTREE_DIR.iterdir()):
+    WORKTREE_DIR.rmdir()
+
+  if failed:
+    for build in failed:
+      if build.log.exists():
+        tail = build.log.read_text(encoding="utf-8").splitlines()[-20:]
+        print(f"--- {build.log} (last lines) ---")
+        print("\n".join(tail))
+    return 1
+
+  linked, saved = dedupe([build.site_dir for build in builds])
+  if linked:
+    print(f"Deduplicated {linked} files across versions ({saved:,} bytes)")
+  latest = "draft" if args.draft_only or not refs else max(refs)
+  assemble(builds, args.output, latest)
+  print(f"Assembled {len(builds)} version(s) into {args.output}")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
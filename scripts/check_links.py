@@ -1,5 +1,6 @@
 """Script to check for broken internal links and anchors in the built site."""
 
+import hashlib
 import os
 import sys
 import re
@@ -103,23 +104,33 @@ def check_links():
   print(f"Scanning {ROOT_DIR} for broken links (Site URL: {SITE_URL})...")
 
   html_files = list(ROOT_DIR.rglob("*.html"))
-  file_cache = {}  # Cache parsed IDs for each file to avoid re-parsing
+  # Most pages are identical across spec versions (and hardlinked to one
+  # copy by build_versions.py), so parse each distinct file once: by inode,
+  # then by content. Links still resolve relative to each file's location.
+  inode_cache = {}
+  content_cache = {}
   # Structure: errors_by_version[version][file_path] = [list of error details]
   errors_by_version = defaultdict(lambda: defaultdict(list))
 
-  def get_file_ids(path):
-    if path in file_cache:
-      return file_cache[path]
-
-    if not path.exists():
-      return None
+  def parse_file(path):
+    """Return the LinkParser for a file; raises OSError/UnicodeError."""
+    stat = path.stat()
+    inode = (stat.st_dev, stat.st_ino)
+    parser = inode_cache.get(inode)
+    if parser is None:
+      raw = path.read_bytes()
+      digest = hashlib.sha256(raw).digest()
+      parser = content_cache.get(digest)
+      if parser is None:
+        parser = LinkParser()
+        parser.feed(raw.decode("utf-8"))
+        content_cache[digest] = parser
+      inode_cache[inode] = parser
+    return parser
 
+  def get_file_ids(path):
     try:
-      content = path.read_text(encoding="utf-8")
-      parser = LinkParser()
-      parser.feed(content)
-      file_cache[path] = parser.ids
-      return parser.ids
+      return parse_file(path).ids
     except Exception:
       # print(f"Failed to parse {path}: {e}") # Reduce noise
       return None
@@ -141,17 +152,13 @@ def check_links():
       version = "unknown"
 
     try:
-      content = file_path.read_text(encoding="utf-8")
+      parser = parse_file(file_path)
     except Exception as e:
       errors_by_version[version][str(file_path)].append(
         f"  Could not read file: {e}"
       )
       continue
 
-    parser = LinkParser()
-    parser.feed(content)
-    file_cache[file_path] = parser.ids
-
     for link in parser.links:
       original_link = link
 
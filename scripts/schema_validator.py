@@ -0,0 +1,719 @@
+r"""Compiled, in-process JSON Schema validation for resolved UCP schemas.
+
+Used by validate_examples.py in place of one `ucp-schema validate` process
+per example. A Validator walks a resolved, bundled schema once and builds a
+tree of checks; validate() then runs those checks against any number of
+payloads and reports errors in the shape `ucp-schema validate --json` uses:
+
+    {"path": "/line_items/0/quantity", "message": "..."}
+
+where `path` is the JSON Pointer of the failing instance location, so
+ellipsis-path suppression works the same with either engine.
+
+Supported: the Draft 2020-12 assertion and applicator keywords UCP schemas
+use (type, enum, const, properties, required, additionalProperties,
+patternProperties, propertyNames, min/maxProperties, dependentRequired,
+dependentSchemas, items, prefixItems, min/maxItems, uniqueItems, contains,
+min/maxContains, min/maxLength, pattern, minimum, maximum, exclusive
+bounds, multipleOf, allOf, anyOf, oneOf, not, if/then/else) and $ref to
+$id/JSON Pointer targets inside the bundle.
+
+Known differences from `ucp-schema validate`, so this engine is a fast
+first pass rather than an equivalent (`--engine check` runs both and fails
+on any disagreement):
+  - `format` is treated as an annotation and never asserted.
+  - `pattern` is ECMA-262 in JSON Schema. Patterns are translated to Python
+    `re` for the differences UCP patterns can hit (ASCII \d and \w, ECMA
+    \s, `.` and `$`, named groups and backreferences); other ECMA-only
+    syntax may still compile differently or fail to compile.
+  - unevaluated* and $dynamicRef are not supported.
+`multipleOf` is decided in decimal arithmetic, so 0.3 is a multiple of 0.1.
+"""
+
+from collections.abc import Callable
+import decimal
+import json
+import re
+from typing import Any
+from urllib.parse import unquote, urljoin
+
+# Keywords whose values are instance data, never subschemas.
+_DATA_KEYWORDS = frozenset({"const", "enum", "default", "examples"})
+# Longest instance rendering in a message before it is elided.
+_SHOW_LIMIT = 80
+
+_Check = Callable[[Any, str, list], None]
+
+_TYPES = {
+  "object": lambda v: isinstance(v, dict),
+  "array": lambda v: isinstance(v, list),
+  "string": lambda v: isinstance(v, str),
+  "boolean": lambda v: isinstance(v, bool),
+  "null": lambda v: v is None,
+  "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+  "integer": lambda v: (
+    (isinstance(v, int) and not isinstance(v, bool))
+    or (isinstance(v, float) and v.is_integer())
+  ),
+}
+
+
+def _show(value: Any) -> str:
+  text = json.dumps(value, ensure_ascii=False)
+  if len(text) > _SHOW_LIMIT:
+    text = text[: _SHOW_LIMIT - 3] + "..."
+  return text
+
+
+def _canonical(value: Any) -> Any:
+  """Return a hashable form in which JSON-equal values compare equal.
+
+  Booleans stay distinct from numbers and 1 equals 1.0, as JSON Schema
+  requires for enum, const and uniqueItems.
+  """
+  if isinstance(value, bool) or value is None or isinstance(value, str):
+    return (type(value).__name__, value)
+  if isinstance(value, (int, float)):
+    return ("number", value)
+  if isinstance(value, list):
+    return ("array", tuple(_canonical(item) for item in value))
+  if isinstance(value, dict):
+    return (
+      "object",
+      tuple(sorted((key, _canonical(item)) for key, item in value.items())),
+    )
+  return ("other", repr(value))
+
+
+def _child(path: str, key: Any) -> str:
+  return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _error(errors: list, path: str, message: str) -> None:
+  errors.append({"path": path, "message": message})
+
+
+def _accept(instance: Any, path: str, errors: list) -> None:
+  return None
+
+
+class Validator:
+  """A schema compiled once into reusable checks."""
+
+  def __init__(self, schema: Any, root: Any = None) -> None:
+    """Compile `schema`, resolving its $refs within `root` (default: itself).
+
+    Raises RuntimeError on a $ref that does not resolve inside `root`, or
+    on an invalid `pattern`.
+    """
+    self._root = schema if root is None else root
+    self._resources: dict[str, Any] = {}
+    self._bases: dict[int, str] = {}
+    self._compiled: dict[int, _Check] = {}
+    self._index(self._root, "")
+    self._check = self._compile(schema, self._bases.get(id(schema), ""))
+
+  def validate(self, instance: Any) -> tuple[bool, list[dict]]:
+    """Return (valid, errors) for one payload."""
+    errors: list[dict] = []
+    self._check(instance, "", errors)
+    return not errors, errors
+
+  # --- Compilation ---
+
+  def _index(self, root: Any, base: str) -> None:
+    """Record the base URI of every subschema and each $id resource."""
+    self._resources.setdefault(base, root)
+    stack = [(root, base)]
+    while stack:
+      node, base = stack.pop()
+      if isinstance(node, list):
+        stack.extend((item, base) for item in node)
+        continue
+      if not isinstance(node, dict):
+        continue
+      node_id = node.get("$id")
+      if isinstance(node_id, str):
+        base = urljoin(base, node_id).split("#", 1)[0]
+        self._resources.setdefault(base, node)
+      self._bases[id(node)] = base
+      stack.extend(
+        (value, base)
+        for key, value in node.items()
+        if key not in _DATA_KEYWORDS
+      )
+
+  def _resolve_ref(self, ref: str, base: str) -> tuple[Any, str]:
+    uri, _, fragment = urljoin(base, ref).partition("#")
+    if uri not in self._resources:
+      raise RuntimeError(f"Unresolvable $ref '{ref}'")
+    target = self._resources[uri]
+    for part in unquote(fragment).split("/")[1:]:
+      part = part.replace("~1", "/").replace("~0", "~")
+      if isinstance(target, dict) and part in target:
+        target = target[part]
+      elif isinstance(target, list) and part.isdigit():
+        target = target[int(part)]
+      else:
+        raise RuntimeError(f"Unresolvable $ref '{ref}'")
+    return target, self._bases.get(id(target), uri)
+
+  def _compile(self, schema: Any, base: str) -> _Check:
+    if schema is True or schema == {}:
+      return _accept
+    if schema is False:
+      return lambda instance, path, errors: _error(
+        errors, path, f"False schema does not allow {_show(instance)}"
+      )
+    if not isinstance(schema, dict):
+      return _accept
+
+    key = id(schema)
+    if key in self._compiled:
+      return self._compiled[key]
+    checks: list[_Check] = []
+
+    def check(instance, path, errors):
+      for keyword_check in checks:
+        keyword_check(instance, path, errors)
+
+    # Registered before compiling children, so recursive $refs terminate.
+    self._compiled[key] = check
+    base = self._bases.get(key, base)
+    for keyword, value in schema.items():
+      compiler = _KEYWORDS.get(keyword)
+      if compiler is not None:
+        compiled = compiler(self, value, schema, base)
+        if compiled is not None:
+          checks.append(compiled)
+    return check
+
+  def _subschemas(self, schemas: list, base: str) -> list[_Check]:
+    return [self._compile(schema, base) for schema in schemas]
+
+
+def _is_valid(check: _Check, instance: Any) -> bool:
+  errors: list[dict] = []
+  check(instance, "", errors)
+  return not errors
+
+
+# --- Keyword compilers: (validator, value, schema, base) -> check ---
+
+
+def _ref(validator, ref, schema, base):
+  if not isinstance(ref, str):
+    return None
+  target, target_base = validator._resolve_ref(ref, base)
+  return validator._compile(target, target_base)
+
+
+def _type(validator, expected, schema, base):
+  names = expected if isinstance(expected, list) else [expected]
+  tests = [_TYPES[name] for name in names if name in _TYPES]
+  label = " or ".join(f'"{name}"' for name in names)
+
+  def check(instance, path, errors):
+    if not any(test(instance) for test in tests):
+      _error(errors, path, f"{_show(instance)} is not of type {label}")
+
+  return check
+
+
+def _enum(validator, options, schema, base):
+  allowed = {_canonical(option) for option in options}
+
+  def check(instance, path, errors):
+    if _canonical(instance) not in allowed:
+      _error(errors, path, f"{_show(instance)} is not one of {_show(options)}")
+
+  return check
+
+
+def _const(validator, expected, schema, base):
+  wanted = _canonical(expected)
+
+  def check(instance, path, errors):
+    if _canonical(instance) != wanted:
+      _error(errors, path, f"{_show(expected)} was expected")
+
+  return check
+
+
+# Objects
+
+
+def _properties(validator, properties, schema, base):
+  compiled = {
+    name: validator._compile(sub, base) for name, sub in properties.items()
+  }
+
+  def check(instance, path, errors):
+    if isinstance(instance, dict):
+      for name, sub in compiled.items():
+        if name in instance:
+          sub(instance[name], _child(path, name), errors)
+
+  return check
+
+
+def _pattern_properties(validator, patterns, schema, base):
+  compiled = [
+    (_regex(pattern), validator._compile(sub, base))
+    for pattern, sub in patterns.items()
+  ]
+
+  def check(instance, path, errors):
+    if isinstance(instance, dict):
+      for name, value in instance.items():
+        for regex, sub in compiled:
+          if regex.search(name):
+            sub(value, _child(path, name), errors)
+
+  return check
+
+
+def _additional_properties(validator, additional, schema, base):
+  known = set(schema.get("properties") or {})
+  patterns = [_regex(p) for p in schema.get("patternProperties") or {}]
+
+  def extra(instance):
+    return [
+      name
+      for name in instance
+      if name not in known and not any(p.search(name) for p in patterns)
+    ]
+
+  if additional is False:
+
+    def check(instance, path, errors):
+      if isinstance(instance, dict):
+        unexpected = extra(instance)
+        if unexpected:
+          names = ", ".join(repr(name) for name in unexpected)
+          verb = "was" if len(unexpected) == 1 else "were"
+          _error(
+            errors,
+            path,
+            f"Additional properties are not allowed ({names} {verb} "
+            "unexpected)",
+          )
+
+    return check
+
+  sub = validator._compile(additional, base)
+
+  def check(instance, path, errors):
+    if isinstance(instance, dict):
+      for name in extra(instance):
+        sub(instance[name], _child(path, name), errors)
+
+  return check
+
+
+def _required(validator, required, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, dict):
+      for name in required:
+        if name not in instance:
+          _error(errors, path, f'"{name}" is a required property')
+
+  return check
+
+
+def _property_names(validator, names_schema, schema, base):
+  sub = validator._compile(names_schema, base)
+
+  def check(instance, path, errors):
+    if isinstance(instance, dict):
+      for name in instance:
+        sub(name, path, errors)
+
+  return check
+
+
+def _min_properties(validator, limit, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, dict) and len(instance) < limit:
+      noun = "property" if limit == 1 else "properties"
+      _error(errors, path, f"{_show(instance)} has less than {limit} {noun}")
+
+  return check
+
+
+def _max_properties(validator, limit, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, dict) and len(instance) > limit:
+      noun = "property" if limit == 1 else "properties"
+      _error(errors, path, f"{_show(instance)} has more than {limit} {noun}")
+
+  return check
+
+
+def _dependent_required(validator, dependencies, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, dict):
+      for trigger, names in dependencies.items():
+        if trigger in instance:
+          for name in names:
+            if name not in instance:
+              _error(errors, path, f'"{name}" is a required property')
+
+  return check
+
+
+def _dependent_schemas(validator, dependencies, schema, base):
+  compiled = {
+    name: validator._compile(sub, base) for name, sub in dependencies.items()
+  }
+
+  def check(instance, path, errors):
+    if isinstance(instance, dict):
+      for trigger, sub in compiled.items():
+        if trigger in instance:
+          sub(instance, path, errors)
+
+  return check
+
+
+# Arrays
+
+
+def _prefix_items(validator, prefix, schema, base):
+  compiled = validator._subschemas(prefix, base)
+
+  def check(instance, path, errors):
+    if isinstance(instance, list):
+      for index, (sub, item) in enumerate(
+        zip(compiled, instance, strict=False)
+      ):
+        sub(item, _child(path, index), errors)
+
+  return check
+
+
+def _items(validator, items, schema, base):
+  sub = validator._compile(items, base)
+  start = len(schema.get("prefixItems") or [])
+
+  def check(instance, path, errors):
+    if isinstance(instance, list):
+      for index in range(start, len(instance)):
+        sub(instance[index], _child(path, index), errors)
+
+  return check
+
+
+def _min_items(validator, limit, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, list) and len(instance) < limit:
+      noun = "item" if limit == 1 else "items"
+      _error(errors, path, f"{_show(instance)} has less than {limit} {noun}")
+
+  return check
+
+
+def _max_items(validator, limit, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, list) and len(instance) > limit:
+      noun = "item" if limit == 1 else "items"
+      _error(errors, path, f"{_show(instance)} has more than {limit} {noun}")
+
+  return check
+
+
+def _unique_items(validator, unique, schema, base):
+  if not unique:
+    return None
+
+  def check(instance, path, errors):
+    if isinstance(instance, list):
+      seen = [_canonical(item) for item in instance]
+      if len(set(seen)) != len(seen):
+        _error(errors, path, f"{_show(instance)} has non-unique elements")
+
+  return check
+
+
+def _contains(validator, contains, schema, base):
+  sub = validator._compile(contains, base)
+  minimum = schema.get("minContains", 1)
+  maximum = schema.get("maxContains")
+
+  def check(instance, path, errors):
+    if not isinstance(instance, list):
+      return
+    matches = sum(1 for item in instance if _is_valid(sub, item))
+    if matches < minimum:
+      if minimum == 1:
+        message = f"None of {_show(instance)} are valid under the given schema"
+      else:
+        message = (
+          f"{_show(instance)} contains fewer than {minimum} matching items"
+        )
+      _error(errors, path, message)
+    elif maximum is not None and matches > maximum:
+      _error(
+        errors,
+        path,
+        f"{_show(instance)} contains more than {maximum} matching items",
+      )
+
+  return check
+
+
+# Strings
+
+
+# ECMA-262 line terminators and white space (\s), which differ from Python's.
+_ECMA_SPACE = (
+  "\\t\\n\\v\\f\\r \\u00a0\\u1680\\u2000-\\u200a\\u2028\\u2029"
+  "\\u202f\\u205f\\u3000\\ufeff"
+)
+_ECMA_LINE_TERMINATORS = "\\n\\r\\u2028\\u2029"
+
+
+def _ecma_to_python(pattern: str) -> str:
+  r"""Translate an ECMA-262 regular expression to Python `re` syntax.
+
+  Covers where the two disagree on the same text: `.` also stops at \r,
+  U+2028 and U+2029; `$` only matches at the very end; \s is ECMA's
+  white space set; `(?<name>...)` and `\k<name>` name groups. \d, \w and
+  \b are ASCII-only in ECMA, which _regex gets from re.ASCII.
+  """
+  out = []
+  in_class = False
+  i = 0
+  while i < len(pattern):
+    char = pattern[i]
+    if char == "\\" and i + 1 < len(pattern):
+      escape = pattern[i + 1]
+      if escape == "s":
+        out.append(_ECMA_SPACE if in_class else f"[{_ECMA_SPACE}]")
+      elif escape == "S" and not in_class:
+        out.append(f"[^{_ECMA_SPACE}]")
+      elif escape == "k" and pattern.startswith("<", i + 2):
+        end = pattern.find(">", i + 3)
+        if end == -1:
+          out.append(pattern[i : i + 2])
+        else:
+          out.append(f"(?P={pattern[i + 3 : end]})")
+          i = end - 1
+      else:
+        out.append(pattern[i : i + 2])
+      i += 2
+      continue
+    if in_class:
+      in_class = char != "]"
+    elif char == "[":
+      in_class = True
+      # A leading "]" is literal in Python but closes an empty ECMA class.
+      if pattern.startswith("]", i + 1):
+        out.append("(?!)")
+        i += 2
+        in_class = False
+        continue
+      if pattern.startswith("^]", i + 1):
+        out.append("[\\s\\S]")
+        i += 3
+        in_class = False
+        continue
+    elif char == ".":
+      char = f"[^{_ECMA_LINE_TERMINATORS}]"
+    elif char == "$":
+      char = "\\Z"
+    elif (
+      char == "("
+      and pattern.startswith("?<", i + 1)
+      and not pattern.startswith(("?<=", "?<!"), i + 1)
+    ):
+      char = "(?P"
+      i += 1
+    out.append(char)
+    i += 1
+  return "".join(out)
+
+
+def _regex(pattern: str) -> re.Pattern:
+  try:
+    return re.compile(_ecma_to_python(pattern), re.ASCII)
+  except re.error as e:
+    raise RuntimeError(f"Invalid pattern {pattern!r}: {e}") from e
+
+
+def _pattern(validator, pattern, schema, base):
+  regex = _regex(pattern)
+
+  def check(instance, path, errors):
+    if isinstance(instance, str) and not regex.search(instance):
+      _error(errors, path, f'{_show(instance)} does not match "{pattern}"')
+
+  return check
+
+
+def _min_length(validator, limit, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, str) and len(instance) < limit:
+      noun = "character" if limit == 1 else "characters"
+      _error(errors, path, f"{_show(instance)} is shorter than {limit} {noun}")
+
+  return check
+
+
+def _max_length(validator, limit, schema, base):
+  def check(instance, path, errors):
+    if isinstance(instance, str) and len(instance) > limit:
+      noun = "character" if limit == 1 else "characters"
+      _error(errors, path, f"{_show(instance)} is longer than {limit} {noun}")
+
+  return check
+
+
+# Numbers
+
+
+def _bound(test, wording):
+  def compiler(validator, limit, schema, base):
+    def check(instance, path, errors):
+      if _TYPES["number"](instance) and not test(instance, limit):
+        _error(errors, path, f"{_show(instance)} is {wording} {limit}")
+
+    return check
+
+  return compiler
+
+
+def _multiple_of(validator, divisor, schema, base):
+  # Decimal arithmetic on the JSON text of both numbers: in binary floating
+  # point 0.3 / 0.1 is 2.9999999999999996, not a whole number.
+  step = decimal.Decimal(repr(divisor))
+
+  def check(instance, path, errors):
+    if _TYPES["number"](instance):
+      try:
+        remainder = decimal.Decimal(repr(instance)) % step
+      except (decimal.InvalidOperation, ValueError):
+        remainder = None
+      if remainder != 0:
+        _error(
+          errors, path, f"{_show(instance)} is not a multiple of {divisor}"
+        )
+
+  return check
+
+
+# Applicators
+
+
+def _all_of(validator, schemas, schema, base):
+  compiled = validator._subschemas(schemas, base)
+
+  def check(instance, path, errors):
+    for sub in compiled:
+      sub(instance, path, errors)
+
+  return check
+
+
+def _any_of(validator, schemas, schema, base):
+  compiled = validator._subschemas(schemas, base)
+
+  def check(instance, path, errors):
+    if not any(_is_valid(sub, instance) for sub in compiled):
+      _error(
+        errors,
+        path,
+        f"{_show(instance)} is not valid under any of the schemas listed in "
+        "the 'anyOf' keyword",
+      )
+
+  return check
+
+
+def _one_of(validator, schemas, schema, base):
+  compiled = validator._subschemas(schemas, base)
+
+  def check(instance, path, errors):
+    matches = sum(1 for sub in compiled if _is_valid(sub, instance))
+    if matches == 0:
+      _error(
+        errors,
+        path,
+        f"{_show(instance)} is not valid under any of the schemas listed in "
+        "the 'oneOf' keyword",
+      )
+    elif matches > 1:
+      _error(
+        errors,
+        path,
+        f"{_show(instance)} is valid under more than one of the schemas "
+        "listed in the 'oneOf' keyword",
+      )
+
+  return check
+
+
+def _not(validator, negated, schema, base):
+  sub = validator._compile(negated, base)
+
+  def check(instance, path, errors):
+    if _is_valid(sub, instance):
+      _error(
+        errors, path, f"{_show(instance)} is not allowed for {_show(negated)}"
+      )
+
+  return check
+
+
+def _if(validator, condition, schema, base):
+  test = validator._compile(condition, base)
+  then = validator._compile(schema.get("then", True), base)
+  otherwise = validator._compile(schema.get("else", True), base)
+
+  def check(instance, path, errors):
+    if _is_valid(test, instance):
+      then(instance, path, errors)
+    else:
+      otherwise(instance, path, errors)
+
+  return check
+
+
+_KEYWORDS = {
+  "$ref": _ref,
+  "type": _type,
+  "enum": _enum,
+  "const": _const,
+  "properties": _properties,
+  "patternProperties": _pattern_properties,
+  "additionalProperties": _additional_properties,
+  "required": _required,
+  "propertyNames": _property_names,
+  "minProperties": _min_properties,
+  "maxProperties": _max_properties,
+  "dependentRequired": _dependent_required,
+  "dependentSchemas": _dependent_schemas,
+  "prefixItems": _prefix_items,
+  "items": _items,
+  "minItems": _min_items,
+  "maxItems": _max_items,
+  "uniqueItems": _unique_items,
+  "contains": _contains,
+  "pattern": _pattern,
+  "minLength": _min_length,
+  "maxLength": _max_length,
+  "minimum": _bound(lambda v, n: v >= n, "less than the minimum of"),
+  "maximum": _bound(lambda v, n: v <= n, "greater than the maximum of"),
+  "exclusiveMinimum": _bound(
+    lambda v, n: v > n, "less than or equal to the minimum of"
+  ),
+  "exclusiveMaximum": _bound(
+    lambda v, n: v < n, "greater than or equal to the maximum of"
+  ),
+  "multipleOf": _multiple_of,
+  "allOf": _all_of,
+  "anyOf": _any_of,
+  "oneOf": _one_of,
+  "not": _not,
+  "if": _if,
+}
@@ -36,6 +36,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 import validate_examples as v  # noqa: E402
 
+# validate_examples put the repo root on sys.path.
+import schema_publish  # noqa: E402
+
 # -----------------------------------------------------------
 # Test harness (minimal, no deps)
 # -----------------------------------------------------------
@@ -615,9 +618,10 @@ def test_resolve_schema_cache_key() -> None:
       base_a.mkdir(parents=True)
       base_b.mkdir(parents=True)
 
-      first = v.resolve_schema("shopping/checkout", "response", "read", base_a)
-      cached = v.resolve_schema("shopping/checkout", "response", "read", base_a)
-      second = v.resolve_schema("shopping/checkout", "response", "read", base_b)
+      args = ("shopping/checkout", "response", "read")
+      first = v.resolve_schema(*args, base_a, engine="cli")
+      cached = v.resolve_schema(*args, base_a, engine="cli")
+      second = v.resolve_schema(*args, base_b, engine="cli")
 
     _check("schema_cache_same_base_hits", first == cached and len(calls) == 2)
     _check("schema_cache_separates_bases", first != second, f"got {second!r}")
@@ -626,6 +630,618 @@ def test_resolve_schema_cache_key() -> None:
     v._schema_cache.clear()
 
 
+def test_disk_cache_tracks_ref_closure() -> None:
+  """Persistent cache keys follow the $ref closure; entries are evicted LRU."""
+  with tempfile.TemporaryDirectory() as tmp:
+    root = Path(tmp)
+    (root / "types").mkdir()
+    schema = root / "checkout.json"
+    dep = root / "types" / "item.json"
+    schema.write_text(json.dumps({"$ref": "types/item.json#/$defs/x"}))
+    dep.write_text(json.dumps({"type": "object"}))
+    cache = v.schema_cache.SchemaCache(root / "cache", max_bytes=64)
+
+    key = cache.key(schema, "v1", "response", "read", True)
+    _check(
+      "disk_cache_flags_in_key",
+      key != cache.key(schema, "v1", "request", "read", True),
+    )
+    dep.write_text(json.dumps({"type": "string"}))
+    _check(
+      "disk_cache_ref_change_invalidates",
+      key != cache.key(schema, "v1", "response", "read", True),
+    )
+    _check(
+      "disk_cache_missing_schema_uncached",
+      cache.key(root / "missing.json", "v1") is None,
+    )
+
+    cache.put("aa" * 32, {"n": 1})
+    _check("disk_cache_round_trip", cache.get("aa" * 32) == {"n": 1})
+    cache.put("bb" * 32, {"n": "x" * 52})
+    _check(
+      "disk_cache_evicts_oldest",
+      cache.get("aa" * 32) is None and cache.get("bb" * 32) is not None,
+    )
+
+
+def test_result_cache() -> None:
+  """Block results are reused until the block or its dependencies change."""
+  with tempfile.TemporaryDirectory() as tmp:
+    root = Path(tmp)
+    base, scaffolds = root / "schemas", root / "scaffolds"
+    (base / "types").mkdir(parents=True)
+    scaffolds.mkdir()
+    (base / "x.json").write_text(json.dumps({"$ref": "types/y.json"}))
+    dep = base / "types" / "y.json"
+    dep.write_text(json.dumps({"type": "object"}))
+    block = {
+      "file": str(root / "a.md"),
+      "line": 3,
+      "content": "{}",
+      "annotation": {"schema": "x", "op": "read", "direction": "response"},
+      "error": None,
+    }
+    other = {**block, "file": str(root / "b.md"), "annotation": None}
+
+    cache = v.ResultCache(root / "results.json", "python")
+    key = cache.key(block, base, scaffolds)
+    cache.put(key, v.Result(block["file"], 3, "ok", "", block["annotation"]))
+    cache.save()
+    cache = v.ResultCache(root / "results.json", "python")
+    moved = {**block, "line": 9}
+    hit = cache.get(cache.key(moved, base, scaffolds), moved)
+    _check(
+      "result_cache_round_trip",
+      hit is not None and (hit.status, hit.line) == ("ok", 9),
+      f"got {hit!r}",
+    )
+    _check(
+      "result_cache_unkeyed_blocks", cache.key(other, base, scaffolds) is None
+    )
+    _check(
+      "result_cache_keys_engine",
+      key
+      != v.ResultCache(root / "results.json", "cli").key(
+        block, base, scaffolds
+      ),
+    )
+    _check(
+      "result_cache_keys_helper_modules",
+      {
+        Path(module.__file__).resolve()
+        for module in (v.schema_cache, v.schema_resolver, v.schema_validator)
+      }
+      <= set(v._TOOL_FILES),
+    )
+
+    _check(
+      "changed_selects_nothing_unrelated",
+      v.select_changed([block, other], {root / "c.json"}, base, scaffolds)
+      == [],
+    )
+    (scaffolds / "x_response.json").write_text("{}")
+    _check(
+      "result_cache_scaffold_invalidates",
+      cache.key(block, base, scaffolds) != key,
+    )
+    _check(
+      "changed_selects_scaffold_dependents",
+      v.select_changed(
+        [block, other], {(scaffolds / "x.json").resolve()}, base, scaffolds
+      )
+      == [block],
+    )
+    dep.write_text(json.dumps({"type": "string"}))
+    _check(
+      "changed_selects_ref_dependents",
+      v.select_changed([block, other], {dep.resolve()}, base, scaffolds)
+      == [block],
+    )
+    _check(
+      "changed_selects_changed_docs",
+      v.select_changed(
+        [block, other], {Path(other["file"]).resolve()}, base, scaffolds
+      )
+      == [other],
+    )
+
+
+def test_watch_invalidation() -> None:
+  """--watch drops exactly the resolved schemas whose $ref closure changed."""
+  with tempfile.TemporaryDirectory() as tmp:
+    base = Path(tmp).resolve()
+    (base / "a.json").write_text(json.dumps({"$ref": "c.json"}))
+    (base / "b.json").write_text(json.dumps({"type": "object"}))
+    (base / "c.json").write_text(json.dumps({"type": "object"}))
+    keys = [
+      (base, "a", "response", "read", "python"),
+      (base, "a", "request", "create", "python"),
+      (base, "b", "response", "read", "python"),
+    ]
+    v._schema_cache.clear()
+    v._schema_cache.update(dict.fromkeys(keys, {}))
+    try:
+      dropped = v.invalidate_schemas({base / "c.json"})
+      _check(
+        "watch_invalidates_closure",
+        dropped == 2 and list(v._schema_cache) == keys[2:],
+        f"got {list(v._schema_cache)}",
+      )
+      (base / "b.json").unlink()
+      v.invalidate_schemas(set())
+      _check("watch_invalidates_unreadable", not v._schema_cache)
+    finally:
+      v._schema_cache.clear()
+
+
+# -----------------------------------------------------------
+# In-process engine (no ucp-schema needed)
+# -----------------------------------------------------------
+
+
+def test_python_engine() -> None:
+  """Compiled validators report ucp-schema-shaped errors at JSON Pointers."""
+  validator = v.schema_validator.Validator(
+    {
+      "$defs": {
+        "node": {
+          "type": "object",
+          "required": ["id"],
+          "properties": {
+            "id": {"type": "string"},
+            "child": {"$ref": "#/$defs/node"},
+          },
+          "additionalProperties": False,
+        }
+      },
+      "$ref": "#/$defs/node",
+    }
+  )
+  valid, errors = validator.validate({"id": "a", "child": {"id": 1, "x": 0}})
+  _check(
+    "python_engine_error_paths",
+    not valid and {e["path"] for e in errors} == {"/child/id", "/child"},
+    f"got {errors}",
+  )
+  _check(
+    "python_engine_bool_is_not_number",
+    not v.schema_validator.Validator({"enum": [1]}).validate(True)[0],
+  )
+
+  md = (
+    "<!-- ucp:example schema=shopping/catalog_lookup op=get_product -->\n"
+    "```json\n"
+    "{\n"
+    '  "ucp": { "version": "{{ ucp_version }}", "...": "..." },\n'
+    '  "product": { "...": "..." }\n'
+    "}\n"
+    "```\n"
+  )
+  result = _process(md)
+  _check(
+    "python_engine_scaffold_seed_valid",
+    result.status == "ok",
+    f"got {result.status}: {result.message}",
+  )
+
+  # A wrong type fails, unless the path is ellipsis-acknowledged.
+  md = (
+    "<!-- ucp:example schema=common/identity_linking def=scope_policy -->\n"
+    '```json\n{ "description": { "plain": 5 } }\n```\n'
+  )
+  result = _process(md)
+  _check(
+    "python_engine_type_error",
+    result.status == "fail" and "/description/plain" in result.message,
+    f"got {result.status}: {result.message}",
+  )
+
+  # --engine check: differing paths after suppression fail the block.
+  pending = v.PendingValidation(
+    {"file": "x.md", "line": 1, "annotation": {"schema": "x"}},
+    ("x", "response", "read", None),
+    {},
+    {"/elided"},
+    [],
+  )
+  agree = v.finish_block(
+    pending, [{"path": "/a", "message": "m"}], [{"path": "/a", "message": "n"}]
+  )
+  differ = v.finish_block(
+    pending,
+    [{"path": "/elided/b", "message": "m"}],
+    [{"path": "/c", "message": "m"}],
+  )
+  _check("engine_check_agrees", "engine mismatch" not in agree.message)
+  _check(
+    "engine_check_mismatch_fails",
+    differ.status == "fail" and "engine mismatch" in differ.message,
+    f"got {differ.status}: {differ.message}",
+  )
+
+  def valid(schema, instance):
+    return v.schema_validator.Validator(schema).validate(instance)[0]
+
+  _check(
+    "python_engine_multiple_of_decimal",
+    valid({"multipleOf": 0.1}, 0.3)
+    and valid({"multipleOf": 0.01}, 19.99)
+    and not valid({"multipleOf": 0.1}, 0.35),
+  )
+  # ECMA-262 semantics: ASCII \d, `$` only at the very end, `.` stops at
+  # \r, ECMA \s, and (?<name>...) groups.
+  _check(
+    "python_engine_pattern_ecma",
+    not valid({"pattern": "^\\d+$"}, "\u0661\u0662")
+    and not valid({"pattern": "^a$"}, "a\n")
+    and not valid({"pattern": "^a.b$"}, "a\rb")
+    and valid({"pattern": "^\\s$"}, "\ufeff")
+    and valid({"pattern": "^(?<x>a)\\k<x>$"}, "aa"),
+  )
+
+  # A $def validated by pointer keeps the document as its root, so its
+  # internal refs resolve.
+  resolved = {
+    "$id": "https://ucp.dev/schemas/x.json",
+    "$defs": {
+      "id": {"type": "string"},
+      "item": {"properties": {"id": {"$ref": "#/$defs/id"}}},
+    },
+  }
+  ok, _ = v.validate_payload_with_schema(
+    {"id": "a"}, resolved, "#/$defs/item", "response", "read", _SCHEMA_BASE
+  )
+  bad, errors = v.validate_payload_with_schema(
+    {"id": 1}, resolved, "#/$defs/item", "response", "read", _SCHEMA_BASE
+  )
+  _check(
+    "python_engine_def_internal_refs",
+    ok and not bad and errors[0]["path"] == "/id",
+    f"got {errors}",
+  )
+  _check(
+    "cli_fragment_schema_keeps_defs",
+    v._fragment_schema(resolved, "#/$defs/item")
+    == {
+      "$id": resolved["$id"],
+      "$defs": resolved["$defs"],
+      "$ref": "#/$defs/item",
+    },
+  )
+
+
+# -----------------------------------------------------------
+# In-process resolver vs ucp-schema
+# -----------------------------------------------------------
+
+# One fixture per annotation form. Each maps file name -> schema; the first
+# file is the one resolved. Properties are named for the visibility they
+# should end up with so a divergence is easy to read.
+_ANNOTATION_FIXTURES: dict[str, dict[str, dict]] = {
+  "plain": {
+    "plain.json": {
+      "type": "object",
+      "required": ["optional_both"],
+      "properties": {
+        "omit_request": {"type": "string", "ucp_request": "omit"},
+        "omit_response": {"type": "string", "ucp_response": "omit"},
+        "required_both": {
+          "type": "string",
+          "ucp_request": "required",
+          "ucp_response": "required",
+        },
+        "optional_both": {
+          "type": "string",
+          "ucp_request": "optional",
+          "ucp_response": "optional",
+        },
+        "unannotated": {"type": "string"},
+      },
+    }
+  },
+  "per_operation": {
+    "per_operation.json": {
+      "type": "object",
+      "properties": {
+        "id": {
+          "type": "string",
+          "ucp_request": {"create": "omit", "update": "required"},
+        },
+        "note": {
+          "type": "string",
+          "ucp_request": {"create": "required", "update": "optional"},
+          "ucp_response": {"read": "omit"},
+        },
+      },
+    }
+  },
+  "transition": {
+    "transition.json": {
+      "type": "object",
+      "properties": {
+        "status": {
+          "type": "string",
+          "ucp_request": {
+            "update": {"transition": {"from": "required", "to": "omit"}},
+          },
+        },
+        "legacy": {
+          "type": "string",
+          "ucp_response": {
+            "transition": {"from": "optional", "to": "required"}
+          },
+        },
+      },
+    }
+  },
+  "shared_request": {
+    "shared_request.json": {
+      "type": "object",
+      "ucp_shared_request": True,
+      "required": ["label"],
+      "properties": {
+        "id": {"type": "string", "ucp_request": "omit"},
+        "label": {"type": "string", "ucp_request": "optional"},
+        "code": {"type": "string", "ucp_request": "required"},
+      },
+    }
+  },
+  "shared_request_per_operation": {
+    "shared_per_operation.json": {
+      "type": "object",
+      "ucp_shared_request": True,
+      "properties": {
+        "id": {
+          "type": "string",
+          "ucp_request": {"create": "omit", "update": "required"},
+        },
+      },
+    }
+  },
+  "nested_and_bundled": {
+    "parent.json": {
+      "$id": "https://example.test/parent.json",
+      "type": "object",
+      "$defs": {
+        "inner": {
+          "type": "object",
+          "properties": {
+            "secret": {"type": "string", "ucp_response": "omit"},
+            "visible": {"type": "string"},
+          },
+        }
+      },
+      "properties": {
+        "inner": {"$ref": "#/$defs/inner"},
+        "child": {
+          "$ref": "child.json",
+          "description": "Embedder description.",
+          "ucp_request": "required",
+        },
+        "items": {"type": "array", "items": {"$ref": "child.json"}},
+        "sample": {
+          "type": "object",
+          "default": {"properties": {"x": {"ucp_request": "omit"}}},
+        },
+      },
+    },
+    "child.json": {
+      "$id": "https://example.test/child.json",
+      "type": "object",
+      "ucp_shared_request": True,
+      "properties": {
+        "id": {"type": "string", "ucp_request": "omit"},
+        "name": {"type": "string", "ucp_request": "required"},
+      },
+    },
+  },
+}
+_PARITY_VARIANTS = [
+  (direction, op, bundle)
+  for direction in ("request", "response")
+  for op in ("create", "update", "read")
+  for bundle in (False, True)
+]
+
+
+def _write_fixture(files: dict[str, dict], directory: str) -> Path:
+  """Write a fixture's schemas into `directory`, returning the first one."""
+  for name, schema in files.items():
+    (Path(directory) / name).write_text(json.dumps(schema, indent=2))
+  return Path(directory) / next(iter(files))
+
+
+def _resolve_outcome(
+  resolver, path: Path, direction: str, op: str, bundle: bool
+) -> tuple[str, dict | None]:
+  """Return ("ok", schema) or ("error", None) for one resolution."""
+  try:
+    return "ok", resolver(path, direction, op, bundle)
+  except RuntimeError:
+    return "error", None
+
+
+def _resolve_with_cli(
+  path: Path, direction: str, op: str, bundle: bool
+) -> dict:
+  cmd = ["ucp-schema", "resolve", str(path), f"--{direction}", "--op", op]
+  if bundle:
+    cmd.append("--bundle")
+  result = v.subprocess.run(cmd, capture_output=True, text=True)
+  if result.returncode != 0:
+    raise RuntimeError(result.stderr.strip())
+  return json.loads(result.stdout)
+
+
+def test_shared_request() -> None:
+  """ucp_shared_request schemas resolve to one request shape for every op."""
+  resolver = v.schema_resolver
+  with tempfile.TemporaryDirectory() as td:
+    path = _write_fixture(_ANNOTATION_FIXTURES["shared_request"], td)
+    create = resolver.resolve(path, "request", "create")
+    update = resolver.resolve(path, "request", "update")
+  _check(
+    "shared_request_same_for_every_op",
+    create == update
+    and set(create["properties"]) == {"label", "code"}
+    and create["required"] == ["code"],
+    f"create={create}, update={update}",
+  )
+
+  # Keywords the embedder sets next to the $ref refine the inlined child.
+  with tempfile.TemporaryDirectory() as td:
+    path = _write_fixture(_ANNOTATION_FIXTURES["nested_and_bundled"], td)
+    bundled = resolver.resolve(path, "request", "create", bundle=True)
+  child = bundled["properties"]["child"]
+  _check(
+    "shared_request_bundled_child",
+    set(child["properties"]) == {"name"}
+    and child["description"] == "Embedder description.",
+    f"got {child}",
+  )
+
+
+def test_resolver_matches_cli() -> None:
+  """schema_resolver.resolve matches `ucp-schema resolve` on every fixture."""
+  if not _has_ucp_schema():
+    _check(
+      "resolver_cli_parity", False, "SKIPPED: ucp-schema binary not on PATH"
+    )
+    return
+  for form, files in _ANNOTATION_FIXTURES.items():
+    mismatches = []
+    with tempfile.TemporaryDirectory() as td:
+      path = _write_fixture(files, td)
+      for direction, op, bundle in _PARITY_VARIANTS:
+        ours, python_schema = _resolve_outcome(
+          v.schema_resolver.resolve, path, direction, op, bundle
+        )
+        theirs, cli_schema = _resolve_outcome(
+          _resolve_with_cli, path, direction, op, bundle
+        )
+        variant = f"{direction}/{op}{'/bundle' if bundle else ''}"
+        if ours != theirs:
+          mismatches.append(f"{variant}: python {ours}, cli {theirs}")
+        elif ours == "ok":
+          diff = v.schema_resolver.first_difference(python_schema, cli_schema)
+          if diff is not None:
+            mismatches.append(f"{variant}: differs at {diff}")
+    _check(f"resolver_cli_parity_{form}", not mismatches, "; ".join(mismatches))
+
+
+# -----------------------------------------------------------
+# Schema publishing (hooks.py on_post_build)
+# -----------------------------------------------------------
+
+
+def _publish_into_clean_site(source: Path, site: Path) -> dict[str, bytes]:
+  """Publish like a spec build: into an emptied site_dir. Returns its files."""
+  shutil.rmtree(site, ignore_errors=True)
+  site.mkdir()
+  schema_publish.publish(source, site, "2026-01-23", "2026-01-23", workers=0)
+  return {
+    p.relative_to(site).as_posix(): p.read_bytes()
+    for p in sorted(site.rglob("*"))
+    if p.is_file()
+  }
+
+
+def test_publish_survives_clean_site() -> None:
+  """Unchanged outputs are not rewritten although site_dir starts empty."""
+  original_staging = schema_publish.STAGING_DIR
+  with tempfile.TemporaryDirectory() as td:
+    root = Path(td)
+    schema_publish.STAGING_DIR = root / "staging"
+    source = root / "source"
+    (source / "schemas").mkdir(parents=True)
+    (source / "schemas" / "a.json").write_text(
+      json.dumps(
+        {
+          "$id": "https://ucp.dev/schemas/a.json",
+          "properties": {"b": {"$ref": "b.json"}},
+        }
+      )
+    )
+    (source / "schemas" / "b.json").write_text(
+      json.dumps({"$id": "https://ucp.dev/schemas/b.json", "type": "string"})
+    )
+    try:
+      first = _publish_into_clean_site(source, root / "site")
+      # Staged outputs, not the manifests next to the staging trees.
+      staged = {
+        p: p.stat().st_mtime_ns
+        for p in schema_publish.STAGING_DIR.glob("*/**/*")
+        if p.is_file()
+      }
+      second = _publish_into_clean_site(source, root / "site")
+      rewritten = [
+        p.name for p, mtime in staged.items() if p.stat().st_mtime_ns != mtime
+      ]
+      _check(
+        "publish_clean_site_same_output",
+        first == second and "schemas/a.json" in second,
+        f"first={sorted(first)}, second={sorted(second)}",
+      )
+      _check(
+        "publish_clean_site_skips_unchanged",
+        staged and not rewritten,
+        f"staged: {len(staged)}, rewritten: {rewritten}",
+      )
+
+      # An edit rewrites that schema's outputs, and the site has the edit.
+      (source / "schemas" / "b.json").write_text(
+        json.dumps({"$id": "https://ucp.dev/schemas/b.json", "type": "number"})
+      )
+      third = _publish_into_clean_site(source, root / "site")
+      _check(
+        "publish_clean_site_picks_up_edits",
+        b'"number"' in third["schemas/b.json"]
+        and third["schemas/a.json"] == second["schemas/a.json"],
+      )
+    finally:
+      schema_publish.STAGING_DIR = original_staging
+
+
+def test_publish_reuses_sidecars() -> None:
+  """Minified and compressed sidecars are not regenerated when unchanged."""
+  original_staging = schema_publish.STAGING_DIR
+  original_payloads = schema_publish._derived_payloads
+  regenerated: list[bytes] = []
+
+  def counting_payloads(data, payload):
+    regenerated.append(payload)
+    return original_payloads(data, payload)
+
+  with tempfile.TemporaryDirectory() as td:
+    root = Path(td)
+    schema_publish.STAGING_DIR = root / "staging"
+    schema_publish._derived_payloads = counting_payloads
+    source = root / "source"
+    source.mkdir()
+    (source / "a.json").write_text(
+      json.dumps({"$id": "https://ucp.dev/schemas/a.json", "type": "string"})
+    )
+    try:
+      first = _publish_into_clean_site(source, root / "site")
+      regenerated.clear()
+      second = _publish_into_clean_site(source, root / "site")
+    finally:
+      schema_publish.STAGING_DIR = original_staging
+      schema_publish._derived_payloads = original_payloads
+  sidecars = {"schemas/a.min.json", "schemas/a.json.gz", "etags.json"}
+  _check(
+    "publish_sidecars_not_regenerated",
+    not regenerated,
+    f"regenerated {len(regenerated)} schema(s)",
+  )
+  _check(
+    "publish_sidecars_still_published",
+    sidecars <= second.keys() and first == second,
+    f"got {sorted(second)}",
+  )
+
+
 # -----------------------------------------------------------
 # Main
 # -----------------------------------------------------------
@@ -643,6 +1259,14 @@ def main() -> int:
   test_extract_blocks()
   test_scaffold_resolution()
   test_resolve_schema_cache_key()
+  test_disk_cache_tracks_ref_closure()
+  test_result_cache()
+  test_watch_invalidation()
+  test_publish_survives_clean_site()
+  test_publish_reuses_sidecars()
+  test_python_engine()
+  test_shared_request()
+  test_resolver_matches_cli()
   test_process_block_integration()
   return _report()
 
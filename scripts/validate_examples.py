@@ -82,7 +82,13 @@ Layer 3 — Semantic interpretation. Operates on the parsed tree:
     fills required gaps.
   - Coverage walk: for each object in the example, verify every
     schema-required field is either present or elision-acknowledged.
-  - The merged payload is validated by `ucp-schema validate`.
+  - The merged payload is validated against the schema's op and
+    direction shape (or def=), in-process by a compiled validator
+    (scripts/schema_validator.py) or by `ucp-schema validate`; both
+    report errors as {path, message} with JSON Pointer paths.
+    Payloads are batched by (schema, direction, op, def): each group
+    shares one compiled validator or schema file, and identical
+    payloads are validated once.
   - Validation errors whose path is an elided path (or descendant)
     are suppressed.
 
@@ -104,18 +110,69 @@ CLI
   validate_examples.py --schema-base source/schemas/
   validate_examples.py --schema-base source/schemas/ --file FILE
   validate_examples.py --schema-base source/schemas/ --audit
+  validate_examples.py --schema-base source/schemas/ --no-cache
+  validate_examples.py --schema-base source/schemas/ --jobs N
+  validate_examples.py --schema-base source/schemas/ --engine check
+  validate_examples.py --schema-base source/schemas/ --changed-since REF
+  validate_examples.py --schema-base source/schemas/ --watch
+
+Resolved schemas are persisted in the content-addressed cache shared
+with the docs build (schema_cache.py at the repo root). Each block's
+result is cached in .cache/validate-examples.json, keyed by the block's
+content and annotation, the content of its schema's $ref closure and of
+its scaffold, the validator code and the engine; unchanged blocks are
+reported from there. --no-cache resolves and validates everything afresh
+and leaves both caches untouched.
+
+--changed-since REF validates only blocks in Markdown files changed
+since git REF (committed, uncommitted or untracked) and blocks whose
+schema closure or scaffold includes a changed file. A change to the
+validator itself selects every block.
+
+--watch validates everything once, keeps resolved schemas and compiled
+validators in memory and polls docs, schemas and scaffolds (the --file
+docs only, if given). On each change it re-extracts changed Markdown
+files, drops only the schemas whose $ref closure changed and
+revalidates the affected blocks. Restart it after editing the validator.
+
+--engine python (default) resolves with schema_resolver.py (shared with
+the docs build) and validates with compiled validators, without spawning
+ucp-schema. --engine cli resolves and validates with ucp-schema. --engine
+check reports ucp-schema's results and fails any block where the python
+engine flags different (unsuppressed) paths; CI runs this mode. The
+python engine is not equivalent to ucp-schema (see schema_validator.py
+for the known gaps, e.g. `format` is never asserted), so its passes are
+provisional until check agrees.
+
+--jobs N extracts files, resolves schemas and validates on N threads;
+results are still reported in file/line order. It defaults to 1 (serial)
+for the python engine, whose work is CPU-bound under the GIL, and to the
+CPU count for cli and check, which wait on ucp-schema subprocesses.
 
 Exit codes: 0 if all pass or skip; 1 if any block fails or errors.
 """
 
 import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
+import os
 import re
 import subprocess
 import sys
 import tempfile
+import time
 from pathlib import Path
 
+import schema_validator
+
+# schema_cache and schema_resolver live at the repo root, shared with the
+# docs macros.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import schema_cache  # noqa: E402
+import schema_resolver  # noqa: E402
+
 # -----------------------------------------------------------
 # Constants
 # -----------------------------------------------------------
@@ -627,25 +684,53 @@ def check_coverage(example, schema: dict, path: str = "$") -> list[str]:
   return errors
 
 
+# -----------------------------------------------------------
+# Engines
+# -----------------------------------------------------------
+
+# "python" resolves with schema_resolver and validates with compiled
+# schema_validator Validators, in-process. "cli" shells out to ucp-schema
+# for both. "check" reports ucp-schema's results and fails any block where
+# the python engine disagrees. Set by --engine.
+ENGINES = ("python", "cli", "check")
+_engine = "python"
+
+
+def _resolution_engine() -> str:
+  return "python" if _engine == "python" else "cli"
+
+
 # -----------------------------------------------------------
 # Schema resolution (cached)
 # -----------------------------------------------------------
 
 _schema_cache: dict[tuple, dict] = {}
+# Persistent cache shared across runs; None when disabled (--no-cache).
+_disk_cache = schema_cache.SchemaCache.from_env()
+
+
+def _disk_cache_key(
+  full_path: Path, direction: str, op: str, engine: str
+) -> str | None:
+  """Return the persistent cache key for a resolution, or None to bypass."""
+  if _disk_cache is None or not full_path.exists():
+    return None
+  if engine == "python":
+    version = schema_resolver.ENGINE_ID
+  else:
+    version = schema_cache.ucp_schema_version()
+  if version is None:
+    return None
+  return _disk_cache.key(full_path, version, direction, op, True)
 
 
-def resolve_schema(
+def _resolve_cli(
+  full_path: Path,
   schema_path: str,
   direction: str,
   op: str,
   schema_base: Path,
 ) -> dict:
-  """Resolve a schema via ucp-schema, with caching."""
-  key = (schema_base.resolve(), schema_path, direction, op)
-  if key in _schema_cache:
-    return _schema_cache[key]
-
-  full_path = schema_base / f"{schema_path}.json"
   result = subprocess.run(
     [
       "ucp-schema",
@@ -667,116 +752,264 @@ def resolve_schema(
       f" {schema_path} ({direction}/{op}):"
       f" {result.stderr.strip()}"
     )
-  schema = json.loads(result.stdout)
+  return json.loads(result.stdout)
+
+
+def resolve_schema(
+  schema_path: str,
+  direction: str,
+  op: str,
+  schema_base: Path,
+  engine: str | None = None,
+) -> dict:
+  """Resolve and bundle a schema, with caching.
+
+  `engine` is "python" or "cli"; by default the one --engine selects
+  ("check" resolves with ucp-schema, the reference).
+  """
+  engine = engine or _resolution_engine()
+  key = (schema_base.resolve(), schema_path, direction, op, engine)
+  if key in _schema_cache:
+    return _schema_cache[key]
+
+  full_path = schema_base / f"{schema_path}.json"
+  disk_key = _disk_cache_key(full_path, direction, op, engine)
+  schema = _disk_cache.get(disk_key) if disk_key is not None else None
+  if schema is not None:
+    _schema_cache[key] = schema
+    return schema
+
+  if engine == "python":
+    try:
+      schema = schema_resolver.resolve(full_path, direction, op, bundle=True)
+    except RuntimeError as e:
+      raise RuntimeError(
+        f"resolve failed for {schema_path} ({direction}/{op}): {e}"
+      ) from e
+  else:
+    schema = _resolve_cli(full_path, schema_path, direction, op, schema_base)
+  if disk_key is not None:
+    _disk_cache.put(disk_key, schema)
   _schema_cache[key] = schema
   return schema
 
 
+def select_schema(resolved: dict, direction: str, op: str) -> dict:
+  """Return the shape a payload for op+direction is validated against.
+
+  Container capabilities (no root body; request/response shapes under
+  $defs/{op}_{direction}, e.g. catalog) select the shape from op and
+  direction, matching what `ucp-schema validate` selects.
+  """
+  op_key = f"{op}_{direction}"
+  defs = resolved.get("$defs", {})
+  if "properties" not in resolved and op_key in defs:
+    return defs[op_key]
+  return resolved
+
+
 # -----------------------------------------------------------
-# Payload validation via ucp-schema
+# Payload validation
 # -----------------------------------------------------------
 
+# Compiled validators, one per (schema base, schema, direction, op, def).
+_validators: dict[tuple, schema_validator.Validator] = {}
 
-def validate_payload(
-  payload: dict,
+
+def _python_validator(
   schema_path: str,
   direction: str,
   op: str,
+  schema_def: str | None,
+  schema_base: Path,
+) -> schema_validator.Validator:
+  """Compile (once) the in-process validator for a validation group."""
+  key = (schema_base.resolve(), schema_path, direction, op, schema_def)
+  validator = _validators.get(key)
+  if validator is None:
+    resolved = resolve_schema(schema_path, direction, op, schema_base, "python")
+    if schema_def:
+      target = resolved.get("$defs", {}).get(schema_def)
+      if target is None:
+        raise RuntimeError(f"$defs/{schema_def} not found in schema")
+    else:
+      target = select_schema(resolved, direction, op)
+    validator = schema_validator.Validator(target, root=resolved)
+    _validators[key] = validator
+  return validator
+
+
+def _run_validate(
+  payload_file: Path,
+  schema_file: Path,
+  direction: str,
+  op: str,
   schema_base: Path,
 ) -> tuple[bool, list[dict]]:
-  """Validate a payload via ucp-schema validate."""
-  full_schema = schema_base / f"{schema_path}.json"
-  with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-    json.dump(payload, f)
-    tmp_path = f.name
+  """Run `ucp-schema validate` on one payload file."""
+  result = subprocess.run(
+    [
+      "ucp-schema",
+      "validate",
+      str(payload_file),
+      "--schema",
+      str(schema_file),
+      f"--{direction}",
+      "--op",
+      op,
+      "--json",
+    ],
+    capture_output=True,
+    text=True,
+    cwd=str(schema_base.parent),
+  )
+  if result.stdout.strip():
+    output = json.loads(result.stdout)
+    return (
+      output.get("valid", False),
+      output.get("errors", []),
+    )
+  # No JSON output — non-zero exit is an error
+  if result.returncode != 0:
+    return False, [
+      {
+        "path": "",
+        "message": result.stderr.strip(),
+      }
+    ]
+  return True, []
+
+
+def _fragment_schema(resolved: dict, pointer: str) -> dict:
+  """Return a schema validating the subschema at `pointer` of `resolved`.
+
+  `ucp-schema validate` takes a schema file, not a pointer into one.
+  Writing the bare subschema would leave its `#/$defs/...` refs dangling,
+  so the document's identity and `$defs` are kept and the root just
+  refers to the subschema.
+  """
+  schema = {
+    key: resolved[key] for key in ("$schema", "$id", "$defs") if key in resolved
+  }
+  schema["$ref"] = pointer
+  return schema
+
+
+def _validate_cli(
+  schema_path: str,
+  schema_dict: dict | None,
+  direction: str,
+  op: str,
+  payloads: list[dict],
+  schema_base: Path,
+) -> list[tuple[bool, list[dict]]]:
+  """Validate a group with ucp-schema.
+
+  Validates against `schema_dict` (see _fragment_schema) when given, else
+  against the schema file at `schema_path`. The schema is written once
+  for the whole group and identical payloads are validated once.
+  `ucp-schema validate` takes a single instance, so each distinct payload
+  is still its own invocation.
+  """
+  outcomes: dict[str, tuple[bool, list[dict]]] = {}
+  with tempfile.TemporaryDirectory() as tmp:
+    tmp_dir = Path(tmp)
+    if schema_dict is not None:
+      schema_file = tmp_dir / "schema.json"
+      schema_file.write_text(json.dumps(schema_dict))
+    else:
+      schema_file = schema_base / f"{schema_path}.json"
+    texts = [json.dumps(payload, sort_keys=True) for payload in payloads]
+    for text in texts:
+      if text in outcomes:
+        continue
+      payload_file = tmp_dir / f"payload-{len(outcomes)}.json"
+      payload_file.write_text(text)
+      outcomes[text] = _run_validate(
+        payload_file, schema_file, direction, op, schema_base
+      )
+  return [outcomes[text] for text in texts]
+
+
+def validate_group(
+  schema_path: str,
+  direction: str,
+  op: str,
+  schema_def: str | None,
+  payloads: list[dict],
+  schema_base: Path,
+  engine: str = "python",
+) -> list[tuple[bool, list[dict]]]:
+  """Validate payloads sharing one schema, direction, op and def.
+
+  Validates against $defs/`schema_def` when given, else against the
+  op+direction shape of the schema. `engine` is "python" (one compiled
+  validator for the whole group) or "cli". Results are returned in
+  payload order.
+  """
+  if engine == "cli":
+    schema_dict = None
+    if schema_def:
+      resolved = resolve_schema(schema_path, direction, op, schema_base, "cli")
+      schema_dict = _fragment_schema(resolved, f"#/$defs/{schema_def}")
+    return _validate_cli(
+      schema_path, schema_dict, direction, op, payloads, schema_base
+    )
 
   try:
-    result = subprocess.run(
-      [
-        "ucp-schema",
-        "validate",
-        tmp_path,
-        "--schema",
-        str(full_schema),
-        f"--{direction}",
-        "--op",
-        op,
-        "--json",
-      ],
-      capture_output=True,
-      text=True,
-      cwd=str(schema_base.parent),
+    validator = _python_validator(
+      schema_path, direction, op, schema_def, schema_base
     )
-    if result.stdout.strip():
-      output = json.loads(result.stdout)
-      return (
-        output.get("valid", False),
-        output.get("errors", []),
-      )
-    # No JSON output — non-zero exit is an error
-    if result.returncode != 0:
-      return False, [
-        {
-          "path": "",
-          "message": result.stderr.strip(),
-        }
-      ]
-    return True, []
-  finally:
-    Path(tmp_path).unlink()
+  except RuntimeError as e:
+    return [(False, [{"path": "", "message": str(e)}])] * len(payloads)
+  return [validator.validate(payload) for payload in payloads]
+
+
+def validate_payload(
+  payload: dict,
+  schema_path: str,
+  direction: str,
+  op: str,
+  schema_base: Path,
+) -> tuple[bool, list[dict]]:
+  """Validate a payload with the engine --engine selects."""
+  return validate_group(
+    schema_path,
+    direction,
+    op,
+    None,
+    [payload],
+    schema_base,
+    _resolution_engine(),
+  )[0]
 
 
 def validate_payload_with_schema(
   payload: dict,
-  schema_dict: dict,
+  resolved: dict,
+  pointer: str,
   direction: str,
   op: str,
   schema_base: Path,
 ) -> tuple[bool, list[dict]]:
-  """Validate against an extracted schema dict."""
-  tmp_schema = None
-  tmp_payload = None
-  try:
-    with tempfile.NamedTemporaryFile(
-      mode="w", suffix=".json", delete=False
-    ) as f:
-      json.dump(schema_dict, f)
-      tmp_schema = f.name
-    with tempfile.NamedTemporaryFile(
-      mode="w", suffix=".json", delete=False
-    ) as f:
-      json.dump(payload, f)
-      tmp_payload = f.name
-    result = subprocess.run(
-      [
-        "ucp-schema",
-        "validate",
-        tmp_payload,
-        "--schema",
-        tmp_schema,
-        f"--{direction}",
-        "--op",
-        op,
-        "--json",
-      ],
-      capture_output=True,
-      text=True,
-      cwd=str(schema_base.parent),
-    )
-    if result.stdout.strip():
-      output = json.loads(result.stdout)
-      return (
-        output.get("valid", False),
-        output.get("errors", []),
-      )
-    if result.returncode != 0:
-      return False, [{"path": "", "message": result.stderr.strip()}]
-    return True, []
-  finally:
-    if tmp_schema:
-      Path(tmp_schema).unlink()
-    if tmp_payload:
-      Path(tmp_payload).unlink()
+  """Validate against the subschema at `pointer` of a resolved document.
+
+  The whole document stays the root, so `#/$defs/...` refs inside the
+  subschema still resolve.
+  """
+  if _resolution_engine() == "cli":
+    return _validate_cli(
+      "",
+      _fragment_schema(resolved, pointer),
+      direction,
+      op,
+      [payload],
+      schema_base,
+    )[0]
+  target = schema_resolver.resolve_json_pointer(pointer, resolved)
+  if target is None:
+    raise RuntimeError(f"{pointer} not found in schema")
+  return schema_validator.Validator(target, root=resolved).validate(payload)
 
 
 # -----------------------------------------------------------
@@ -784,6 +1017,39 @@ def validate_payload_with_schema(
 # -----------------------------------------------------------
 
 
+def scaffold_candidates(
+  schema_path: str,
+  direction: str,
+  op: str,
+  scaffolds_dir: Path,
+) -> list[Path]:
+  """Return the scaffold fixtures for a schema+direction+op, by priority."""
+  name = schema_path.replace("/", "_")
+  return [
+    # Specific: checkout_request_create.json
+    scaffolds_dir / f"{name}_{direction}_{op}.json",
+    # Direction-only: checkout_response.json
+    scaffolds_dir / f"{name}_{direction}.json",
+    # Generic: checkout.json
+    scaffolds_dir / f"{name}.json",
+  ]
+
+
+def scaffold_file(
+  schema_path: str,
+  direction: str,
+  op: str,
+  scaffolds_dir: Path,
+) -> Path | None:
+  """Return the scaffold fixture used for a schema+direction+op, if any."""
+  for candidate in scaffold_candidates(
+    schema_path, direction, op, scaffolds_dir
+  ):
+    if candidate.exists():
+      return candidate
+  return None
+
+
 def load_scaffold(
   schema_path: str,
   direction: str,
@@ -791,23 +1057,193 @@ def load_scaffold(
   scaffolds_dir: Path,
 ) -> dict | None:
   """Load scaffold fixture for a schema+direction+op."""
-  # Try specific: checkout_request_create.json
-  name = schema_path.replace("/", "_")
-  specific = scaffolds_dir / f"{name}_{direction}_{op}.json"
-  if specific.exists():
-    return json.loads(specific.read_text())
+  path = scaffold_file(schema_path, direction, op, scaffolds_dir)
+  return json.loads(path.read_text()) if path is not None else None
 
-  # Try direction-only: checkout_response.json
-  dir_only = scaffolds_dir / f"{name}_{direction}.json"
-  if dir_only.exists():
-    return json.loads(dir_only.read_text())
 
-  # Try generic: checkout.json
-  generic = scaffolds_dir / f"{name}.json"
-  if generic.exists():
-    return json.loads(generic.read_text())
+# -----------------------------------------------------------
+# Block dependencies and result cache
+# -----------------------------------------------------------
+
+RESULT_CACHE_PATH = (
+  Path(__file__).resolve().parent.parent / ".cache" / "validate-examples.json"
+)
+# Entries kept in the result cache, most recently used first.
+RESULT_CACHE_MAX = 4096
+# Code whose changes invalidate every cached result: this script and every
+# helper module it imports (resolve_schema reads the disk cache through
+# schema_cache, so it counts too).
+_TOOL_FILES = (
+  Path(__file__).resolve(),
+  *(
+    Path(module.__file__).resolve()
+    for module in (schema_validator, schema_cache, schema_resolver)
+  ),
+)
 
-  return None
+
+def block_dependencies(
+  block: dict,
+  schema_base: Path,
+  scaffolds_dir: Path,
+) -> list[tuple[Path, str]] | None:
+  """Return (path, digest) of every file a block's result depends on.
+
+  That is the annotated schema with its transitive $ref closure, and the
+  scaffold fixture. Returns None for blocks decided without any of them
+  (unannotated, skipped, malformed) and for unreadable schemas.
+  """
+  annotation = block["annotation"]
+  if block.get("error") or not annotation:
+    return None
+  if annotation.get("_error") or annotation.get("skip"):
+    return None
+  schema_path = annotation.get("schema")
+  if not schema_path:
+    return None
+  try:
+    closure = schema_cache.ref_closure(schema_base / f"{schema_path}.json")
+  except OSError:
+    return None
+  scaffold = scaffold_file(
+    schema_path, annotation["direction"], annotation["op"], scaffolds_dir
+  )
+  if scaffold is not None:
+    closure.append((scaffold.resolve(), schema_cache.file_digest(scaffold)))
+  return closure
+
+
+class ResultCache:
+  """Block Results from earlier runs, keyed by everything they depend on.
+
+  A key covers the block's text and annotation, the content of its schema
+  closure and scaffold (block_dependencies), the validator code and the
+  engine, so an unchanged block is reported without resolving or
+  validating anything. Only ok/fail results are cached.
+  """
+
+  def __init__(self, path: Path, engine: str) -> None:
+    """Load the cache at `path` for results produced by `engine`."""
+    self.path = path
+    digest = hashlib.sha256(engine.encode())
+    if engine != "python":
+      digest.update((schema_cache.ucp_schema_version() or "").encode())
+    for tool in _TOOL_FILES:
+      digest.update(tool.read_bytes())
+    self._tool = digest.hexdigest()
+    try:
+      self._entries = json.loads(path.read_text())
+    except (OSError, ValueError):
+      self._entries = {}
+    self._used: dict[str, list] = {}
+
+  def key(
+    self, block: dict, schema_base: Path, scaffolds_dir: Path
+  ) -> str | None:
+    """Return the cache key for a block, or None if it is not cacheable."""
+    dependencies = block_dependencies(block, schema_base, scaffolds_dir)
+    if dependencies is None:
+      return None
+    digest = hashlib.sha256(self._tool.encode())
+    digest.update(block["content"].encode())
+    digest.update(json.dumps(block["annotation"], sort_keys=True).encode())
+    for path, content_hash in dependencies:
+      digest.update(f"\0{path}\0{content_hash}".encode())
+    return digest.hexdigest()
+
+  def get(self, key: str | None, block: dict) -> "Result | None":
+    """Return the cached Result for `key`, placed at `block`, or None."""
+    entry = self._entries.get(key) if key is not None else None
+    if entry is None:
+      return None
+    self._used[key] = entry
+    status, message = entry
+    return Result(
+      block["file"], block["line"], status, message, block["annotation"]
+    )
+
+  def put(self, key: str | None, result: "Result") -> None:
+    """Remember `result` under `key` if it is cacheable."""
+    if key is not None and result.status in ("ok", "fail"):
+      self._used[key] = [result.status, result.message]
+
+  def save(self) -> None:
+    """Write entries used this run first, then older ones up to the cap."""
+    entries = dict(self._used)
+    for key, entry in self._entries.items():
+      if len(entries) >= RESULT_CACHE_MAX:
+        break
+      entries.setdefault(key, entry)
+    try:
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      tmp = self.path.with_suffix(".tmp")
+      tmp.write_text(json.dumps(entries, separators=(",", ":")))
+      tmp.replace(self.path)
+    except OSError:
+      pass  # A read-only cache directory must never fail validation
+
+
+def select_changed(
+  blocks: list[dict],
+  changed: set[Path],
+  schema_base: Path,
+  scaffolds_dir: Path,
+) -> list[dict]:
+  """Return the blocks whose result may differ after `changed` files.
+
+  These are blocks in a changed Markdown file and blocks whose schema
+  closure or scaffold includes a changed file. Adding or deleting any
+  candidate scaffold counts, since it changes which one is used, and so
+  does a schema that no longer resolves (e.g. a deleted $ref target).
+  """
+  selected = []
+  for block in blocks:
+    if Path(block["file"]).resolve() in changed:
+      selected.append(block)
+      continue
+    annotation = block["annotation"] or {}
+    schema_path = annotation.get("schema")
+    if not schema_path or annotation.get("skip") or annotation.get("_error"):
+      continue
+    dependencies = block_dependencies(block, schema_base, scaffolds_dir)
+    if dependencies is None:
+      selected.append(block)  # The schema closure is unreadable
+      continue
+    paths = {path for path, _ in dependencies}
+    paths.update(
+      candidate.resolve()
+      for candidate in scaffold_candidates(
+        schema_path, annotation["direction"], annotation["op"], scaffolds_dir
+      )
+    )
+    if not paths.isdisjoint(changed):
+      selected.append(block)
+  return selected
+
+
+# Set by main unless --no-cache; validate_blocks consults it.
+_result_cache: ResultCache | None = None
+
+
+def changed_files(ref: str, repo_root: Path) -> set[Path]:
+  """Return files changed since git `ref`, including uncommitted and new.
+
+  Raises RuntimeError if git fails (e.g. an unknown ref).
+  """
+  changed = set()
+  for command in (
+    ["git", "diff", "--name-only", ref, "--"],
+    ["git", "ls-files", "--others", "--exclude-standard"],
+  ):
+    result = subprocess.run(
+      command, capture_output=True, text=True, cwd=str(repo_root)
+    )
+    if result.returncode != 0:
+      raise RuntimeError(f"{' '.join(command)} failed: {result.stderr.strip()}")
+    changed.update(
+      (repo_root / line).resolve() for line in result.stdout.splitlines()
+    )
+  return changed
 
 
 # -----------------------------------------------------------
@@ -861,6 +1297,26 @@ class Result:
     return line
 
 
+class PendingValidation:
+  """A block that passed the local checks and awaits schema validation."""
+
+  def __init__(
+    self,
+    block: dict,
+    group: tuple,
+    payload: dict,
+    ellipsis_paths: set[str],
+    coverage_errors: list[str],
+  ) -> None:
+    """Record what finish_block needs once the payload is validated."""
+    self.block = block
+    # (schema, direction, op, def): blocks validated in one batch
+    self.group = group
+    self.payload = payload
+    self.ellipsis_paths = ellipsis_paths
+    self.coverage_errors = coverage_errors
+
+
 def parse_example(raw: str):
   """Layer 2 boundary. Reduce text to JSON, parse to a tree.
 
@@ -876,17 +1332,20 @@ def parse_example(raw: str):
   return json.loads(canonical)
 
 
-def process_block(
+def prepare_block(
   block: dict,
   schema_base: Path,
   scaffolds_dir: Path,
-) -> Result:
-  """Run the validation pipeline on one block.
+) -> "Result | PendingValidation":
+  """Run the validation pipeline on one block up to schema validation.
 
   Three layers, in order:
     Layer 1→2: reduce_to_canonical_json (text → strict JSON)
     Layer 2→3: parse_example (JSON → tree + elided paths)
-    Layer 3:    coverage + scaffold merge + schema validate
+    Layer 3:    coverage + scaffold merge (schema validate: finish_block)
+
+  Returns the block's Result if it is decided without validation (skip,
+  errors, empty body), else the merged payload to validate.
   """
   file, line = block["file"], block["line"]
   annotation = block["annotation"]
@@ -958,14 +1417,12 @@ def process_block(
     return Result(file, line, "error", str(e), annotation)
 
   # 6. Coverage check — pick the schema the example is checked against.
-  # Container capabilities (no root body; request/response shapes under
-  # $defs/{op}_{direction}, e.g. catalog) derive the shape from op+direction,
-  # matching what `ucp-schema validate` selects. def= remains the explicit
-  # selector for shapes that aren't an operation+direction (a transport's
-  # error_response, a profile's business_schema, a sub-type). target=
-  # optionally narrows to a sub-schema for partial examples.
+  # Container capabilities derive the shape from op+direction (see
+  # select_schema). def= remains the explicit selector for shapes that
+  # aren't an operation+direction (a transport's error_response, a
+  # profile's business_schema, a sub-type). target= optionally narrows to
+  # a sub-schema for partial examples.
   defs = resolved.get("$defs", {})
-  op_key = f"{op}_{direction}"
   if schema_def:
     if schema_def not in defs:
       return Result(
@@ -976,10 +1433,8 @@ def process_block(
         annotation,
       )
     validation_schema = defs[schema_def]
-  elif "properties" not in resolved and op_key in defs:
-    validation_schema = defs[op_key]
   else:
-    validation_schema = resolved
+    validation_schema = select_schema(resolved, direction, op)
 
   if target_path:
     coverage_schema = jsonpath_get_schema(validation_schema, target_path)
@@ -1033,31 +1488,60 @@ def process_block(
     merged = deep_merge(scaffold, stripped)
 
   # 9. Validate — use extracted $def schema if specified
-  if schema_def:
-    valid, val_errors = validate_payload_with_schema(
-      merged, validation_schema, direction, op, schema_base
-    )
-  else:
-    valid, val_errors = validate_payload(
-      merged,
-      schema_path,
-      direction,
-      op,
-      schema_base,
-    )
+  return PendingValidation(
+    block,
+    (schema_path, direction, op, schema_def),
+    merged,
+    ellipsis_paths,
+    coverage_errors,
+  )
 
-  # Collect all failures
-  messages: list[str] = []
-  for ce in coverage_errors:
-    messages.append(f"coverage: {ce}")
+
+def _unsuppressed(val_errors: list[dict], ellipsis_paths: set[str]) -> list:
+  """Return (path, message) of errors not at ellipsis-acknowledged paths."""
+  kept = []
   for ve in val_errors:
-    # Suppress errors at ellipsis-acknowledged paths
     err_path = ve.get("path", "")
     if any(
       err_path == ep or err_path.startswith(ep + "/") for ep in ellipsis_paths
     ):
       continue
-    messages.append(f"validation: {err_path} \u2014 {ve.get('message', '')}")
+    kept.append((err_path, ve.get("message", "")))
+  return kept
+
+
+def finish_block(
+  pending: PendingValidation,
+  val_errors: list[dict],
+  cross_check: list[dict] | None = None,
+) -> Result:
+  """Combine coverage and validation errors into the block's Result.
+
+  `cross_check` holds the python engine's errors under --engine check;
+  the block fails if they flag different paths than ucp-schema's.
+  """
+  file, line = pending.block["file"], pending.block["line"]
+  annotation = pending.block["annotation"]
+  ellipsis_paths = pending.ellipsis_paths
+
+  # Collect all failures
+  messages: list[str] = []
+  for ce in pending.coverage_errors:
+    messages.append(f"coverage: {ce}")
+  # Suppress errors at ellipsis-acknowledged paths
+  reported = _unsuppressed(val_errors, ellipsis_paths)
+  for err_path, message in reported:
+    messages.append(f"validation: {err_path} \u2014 {message}")
+  if cross_check is not None:
+    expected = sorted({path for path, _ in reported})
+    actual = sorted(
+      {path for path, _ in _unsuppressed(cross_check, ellipsis_paths)}
+    )
+    if actual != expected:
+      messages.append(
+        f"engine mismatch: python engine flags {actual or 'nothing'}, "
+        f"ucp-schema flags {expected or 'nothing'}"
+      )
 
   if messages:
     return Result(
@@ -1071,6 +1555,306 @@ def process_block(
   return Result(file, line, "ok", annotation=annotation)
 
 
+def process_block(
+  block: dict,
+  schema_base: Path,
+  scaffolds_dir: Path,
+) -> Result:
+  """Run the validation pipeline on one block."""
+  return validate_blocks([block], schema_base, scaffolds_dir)[0]
+
+
+def _preresolve(
+  blocks: list[dict],
+  schema_base: Path,
+  pool: ThreadPoolExecutor,
+) -> None:
+  """Resolve every schema variant the blocks need on the pool."""
+  variants = set()
+  for block in blocks:
+    annotation = block["annotation"]
+    if block.get("error") or not annotation:
+      continue
+    if annotation.get("_error") or annotation.get("skip"):
+      continue
+    if annotation.get("schema"):
+      variants.add(
+        (annotation["schema"], annotation["direction"], annotation["op"])
+      )
+
+  def resolve(variant):
+    # Failures are not cached; prepare_block reports them per block.
+    with contextlib.suppress(RuntimeError):
+      resolve_schema(*variant, schema_base)
+
+  list(pool.map(resolve, sorted(variants)))
+
+
+def validate_blocks(
+  blocks: list[dict],
+  schema_base: Path,
+  scaffolds_dir: Path,
+  jobs: int = 1,
+) -> list[Result]:
+  """Run the validation pipeline on blocks, batching schema validation.
+
+  Merged payloads are grouped by (schema, direction, op, def) and each
+  group is validated with one validate_group call. Errors stay attached
+  to their own block, so ellipsis suppression applies per block.
+
+  With jobs > 1, schemas are resolved and groups validated on that many
+  threads (with the cli engine the work is mostly waiting on ucp-schema).
+  Large groups are split into chunks so the threads stay busy. Results
+  keep block order.
+  """
+  cache = _result_cache
+  keys = [
+    cache.key(block, schema_base, scaffolds_dir) if cache else None
+    for block in blocks
+  ]
+  results: list[Result | PendingValidation | None] = [
+    cache.get(key, block) if cache else None
+    for key, block in zip(keys, blocks, strict=True)
+  ]
+  todo = [
+    block
+    for block, result in zip(blocks, results, strict=True)
+    if result is None
+  ]
+
+  pool = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+  try:
+    if pool is not None:
+      _preresolve(todo, schema_base, pool)
+    results = [
+      result or prepare_block(block, schema_base, scaffolds_dir)
+      for block, result in zip(blocks, results, strict=True)
+    ]
+    groups: dict[tuple, list[int]] = {}
+    for index, item in enumerate(results):
+      if isinstance(item, PendingValidation):
+        groups.setdefault(item.group, []).append(index)
+
+    pending_total = sum(len(indices) for indices in groups.values())
+    chunk = max(1, -(-pending_total // (jobs * 4)))
+    batches = [
+      (key, indices[start : start + chunk])
+      for key, indices in groups.items()
+      for start in range(0, len(indices), chunk)
+    ]
+
+    # Under --engine check, ucp-schema's outcome is reported and the
+    # python engine's is the cross-check.
+    engines = ("cli", "python") if _engine == "check" else (_engine,)
+
+    def run(batch):
+      (schema_path, direction, op, schema_def), indices = batch
+      payloads = [results[index].payload for index in indices]
+      per_engine = [
+        validate_group(
+          schema_path, direction, op, schema_def, payloads, schema_base, engine
+        )
+        for engine in engines
+      ]
+      return [
+        [errors for _, errors in outcomes]
+        for outcomes in zip(*per_engine, strict=True)
+      ]
+
+    outcomes = pool.map(run, batches) if pool is not None else map(run, batches)
+    for (_, indices), batch_outcomes in zip(batches, outcomes, strict=True):
+      for index, errors in zip(indices, batch_outcomes, strict=True):
+        results[index] = finish_block(results[index], *errors)
+  finally:
+    if pool is not None:
+      pool.shutdown()
+  if cache:
+    for key, result in zip(keys, results, strict=True):
+      cache.put(key, result)
+  return results
+
+
+# -----------------------------------------------------------
+# Reporting and watch mode
+# -----------------------------------------------------------
+
+# Seconds between polls for changed files in --watch mode.
+WATCH_INTERVAL = 0.2
+
+
+def _totals(results: list[Result]) -> str:
+  passed = sum(1 for r in results if r.status == "ok")
+  failed = sum(1 for r in results if r.status == "fail")
+  errors = sum(1 for r in results if r.status == "error")
+  skipped = sum(1 for r in results if r.status == "skip")
+  return f"{passed} passed, {failed} failed, {errors} errors, {skipped} skipped"
+
+
+def report(results: list[Result]) -> int:
+  """Print failures, errors, skips and totals; return the exit code."""
+  # Print failures and errors first
+  for r in results:
+    if r.status in ("fail", "error"):
+      print(r)
+  for r in results:
+    if r.status == "skip":
+      print(r)
+
+  print(f"\n{_totals(results)}")
+
+  return 1 if any(r.status in ("fail", "error") for r in results) else 0
+
+
+def invalidate_schemas(changed: set[Path]) -> int:
+  """Drop resolved schemas and validators whose $ref closure changed.
+
+  A cached schema is stale when any file in its closure is in `changed`
+  (resolved paths) or its closure no longer reads, e.g. a deleted $ref
+  target. Returns the number of entries dropped.
+  """
+  stale = set()
+  for base, schema_path, *_ in [*_schema_cache, *_validators]:
+    try:
+      closure = schema_cache.ref_closure(base / f"{schema_path}.json")
+    except OSError:
+      stale.add((base, schema_path))
+      continue
+    if any(path in changed for path, _ in closure):
+      stale.add((base, schema_path))
+  dropped = 0
+  for cache in (_schema_cache, _validators):
+    for key in list(cache):
+      if key[:2] in stale:
+        del cache[key]
+        dropped += 1
+  return dropped
+
+
+def _snapshot(paths: list[Path]) -> dict[Path, tuple[int, int]]:
+  """Return the (mtime_ns, size) of each existing file in `paths`."""
+  snapshot = {}
+  for path in paths:
+    with contextlib.suppress(OSError):
+      stat = path.stat()
+      snapshot[path.resolve()] = (stat.st_mtime_ns, stat.st_size)
+  return snapshot
+
+
+def watch(
+  md_files: list[Path] | None,
+  docs_dir: Path,
+  schema_base: Path,
+  scaffolds_dir: Path,
+  jobs: int,
+) -> int:
+  """Validate once, then revalidate affected blocks as files change.
+
+  Polls the docs (`md_files`, or every Markdown file under docs_dir),
+  schemas and scaffolds. A changed Markdown file is re-extracted and all
+  its blocks revalidated; a changed schema or scaffold revalidates the
+  blocks that depend on it (select_changed) after dropping the resolved
+  schemas whose $ref closure includes it. Everything else stays resolved
+  and compiled between runs. Runs until interrupted and returns the exit
+  code of the last state.
+  """
+
+  def watched() -> list[Path]:
+    docs = md_files if md_files is not None else docs_dir.rglob("*.md")
+    return [
+      *docs,
+      *schema_base.rglob("*.json"),
+      *scaffolds_dir.rglob("*.json"),
+    ]
+
+  snapshot = _snapshot(watched())
+  blocks: dict[Path, list[dict]] = {}
+  with ThreadPoolExecutor(max_workers=jobs) as pool:
+    docs = [path for path in snapshot if path.suffix == ".md"]
+    for path, extracted in zip(
+      docs, pool.map(extract_blocks, docs), strict=True
+    ):
+      blocks[path] = extracted
+    all_blocks = [block for path in sorted(blocks) for block in blocks[path]]
+    results = {
+      (block["file"], block["line"]): result
+      for block, result in zip(
+        all_blocks,
+        validate_blocks(all_blocks, schema_base, scaffolds_dir, jobs),
+        strict=True,
+      )
+    }
+    # Results may have come from the result cache: resolve the schema set
+    # now so the first edit does not pay for it.
+    _preresolve(all_blocks, schema_base, pool)
+  if _result_cache is not None:
+    _result_cache.save()
+  status = report(list(results.values()))
+  print(
+    f"\nWatching {len(snapshot)} files for changes (Ctrl-C to stop)...",
+    flush=True,
+  )
+
+  try:
+    while True:
+      time.sleep(WATCH_INTERVAL)
+      current = _snapshot(watched())
+      changed = {
+        path
+        for path in snapshot.keys() | current.keys()
+        if snapshot.get(path) != current.get(path)
+      }
+      if not changed:
+        continue
+      snapshot = current
+      start = time.perf_counter()
+      invalidate_schemas(changed)
+
+      affected = []
+      for path in sorted(changed):
+        if path.suffix != ".md":
+          continue
+        for block in blocks.pop(path, []):
+          results.pop((block["file"], block["line"]), None)
+        if path in current:
+          blocks[path] = extract_blocks(path)
+          affected.extend(blocks[path])
+      affected += select_changed(
+        [
+          block
+          for path in sorted(blocks)
+          if path not in changed
+          for block in blocks[path]
+        ],
+        changed,
+        schema_base,
+        scaffolds_dir,
+      )
+      revalidated = validate_blocks(affected, schema_base, scaffolds_dir, jobs)
+      for block, result in zip(affected, revalidated, strict=True):
+        results[(block["file"], block["line"])] = result
+      if _result_cache is not None:
+        _result_cache.save()
+
+      for r in revalidated:
+        if r.status in ("fail", "error"):
+          print(r)
+      elapsed = time.perf_counter() - start
+      ordered = [
+        results[(block["file"], block["line"])]
+        for path in sorted(blocks)
+        for block in blocks[path]
+      ]
+      print(
+        f"[{time.strftime('%H:%M:%S')}] {len(changed)} changed file(s), "
+        f"{len(affected)} block(s) revalidated in {elapsed:.2f}s; "
+        f"{_totals(ordered)}",
+        flush=True,
+      )
+      status = 1 if any(r.status in ("fail", "error") for r in ordered) else 0
+  except KeyboardInterrupt:
+    return status
+
+
 # -----------------------------------------------------------
 # CLI
 # -----------------------------------------------------------
@@ -1107,12 +1891,66 @@ def main() -> int:
     default=None,
     help="Validate one or more files instead of the full corpus.",
   )
+  parser.add_argument(
+    "--changed-since",
+    metavar="REF",
+    default=None,
+    help=(
+      "Validate only blocks in docs changed since git REF, plus blocks "
+      "whose schema closure or scaffold changed"
+    ),
+  )
+  parser.add_argument(
+    "--watch",
+    action="store_true",
+    help=(
+      "Keep running and revalidate the blocks affected by each change to "
+      "the docs, schemas or scaffolds"
+    ),
+  )
   parser.add_argument(
     "--audit",
     action="store_true",
     help="Just list blocks without validating",
   )
+  parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="Bypass the persistent resolved-schema and result caches",
+  )
+  parser.add_argument(
+    "--engine",
+    choices=ENGINES,
+    default="python",
+    help=(
+      "python: resolve and validate in-process (default); cli: use "
+      "ucp-schema; check: use ucp-schema and fail blocks where the python "
+      "engine disagrees"
+    ),
+  )
+  parser.add_argument(
+    "--jobs",
+    type=int,
+    default=None,
+    help=(
+      "Threads for extraction and validation (default: 1 for the python "
+      "engine, CPU count for cli and check)"
+    ),
+  )
   args = parser.parse_args()
+  if args.jobs is None:
+    # Threads only contend for the GIL unless they wait on ucp-schema.
+    args.jobs = 1 if args.engine == "python" else os.cpu_count() or 1
+  jobs = max(1, args.jobs)
+  if args.watch and (args.audit or args.changed_since):
+    parser.error("--watch cannot be combined with --audit or --changed-since")
+
+  global _disk_cache, _engine, _result_cache
+  if args.no_cache:
+    _disk_cache = None
+  _engine = args.engine
+  if not args.no_cache and not args.audit:
+    _result_cache = ResultCache(RESULT_CACHE_PATH, _engine)
 
   # Resolve paths relative to script location
   script_dir = Path(__file__).parent
@@ -1125,14 +1963,41 @@ def main() -> int:
   scaffolds_dir = args.scaffolds or script_dir / "scaffolds"
   docs_dir = args.docs or repo_root / "docs"
 
+  if args.watch:
+    return watch(args.file, docs_dir, schema_base, scaffolds_dir, jobs)
+
   # Collect markdown files
   md_files = args.file if args.file else sorted(docs_dir.rglob("*.md"))
+  changed = None
+  if args.changed_since:
+    try:
+      changed = changed_files(args.changed_since, repo_root)
+    except RuntimeError as e:
+      print(f"Error: {e}")
+      return 1
+    tool_changed = any(path in changed for path in _TOOL_FILES)
+    deps_changed = any(
+      path.suffix == ".json"
+      and (
+        path.is_relative_to(schema_base.resolve())
+        or path.is_relative_to(scaffolds_dir.resolve())
+      )
+      for path in changed
+    )
+    if tool_changed:
+      changed = None  # The validator itself changed: check everything
+    elif not deps_changed:
+      # Only docs changed: extract just those files.
+      md_files = [path for path in md_files if path.resolve() in changed]
 
   # Extract all blocks
   all_blocks: list[dict] = []
-  for md_file in md_files:
-    blocks = extract_blocks(md_file)
-    all_blocks.extend(blocks)
+  with ThreadPoolExecutor(max_workers=jobs) as pool:
+    for blocks in pool.map(extract_blocks, md_files):
+      all_blocks.extend(blocks)
+
+  if changed is not None:
+    all_blocks = select_changed(all_blocks, changed, schema_base, scaffolds_dir)
 
   if args.audit:
     # Audit mode: just report what we found
@@ -1152,30 +2017,11 @@ def main() -> int:
     return 1 if unannotated else 0
 
   # Validate
-  results: list[Result] = []
-  for block in all_blocks:
-    result = process_block(block, schema_base, scaffolds_dir)
-    results.append(result)
-
-  # Report
-  passed = sum(1 for r in results if r.status == "ok")
-  failed = sum(1 for r in results if r.status == "fail")
-  errors = sum(1 for r in results if r.status == "error")
-  skipped = sum(1 for r in results if r.status == "skip")
-
-  # Print failures and errors first
-  for r in results:
-    if r.status in ("fail", "error"):
-      print(r)
-  for r in results:
-    if r.status == "skip":
-      print(r)
-
-  print(
-    f"\n{passed} passed, {failed} failed, {errors} errors, {skipped} skipped"
-  )
+  results = validate_blocks(all_blocks, schema_base, scaffolds_dir, jobs)
+  if _result_cache is not None:
+    _result_cache.save()
 
-  return 0 if (failed == 0 and errors == 0) else 1
+  return report(results)
 
 
 if __name__ == "__main__":